@@ -0,0 +1,152 @@
+# benchmarks/bench_aio.py
+# Async entry points: results, event-loop stalls and cancellation latency.
+#
+#   python benchmarks/bench_aio.py --rows 4000000
+#
+# Checks, exiting non-zero on any failure:
+#   - evaluate_async over column chunks, single rows, an awaitable and a
+#     process pool matches calculate_zntol_batch
+#   - cancelling a consumer of an endless source returns within a few chunk
+#     times and stops both reading the source and starting new chunks
+# Also reports the longest event-loop stall while a large batch is evaluated
+# inline vs with calculate_zntol_batch_async.
+
+import argparse
+import asyncio
+import contextlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.aio import calculate_zntol_batch_async, evaluate_async  # noqa: E402
+
+
+def scenarios(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-22, 32, n), rng.uniform(7500, 26500, n), rng.uniform(-10, 3000, n)
+
+
+def same(result: dict, expected: dict) -> bool:
+    return (result["table_version"] == zntol.get_table().version
+            and all(np.array_equal(result[name], expected[name]) for name in expected))
+
+
+async def heartbeat(stalls: list, stop: asyncio.Event) -> None:
+    # Longest gap between 1 ms ticks
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last)
+        last = now
+
+
+async def max_stall(work) -> float:
+    stalls, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stalls, stop))
+    await asyncio.sleep(0.01)
+    await work()
+    stop.set()
+    await beat
+    return max(stalls)
+
+
+async def check_results(data: tuple) -> int:
+    expected = zntol.calculate_zntol_batch(*data)
+    version = expected.pop("table_version")
+    failures = 0
+
+    async def chunks():
+        for start in range(0, len(data[0]), 30_000):
+            yield {name: a[start:start + 30_000] for name, a in zip(("isa_dev", "msa", "fuel_burn"), data)}
+            await asyncio.sleep(0)
+
+    async def rows():
+        for row in zip(*(a[:50_000].tolist() for a in data)):
+            yield row
+
+    async def later():
+        await asyncio.sleep(0.001)
+        return data[0]
+
+    parts = [r async for r in evaluate_async(chunks(), chunk_size=20_000)]
+    failures += not same({k: np.concatenate([p[k] for p in parts]) for k in expected} | {"table_version": version},
+                         expected)
+    parts = [r async for r in evaluate_async(rows(), chunk_size=7_000)]
+    failures += not same({k: np.concatenate([p[k] for p in parts]) for k in expected} | {"table_version": version},
+                         {k: v[:50_000] for k, v in expected.items()})
+    failures += not same(await calculate_zntol_batch_async(later(), data[1], data[2]), expected)
+    with ProcessPoolExecutor(2) as pool:
+        failures += not same(await calculate_zntol_batch_async(*data, executor=pool, chunk_size=100_000), expected)
+    print(f"results: {failures} mismatches")
+    return failures
+
+
+async def check_cancel(chunk_size: int) -> int:
+    read = [0]
+    started = [0]
+
+    async def endless():
+        rng = np.random.default_rng(1)
+        while True:
+            read[0] += 1
+            yield scenarios(chunk_size, int(rng.integers(1 << 30)))
+            await asyncio.sleep(0)
+
+    async def consume():
+        async with contextlib.aclosing(evaluate_async(endless(), chunk_size=chunk_size, max_in_flight=4)) as results:
+            async for _ in results:
+                started[0] += 1
+                await asyncio.sleep(0.01)  # slow consumer
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.5)
+    t0 = time.perf_counter()
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    latency = time.perf_counter() - t0
+    read_at_cancel = read[0]
+    await asyncio.sleep(0.3)
+    t_chunk = time.perf_counter()
+    zntol.calculate_zntol_batch(*scenarios(chunk_size))
+    t_chunk = time.perf_counter() - t_chunk
+
+    ok = read[0] == read_at_cancel and latency < 5 * t_chunk + 0.05
+    print(f"cancel: returned in {latency * 1e3:.1f} ms (one chunk {t_chunk * 1e3:.1f} ms), "
+          f"{read[0] - read_at_cancel} source reads after cancel, {started[0]} chunks consumed")
+    return int(not ok)
+
+
+async def main_async(n: int) -> int:
+    data = scenarios(n)
+    zntol.get_table()
+    failures = await check_results(scenarios(300_000))
+    failures += await check_cancel(65536)
+
+    async def inline():
+        zntol.calculate_zntol_batch(*data)
+
+    async def offloaded():
+        await calculate_zntol_batch_async(*data)
+
+    t_inline = await max_stall(inline)
+    t_async = await max_stall(offloaded)
+    print(f"{n:,} rows: longest loop stall {t_inline * 1e3:.0f} ms inline, {t_async * 1e3:.1f} ms async")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=4_000_000)
+    args = parser.parse_args()
+    return 1 if asyncio.run(main_async(args.rows)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/bench_bilinear.py
+# Native bilinear kernel vs RectBivariateSpline: conformance and speed.
+#
+#   python benchmarks/bench_bilinear.py
+#
+# Conformance evaluates both on a dense grid that covers every cell, every
+# knot, the neighbouring doubles either side of each knot and points outside
+# the table, for the kernel built in memory and the one loaded from a compiled
+# artifact. It exits non-zero on any difference: the kernel is guaranteed to
+# match the spline bit for bit (see zntol/interpolation.py).
+
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+
+
+def conformance(table) -> int:
+    # 0.05 °C x 10 ft, a little past both ends of each axis
+    x = np.linspace(-21, 31, 1041)
+    y = np.linspace(7900, 26100, 1821)
+    x = np.union1d(x, np.concatenate([np.nextafter(table.isa_grid, d) for d in (-np.inf, 0, np.inf)]))
+    y = np.union1d(y, np.concatenate([np.nextafter(table.msa_grid, d) for d in (-np.inf, 0, np.inf)]))
+    X, Y = (a.ravel() for a in np.meshgrid(x, y, indexing="ij"))
+    reference = table.spline.ev(X, Y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "table.bin"
+        zntol.compile_table(table, path)
+        kernels = {"built": table.kernel, "artifact": zntol.load_artifact(path).kernel}
+
+        rng = np.random.default_rng(0)
+        sample = rng.integers(0, len(X), 20000)
+        mismatches = 0
+        for name, kernel in kernels.items():
+            bad = int(np.count_nonzero(kernel.batch(X, Y) != reference))
+            # Scalar path on a sample of the same points
+            bad += sum(kernel.scalar(float(X[k]), float(Y[k])) != table.spline(X[k], Y[k])[0, 0] for k in sample)
+            print(f"conformance ({name}): {len(X):,} batch + {len(sample):,} scalar points, {bad} mismatches")
+            mismatches += bad
+    return mismatches
+
+
+def latency(table, number: int) -> None:
+    kernel, spline = table.kernel, table.spline
+    cases = {
+        "spline(x, y)[0, 0]": lambda: spline(12.3, 21300.0)[0, 0],
+        "spline.ev(x, y)": lambda: spline.ev(12.3, 21300.0),
+        "kernel.scalar(x, y)": lambda: kernel.scalar(12.3, 21300.0),
+        "kernel(x, y)": lambda: kernel(12.3, 21300.0),
+    }
+    print(f"\n{'scalar call':<24}{'us/call':>10}")
+    for name, fn in cases.items():
+        t = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        print(f"{name:<24}{t * 1e6:>10.2f}")
+
+
+def throughput(table, sizes: list) -> None:
+    rng = np.random.default_rng(1)
+    print(f"\n{'batch rows':>12}{'spline.ev Mrow/s':>18}{'kernel Mrow/s':>16}")
+    for n in sizes:
+        x = rng.uniform(-20, 30, n)
+        y = rng.uniform(7000, 25000, n)
+        number = max(1, 1_000_000 // n)
+        t_spline = min(timeit.repeat(lambda: table.spline.ev(x, y), number=number, repeat=3)) / number
+        t_kernel = min(timeit.repeat(lambda: table.kernel.batch(x, y), number=number, repeat=3)) / number
+        print(f"{n:>12,}{n / t_spline / 1e6:>18.2f}{n / t_kernel / 1e6:>16.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="calls per scalar timing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    table = zntol.get_table()
+    mismatches = conformance(table)
+    latency(table, args.number)
+    throughput(table, args.sizes)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
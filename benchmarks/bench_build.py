@@ -0,0 +1,91 @@
+# benchmarks/bench_build.py
+# Table build time vs grid size: vectorized assembly against the per-row
+# interp1d loop it replaced.
+#
+#   python benchmarks/bench_build.py --sizes 11x14 101x181 501x1801
+#
+# Synthetic tables keep the shape of the AFM data: high-alt rows on the upper
+# half of the MSA axis, a sprinkling of low-alt overrides, NaN elsewhere. Each
+# size is checked for bit-identical grids and exits non-zero on a difference.
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from zntol import tables  # noqa: E402
+
+
+def synthetic(n_isa: int, n_msa: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    isa_axis = np.linspace(-20, 30, n_isa)
+    msa_axis = np.linspace(8000, 26000, n_msa)
+    high_msa = msa_axis[n_msa // 2]
+    n_high = int((msa_axis >= high_msa).sum())
+    high = {isa: (26000 - 0.6 * (msa_axis[-n_high:] - 8000) - 150 * isa).tolist() for isa in isa_axis.tolist()}
+    low = {}
+    for isa in rng.choice(isa_axis, max(1, n_isa // 2), replace=False).tolist():
+        cols = rng.choice(n_msa - n_high, max(1, (n_msa - n_high) // 4), replace=False)
+        low[isa] = {msa_axis[c]: float(rng.uniform(20000, 26433)) for c in cols}
+    return isa_axis, msa_axis, high, low, high_msa
+
+
+def reference(isa_axis, msa_axis, high, low, high_msa) -> np.ndarray:
+    # The previous build_table() loop, generalised to any axes
+    from scipy.interpolate import interp1d
+
+    weight_grid = np.full((len(isa_axis), len(msa_axis)), np.nan)
+    high_msa_indices = np.where(msa_axis >= high_msa)[0]
+    for i, isa in enumerate(isa_axis):
+        if isa in high:
+            weight_grid[i, high_msa_indices] = high[isa]
+    for isa, data in low.items():
+        i = np.where(isa_axis == isa)[0][0]
+        for msa, val in data.items():
+            j = np.where(msa_axis == msa)[0][0]
+            weight_grid[i, j] = val
+    for i in range(len(isa_axis)):
+        row = weight_grid[i]
+        non_nan = np.isfinite(row)
+        if non_nan.any():
+            interp = interp1d(msa_axis[non_nan], row[non_nan], kind="linear", fill_value="extrapolate")
+            weight_grid[i] = interp(msa_axis)
+    return weight_grid
+
+
+def size(text: str) -> tuple:
+    n_isa, n_msa = text.lower().split("x")
+    return int(n_isa), int(n_msa)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=size, nargs="+", default=[(11, 14), (51, 91), (101, 181), (501, 1801)],
+                        help="ISAxMSA grid sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'grid':>12}{'cells':>12}{'loop ms':>12}{'vector ms':>12}{'speedup':>10}")
+    mismatched = False
+    for n_isa, n_msa in args.sizes:
+        data = synthetic(n_isa, n_msa)
+        number = max(1, 2000 // n_isa)
+        t_loop = min(timeit.repeat(lambda: reference(*data), number=number, repeat=args.repeat)) / number
+        t_vec = min(timeit.repeat(lambda: tables.assemble_grid(*data), number=number, repeat=args.repeat)) / number
+        print(f"{f'{n_isa}x{n_msa}':>12}{n_isa * n_msa:>12,}{t_loop * 1e3:>12.2f}{t_vec * 1e3:>12.3f}"
+              f"{t_loop / t_vec:>10.1f}")
+        if not np.array_equal(reference(*data), tables.assemble_grid(*data), equal_nan=True):
+            print(f"FAIL: grids differ at {n_isa}x{n_msa}")
+            mismatched = True
+
+    # The shipped AFM table
+    t = min(timeit.repeat(tables.build_table, number=100, repeat=args.repeat)) / 100
+    print(f"\nbuild_table() on the AFM data: {t * 1e3:.3f} ms")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
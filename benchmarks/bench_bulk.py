@@ -0,0 +1,61 @@
+# benchmarks/bench_bulk.py
+# Throughput scaling of the multiprocess bulk evaluator from 1 to N cores.
+#
+#   python benchmarks/bench_bulk.py --rows 10000000 --processes 1 2 4 8
+#
+# Each run is checked against calculate_zntol_batch on the same rows.
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.bulk import DEFAULT_CHUNK_SIZE, evaluate_bulk  # noqa: E402
+
+
+def scenarios(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(-20, 30, n), 1),
+        np.round(rng.uniform(8000, 26000, n), -2),
+        np.round(rng.uniform(0, 6000, n)),
+    )
+
+
+def main() -> int:
+    cpus = os.cpu_count() or 1
+    default_processes = sorted({1, *(p for p in (2, 4, 8, 16, 32, 64) if p < cpus), cpus})
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--processes", type=int, nargs="+", default=default_processes)
+    args = parser.parse_args()
+
+    isa_dev, msa, fuel_burn = scenarios(args.rows)
+    zntol.get_table()
+    expected = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn)
+
+    print(f"{args.rows:,} rows, chunks of {args.chunk_size:,}, {cpus} CPUs")
+    print(f"{'processes':>10}{'seconds':>10}{'Mrow/s':>10}{'speedup':>10}")
+    base = None
+    mismatched = False
+    for processes in args.processes:
+        t0 = time.perf_counter()
+        result = evaluate_bulk(isa_dev, msa, fuel_burn, processes=processes, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - t0
+        base = base or elapsed
+        print(f"{processes:>10}{elapsed:>10.2f}{args.rows / elapsed / 1e6:>10.2f}{base / elapsed:>10.2f}")
+        if not all(np.array_equal(result[k], expected[k]) for k in expected):
+            print(f"FAIL: results with {processes} processes differ from calculate_zntol_batch")
+            mismatched = True
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/bench_cache_hits.py
+# Cache hit rate under dispatch-like traffic: full (ISA, MSA, fuel) key vs the
+# engine's obstacle-weight cache keyed on (ISA, effective MSA), and the bounded
+# result cache keyed on inputs on the UI lattice.
+#
+#   python benchmarks/bench_cache_hits.py --requests 200000
+#
+# Traffic model: a fixed set of route obstacles (MSA in 100 ft steps), a
+# handful of forecast ISA deviations per obstacle per day (0.1 °C steps), and
+# fuel burn to the obstacle that varies per flight (10 lb steps).
+
+import argparse
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.limits import OBSTACLE_CACHE_SIZE  # noqa: E402
+
+
+def traffic(requests: int, obstacles: int, temps_per_obstacle: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    route_msa = np.round(rng.uniform(9000, 25000, obstacles), -2)
+    route_temps = np.round(rng.normal(5, 10, (obstacles, temps_per_obstacle)).clip(-20, 30), 1)
+    route_fuel = rng.uniform(500, 4000, obstacles)
+
+    leg = rng.integers(0, obstacles, requests)
+    temp = rng.integers(0, temps_per_obstacle, requests)
+    fuel = np.round(route_fuel[leg] + rng.normal(0, 300, requests), -1).clip(0)
+    return route_temps[leg, temp].tolist(), route_msa[leg].tolist(), fuel.tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--obstacles", type=int, default=300)
+    parser.add_argument("--temps-per-obstacle", type=int, default=8)
+    parser.add_argument("--cache-size", type=int, default=OBSTACLE_CACHE_SIZE)
+    args = parser.parse_args()
+
+    isa_dev, msa, fuel_burn = traffic(args.requests, args.obstacles, args.temps_per_obstacle)
+    table = zntol.get_table()
+
+    # Previous layout: the whole result memoized on all three inputs
+    full_key = lru_cache(maxsize=args.cache_size)(lambda i, m, f: zntol.calculate_zntol(i, m, f, table))
+
+    print(f"{args.requests:,} requests, {args.obstacles} obstacles x {args.temps_per_obstacle} temperatures, "
+          f"cache size {args.cache_size:,}")
+    print(f"{'cache key':<28}{'hits':>10}{'misses':>10}{'hit rate':>10}{'us/req':>10}")
+
+    zntol.obstacle_cache_clear()
+    t0 = time.perf_counter()
+    for i, m, f in zip(isa_dev, msa, fuel_burn):
+        full_key(i, m, f)
+    elapsed = time.perf_counter() - t0
+    info = full_key.cache_info()
+    # The inner calculate_zntol calls also went through the obstacle cache;
+    # only the outer key is reported for this layout
+    print(f"{'(isa, msa, fuel)':<28}{info.hits:>10,}{info.misses:>10,}"
+          f"{info.hits / args.requests:>10.1%}{elapsed / args.requests * 1e6:>10.2f}")
+
+    zntol.obstacle_cache_clear()
+    t0 = time.perf_counter()
+    for i, m, f in zip(isa_dev, msa, fuel_burn):
+        zntol.calculate_zntol(i, m, f, table)
+    elapsed = time.perf_counter() - t0
+    info = zntol.obstacle_cache_info()
+    print(f"{'(isa, effective msa)':<28}{info.hits:>10,}{info.misses:>10,}"
+          f"{info.hits / args.requests:>10.1%}{elapsed / args.requests * 1e6:>10.2f}")
+
+    zntol.obstacle_cache_clear()
+    results = zntol.ResultCache(maxsize=args.cache_size)
+    t0 = time.perf_counter()
+    for i, m, f in zip(isa_dev, msa, fuel_burn):
+        results(i, m, f)
+    elapsed = time.perf_counter() - t0
+    info = results.cache_info()
+    print(f"{'lattice (isa, msa, fuel)':<28}{info.hits:>10,}{info.misses:>10,}"
+          f"{info.hits / args.requests:>10.1%}{elapsed / args.requests * 1e6:>10.2f}"
+          f"  {info.evictions:,} evictions, {info.nbytes / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_curves.py
+# Per-route ZNTOL-vs-ISA curves: compile time, index size and dispatch lookups.
+#
+#   python benchmarks/bench_curves.py --routes 10000 --max-obstacles 40
+#
+# The index is checked against evaluate_routes at every tenth lattice ISA and
+# at random ISA deviations, uniform and just above the +2 °C blend step
+# (2.0, 2.1), and a stale index (compiled against a different table) must be
+# rebuilt by load_curves. Exits non-zero on any lattice mismatch, on any
+# random ISA where the curve overestimates the route ZNTOL, and on a stale load.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from bench_routes import routes  # noqa: E402
+from zntol.curves import LATTICE  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=10_000)
+    parser.add_argument("--max-obstacles", type=int, default=40)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    table = zntol.get_table()
+    _, msa, fuel_burn, offsets = routes(args.routes, args.max_obstacles)
+    n = len(msa)
+
+    t0 = time.perf_counter()
+    curves = zntol.compile_curves(msa, fuel_burn, offsets, table=table)
+    t_compile = time.perf_counter() - t0
+
+    # Exact at lattice ISAs
+    mismatches = 0
+    everyone = np.arange(args.routes)
+    for isa_dev in LATTICE[::10]:
+        expected = zntol.evaluate_routes(np.full(n, isa_dev), msa, fuel_burn, offsets, table=table)
+        got = curves.evaluate(everyone, isa_dev)
+        mismatches += int((got["zntol"] != expected["zntol"]).sum() + (got["error"] != expected["error"]).sum())
+
+    # Off the lattice: linear between knots, so not required to match, but
+    # never above the route ZNTOL
+    rng = np.random.default_rng(1)
+    sample = rng.integers(0, args.routes, 4000)
+    isa_dev = np.concatenate([rng.uniform(-20, 30, 2000), rng.uniform(2.0, 2.1, 2000)])
+    rows = np.concatenate([np.arange(offsets[r], offsets[r + 1]) for r in sample])
+    lengths = offsets[sample + 1] - offsets[sample]
+    sub_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    expected = zntol.evaluate_routes(np.repeat(isa_dev, lengths), msa[rows], fuel_burn[rows], sub_offsets, table=table)
+    difference = curves.evaluate(sample, isa_dev)["zntol"] - expected["zntol"]
+    off_lattice = np.abs(difference).max()
+    over = int((difference > 0).sum())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "routes.bin")
+        curves.save(path)
+        size = os.path.getsize(path)
+        knots = len(curves.knot_pos)
+
+        # Lookups at dispatch: one ISA deviation per flight
+        route = rng.integers(0, args.routes, args.lookups)
+        isa = np.round(rng.uniform(-20, 30, args.lookups), 1)
+        t0 = time.perf_counter()
+        curves.evaluate(route, isa)
+        t_lookup = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        zntol.load_curves(path, table=table)
+        t_load = time.perf_counter() - t0
+
+        # A different table invalidates the index
+        changed = zntol.ZntolTable(table.isa_grid, table.msa_grid, np.asarray(table.weight_grid) - 1.0)
+        rebuilt = zntol.load_curves(path, table=changed)
+        stale = int(rebuilt.table_version != changed.version)
+        stale += int(zntol.load_curves(path, table=changed).table_version != changed.version)
+
+    print(f"{args.routes:,} routes, {n:,} obstacles: {mismatches} lattice mismatches, "
+          f"max off-lattice difference {off_lattice} lb, {over} overestimates, {stale} stale loads")
+    print(f"compile {t_compile * 1e3:.0f} ms, {knots / args.routes:.1f} knots/route, "
+          f"file {size / 1024:.0f} KiB ({size / args.routes:.0f} B/route incl. obstacles)")
+    print(f"load {t_load * 1e3:.2f} ms, evaluate {args.lookups / t_lookup:,.0f} lookups/s")
+    return 1 if mismatches or over or stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# benchmarks/bench_import.py
+# Cold-start budget for the headless engine.
+#
+#   python benchmarks/bench_import.py --budget 1.0
+#
+# Imports zntol in fresh interpreters, reports the best time, and exits
+# non-zero when it exceeds the budget or when the import drags in Streamlit.
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import zntol
+t1 = time.perf_counter()
+zntol.get_table()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "first_table_s": t2 - t1,
+    "streamlit": "streamlit" in sys.modules,
+}))
+"""
+
+
+def measure(repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+        )
+        runs.append(json.loads(out.stdout))
+    best = min(runs, key=lambda r: r["import_s"])
+    best["streamlit"] = any(r["streamlit"] for r in runs)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds for `import zntol`")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = measure(args.repeat)
+    print(f"import zntol      {result['import_s'] * 1e3:8.1f} ms (budget {args.budget * 1e3:.0f} ms)")
+    print(f"first get_table() {result['first_table_s'] * 1e3:8.1f} ms")
+
+    failed = False
+    if result["streamlit"]:
+        print("FAIL: importing zntol imported streamlit")
+        failed = True
+    if result["import_s"] > args.budget:
+        print("FAIL: import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
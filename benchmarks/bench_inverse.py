@@ -0,0 +1,141 @@
+# benchmarks/bench_inverse.py
+# Inverse solvers (maximum MSA / warmest ISA for a takeoff weight): correctness
+# and speed.
+#
+#   python benchmarks/bench_inverse.py --check 2000 --rows 1000000
+#
+# The MSA check scans every whole foot of MSA with the forward engine for a
+# sample of queries and exits non-zero if solve_max_msa disagrees: the answer
+# must be within the last feasible foot, clear the weight when evaluated
+# forward, and report the rule that applies there. The ISA check does the same
+# for solve_max_isa on a 0.001 °C scan, including the legal bracket and the
+# monotone flag. Speed is compared with a 40-step vectorized bisection over
+# the forward engine.
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.inverse import ISA_LIMITS, LIMITS, MAX_MSA, solve_max_isa, solve_max_msa  # noqa: E402
+from zntol.limits import obstacle_weight_batch  # noqa: E402
+
+
+def queries(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    return np.round(rng.uniform(-20, 30, n), 1), np.round(rng.uniform(0, 4000, n)), np.round(rng.uniform(12000, 27000, n))
+
+
+def zntol_unrounded(isa_dev: float, msa: np.ndarray, fuel_burn: float, table) -> tuple:
+    w, source = obstacle_weight_batch(np.full(msa.shape, isa_dev), msa - 1000, table)
+    return np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW), source
+
+
+def check(n: int, table) -> int:
+    isa_dev, fuel_burn, takeoff_weight = queries(n, seed=1)
+    result = solve_max_msa(isa_dev, fuel_burn, takeoff_weight, table)
+    msa = np.arange(zntol.MIN_MSA, MAX_MSA + 1, dtype=float)
+    failures = 0
+    for q in range(n):
+        z, _ = zntol_unrounded(isa_dev[q], msa, fuel_burn[q], table)
+        feasible = msa[z >= takeoff_weight[q] - 1e-6]
+        answer = result["max_msa"][q]
+        if not len(feasible):
+            ok = np.isnan(answer)
+        else:
+            z_at, source_at = zntol_unrounded(isa_dev[q], np.array([answer]), fuel_burn[q], table)
+            ok = (feasible[-1] <= answer < feasible[-1] + 1 and z_at[0] >= takeoff_weight[q] - 1e-6
+                  and source_at[0] == result["source"][q])
+        if not ok:
+            failures += 1
+            if failures <= 5:
+                print(f"FAIL isa={isa_dev[q]} fuel={fuel_burn[q]} tow={takeoff_weight[q]}: got {answer}, "
+                      f"scan {feasible[-1] if len(feasible) else None}")
+    counts = np.bincount(result["limit"], minlength=len(LIMITS))
+    print(f"check: {n:,} queries, {failures} failures; " + ", ".join(f"{c} {t}" for c, t in zip(counts, LIMITS)))
+    return failures
+
+
+def check_isa(n: int, table) -> int:
+    rng = np.random.default_rng(2)
+    msa = np.round(rng.uniform(zntol.MIN_MSA, MAX_MSA, n), -2)
+    fuel_burn = np.round(rng.uniform(0, 4000, n))
+    takeoff_weight = np.round(rng.uniform(12000, 27000, n))
+    result = solve_max_isa(msa, fuel_burn, takeoff_weight, table)
+    step = 0.001
+    isa = np.linspace(-20, 30, 50001)
+    failures = 0
+    for q in range(n):
+        z, _ = zntol_unrounded_isa(isa, msa[q], fuel_burn[q], table)
+        legal = z >= takeoff_weight[q] - 1e-6
+        top, bottom = result["max_isa"][q], result["min_isa"][q]
+        if not legal.any():
+            ok = np.isnan(top)
+        else:
+            last = np.flatnonzero(legal)[-1]
+            illegal_below = np.flatnonzero(~legal[:last])
+            first = illegal_below[-1] + 1 if len(illegal_below) else 0
+            z_at, source_at = zntol_unrounded_isa(np.array([top]), msa[q], fuel_burn[q], table)
+            ok = (isa[last] - 1e-9 <= top < isa[last] + step and isa[first] - step < bottom <= isa[first] + 1e-9
+                  and bool(result["monotone"][q]) == (first == 0)
+                  and z_at[0] >= takeoff_weight[q] - 1e-6 and source_at[0] == result["source"][q])
+        if not ok:
+            failures += 1
+            if failures <= 5:
+                print(f"FAIL msa={msa[q]} fuel={fuel_burn[q]} tow={takeoff_weight[q]}: got [{bottom}, {top}]")
+    counts = np.bincount(result["limit"], minlength=len(ISA_LIMITS))
+    print(f"check (ISA): {n:,} queries, {failures} failures, {int((~result['monotone'] & (result['limit'] <= 1)).sum())} not monotone; "
+          + ", ".join(f"{c} {t}" for c, t in zip(counts, ISA_LIMITS)))
+    return failures
+
+
+def zntol_unrounded_isa(isa_dev: np.ndarray, msa: float, fuel_burn: float, table) -> tuple:
+    w, source = obstacle_weight_batch(isa_dev, np.full(isa_dev.shape, msa - 1000), table)
+    return np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW), source
+
+
+def bisection(isa_dev, fuel_burn, takeoff_weight, table, steps: int = 40) -> np.ndarray:
+    lo = np.full(isa_dev.shape, float(zntol.MIN_MSA))
+    hi = np.full(isa_dev.shape, float(MAX_MSA))
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        w, _ = obstacle_weight_batch(isa_dev, mid - 1000, table)
+        clears = np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW) >= takeoff_weight
+        lo, hi = np.where(clears, mid, lo), np.where(clears, hi, mid)
+    return lo
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", type=int, default=2000, help="queries checked against a 1 ft scan")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    table = zntol.get_table()
+    failures = check(args.check, table) + check_isa(args.check, table)
+
+    data = queries(args.rows)
+    t0 = time.perf_counter()
+    solve_max_msa(*data, table)
+    t_solve = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    bisection(*data, table)
+    t_bisect = time.perf_counter() - t0
+    print(f"\n{args.rows:,} queries: solve_max_msa {t_solve:.2f} s ({args.rows / t_solve / 1e6:.2f} M/s), "
+          f"40-step bisection {t_bisect:.2f} s ({args.rows / t_bisect / 1e6:.2f} M/s)")
+
+    rng = np.random.default_rng(3)
+    routes = (rng.uniform(zntol.MIN_MSA, MAX_MSA, args.rows), data[1], data[2])
+    t0 = time.perf_counter()
+    solve_max_isa(*routes, table)
+    t_isa = time.perf_counter() - t0
+    print(f"{args.rows:,} routes: solve_max_isa {t_isa:.2f} s ({args.rows / t_isa / 1e6:.2f} M/s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
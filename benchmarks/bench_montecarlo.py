@@ -0,0 +1,100 @@
+# benchmarks/bench_montecarlo.py
+# Monte Carlo ISA/fuel uncertainty: throughput and reproducibility.
+#
+#   python benchmarks/bench_montecarlo.py --flights 2000 --samples 10000 --processes 4
+#
+# Checks, exiting non-zero on any failure:
+#   - a few scenarios replayed sample by sample through calculate_zntol, with
+#     the same per-scenario streams, give the same percentiles and P(below)
+#   - results do not depend on the chunk size or the number of processes
+#   - near the top of the ISA range (29 ± 3 °C), samples above +30 °C are
+#     reported as out_of_range and counted below any target, and clip=True
+#     evaluates them at +30 °C instead
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol import montecarlo  # noqa: E402
+
+
+def flights(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    isa_dev = np.round(rng.uniform(-15, 25, n), 1)
+    msa = np.round(rng.uniform(8000, 26000, n), -2)
+    fuel_burn = rng.uniform(200, 3000, n)
+    return isa_dev, msa, fuel_burn, rng.uniform(1, 4, n), fuel_burn * 0.05, rng.uniform(20000, 26433, n)
+
+
+def replay(isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target, row: int, samples: int, seed: int) -> tuple:
+    # Out-of-range samples have no ZNTOL (error) and count as below the target
+    rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(row,))))
+    draws = rng.standard_normal((2, samples))
+    isa = (isa_dev + isa_sigma * draws[0]).tolist()
+    fuel = np.maximum(fuel_burn + fuel_sigma * draws[1], 0).tolist()
+    z = np.array([zntol.calculate_zntol(i, msa, f).get("zntol", np.nan) for i, f in zip(isa, fuel)], dtype=float)
+    return np.nanpercentile(z, montecarlo.DEFAULT_PERCENTILES), ((z < target) | np.isnan(z)).mean()
+
+
+def check_range_edge(samples: int) -> int:
+    # ISA 29 ± 3 °C: about 37% of samples are above +30 °C
+    failures = 0
+    dropped = zntol.simulate([29.0], 15000, 1000, 3.0, target=0, samples=samples)
+    clipped = zntol.simulate([29.0], 15000, 1000, 3.0, target=0, samples=samples, clip=True)
+    expected, p_below = replay(29.0, 15000, 1000, 3.0, 0.0, 0, 0, samples, 0)
+    failures += int(not np.array_equal(dropped["percentiles"][0], expected) or dropped["p_below"][0] != p_below)
+    failures += int(abs(dropped["out_of_range"][0] - 0.37) > 0.02 or p_below != dropped["out_of_range"][0])
+    failures += int(clipped["p_below"][0] != 0 or clipped["out_of_range"][0] != dropped["out_of_range"][0])
+    print(f"ISA 29 ± 3 °C: {dropped['out_of_range'][0]:.1%} out of range, P(below 0) {dropped['p_below'][0]:.1%} "
+          f"({clipped['p_below'][0]:.1%} with clip); {failures} failures")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flights", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+
+    data = flights(args.flights)
+    isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target = data
+    zntol.get_table()
+
+    t0 = time.perf_counter()
+    result = zntol.simulate(isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target, samples=args.samples)
+    t_one = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    parallel = zntol.simulate(isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target, samples=args.samples,
+                              processes=args.processes)
+    t_par = time.perf_counter() - t0
+
+    failures = 0
+    for row in range(0, args.flights, max(1, args.flights // 5)):
+        expected, p_below = replay(*(a[row] for a in data), row, args.samples, 0)
+        failures += int(not np.array_equal(expected, result["percentiles"][row]) or p_below != result["p_below"][row])
+
+    chunk = montecarlo.CHUNK_SAMPLES
+    montecarlo.CHUNK_SAMPLES = args.samples * 7
+    try:
+        rechunked = zntol.simulate(isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target, samples=args.samples)
+    finally:
+        montecarlo.CHUNK_SAMPLES = chunk
+    for other in (parallel, rechunked):
+        failures += sum(not np.array_equal(result[name], other[name], equal_nan=True) for name in result)
+    failures += check_range_edge(args.samples)
+
+    total = args.flights * args.samples
+    print(f"{args.flights:,} flights x {args.samples:,} samples: {failures} failures")
+    print(f"1 process {t_one:.2f} s ({total / t_one / 1e6:.1f}M samples/s), "
+          f"{args.processes} processes {t_par:.2f} s ({total / t_par / 1e6:.1f}M samples/s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
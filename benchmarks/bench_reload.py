@@ -0,0 +1,185 @@
+# benchmarks/bench_reload.py
+# Hot reload under load: results stay consistent with the table they report.
+#
+#   python benchmarks/bench_reload.py [--threads 4] [--interval 0.05]
+#
+# A TableWatcher polls a JSON data file written with python -m zntol data.
+# Reader threads call calculate_zntol, calculate_zntol_batch and the result
+# cache in a loop while the file is replaced (write to a temporary file, then
+# rename) with different tuning and AFM data, and once with invalid JSON.
+# Exits non-zero unless every result, scalar, batch and cached, equals the
+# result of a table built directly from the data of the version it reports;
+# every good file is published and the invalid one is not; the readers see
+# every version; and once a reload is published no reader is handed the
+# previous version. Also reports the time from rename to publication and the
+# cost of get_table() on the read path.
+
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.lookup import DenseLookup  # noqa: E402
+from zntol.tables import afm_source_hash, build_table  # noqa: E402
+
+
+def variants(base: dict) -> list:
+    # Tuning and AFM data edits, each a different table version
+    out = []
+    for key, value in (("BLEND_EXPONENT", 1.5), ("PULLDOWN_WEIGHT", 1800), ("PULLDOWN_ISA", -12)):
+        data = copy.deepcopy(base)
+        data["tuning"][key] = value
+        out.append(data)
+    data = copy.deepcopy(base)
+    data["high_data"] = {isa: [w - 50 for w in row] for isa, row in data["high_data"].items()}
+    out.append(data)
+    data = copy.deepcopy(base)
+    data["low_data"] = {isa: {msa: w + 25 for msa, w in points.items()} for isa, points in data["low_data"].items()}
+    out.append(data)
+    out.append(base)  # back to the built-in data
+    return out
+
+
+def write(path: Path, text: str) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def reader(kind: str, stop: threading.Event, log: list, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    cache = zntol.get_result_cache()
+    while not stop.is_set():
+        isa_dev, msa, fuel_burn = rng.uniform(-20, 30, 64), rng.uniform(8000, 26000, 64), rng.uniform(0, 3000, 64)
+        # Logged with the time each call started
+        if kind == "batch":
+            t = time.perf_counter()
+            result = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn)
+            log.append((t, result["table_version"], (isa_dev, msa, fuel_burn), result))
+            continue
+        for args in zip(isa_dev.tolist(), msa.tolist(), fuel_burn.tolist()):
+            t = time.perf_counter()
+            result = zntol.calculate_zntol(*args) if kind == "scalar" else cache.calculate(*args)
+            log.append((t, result["table_version"], args, dict(result)))
+
+
+def check(kind: str, log: list, tables: dict) -> int:
+    mismatches = 0
+    lookups = {}
+    for _, version, args, result in log:
+        table = tables.get(version)
+        if table is None:
+            mismatches += 1
+        elif kind == "batch":
+            expected = zntol.calculate_zntol_batch(*args, table=table)
+            mismatches += not all(np.array_equal(result[k], expected[k]) for k in expected)
+        else:
+            if kind == "cache":
+                if version not in lookups:
+                    lookups[version] = DenseLookup(table)
+                expected = lookups[version].calculate(*(zntol.cache.lattice_point(*args) or args))
+            else:
+                expected = zntol.calculate_zntol(*args, table=table)
+            mismatches += dict(expected) != result
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=2, help="reader threads per entry point")
+    parser.add_argument("--interval", type=float, default=0.05, help="watcher poll interval, s")
+    parser.add_argument("--hold", type=float, default=0.3, help="seconds each version is served")
+    args = parser.parse_args()
+
+    base = zntol.default_data()
+    # Reference tables per data version, built outside the watcher
+    tables = {build_table(d).version: build_table(d) for d in variants(base)}
+    published = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "afm.json"
+        write(path, json.dumps(base))
+        zntol.set_table(None)
+        watcher = zntol.TableWatcher(path, args.interval,
+                                     on_reload=lambda table: published.append((time.perf_counter(), table.version)))
+        watcher.start()
+        initial = zntol.get_table().version
+
+        stop = threading.Event()
+        logs = {kind: [[] for _ in range(args.threads)] for kind in ("scalar", "batch", "cache")}
+        threads = [threading.Thread(target=reader, args=(kind, stop, log, seed))
+                   for seed, (kind, log) in enumerate((k, lg) for k, ls in logs.items() for lg in ls)]
+        for t in threads:
+            t.start()
+
+        failures = []
+        delays = []
+        time.sleep(args.hold)
+        for data in variants(base):
+            t0 = time.perf_counter()
+            write(path, json.dumps(data))
+            expected = afm_source_hash(data)
+            while zntol.get_table().source_hash != expected and time.perf_counter() - t0 < 30:
+                time.sleep(0.001)
+            delays.append(time.perf_counter() - t0)
+            time.sleep(args.hold)
+
+        # A half-written file keeps the current table
+        before = zntol.get_table().version
+        write(path, json.dumps(base)[:-100])
+        time.sleep(10 * args.interval)
+        if zntol.get_table().version != before or watcher.error is None:
+            failures.append("an invalid data file replaced the table or was not reported")
+        stop.set()
+        for t in threads:
+            t.join()
+        watcher.stop()
+    zntol.set_table(None)
+
+    versions = [v for _, v in published]
+    if versions != [tables[v].version for v in versions] or len(versions) != len(variants(base)):
+        failures.append(f"{len(versions)} reloads published for {len(variants(base))} data changes")
+    if initial not in tables:
+        failures.append("the watcher did not publish the initial data file")
+
+    for kind, per_thread in logs.items():
+        rows = sum(len(log) for log in per_thread)
+        mismatches = sum(check(kind, log, tables) for log in per_thread)
+        seen = {v for log in per_thread for _, v, _, _ in log}
+        # After a publication, no call that starts later may report an older version
+        stale = 0
+        for log in per_thread:
+            for (t_pub, version), (t_next, _) in zip(published, published[1:] + [(float("inf"), None)]):
+                stale += sum(1 for t, v, _, _ in log if t_pub + 0.001 < t < t_next and v != version)
+        print(f"{kind:6s}: {rows:8,} calls, {len(seen)} versions seen, {mismatches} mismatches, {stale} stale")
+        if mismatches:
+            failures.append(f"{kind}: results differ from the table of the version they report")
+        if stale:
+            failures.append(f"{kind}: calls served a replaced table after the swap")
+        if not set(versions) <= seen:
+            failures.append(f"{kind}: readers did not see every published version")
+
+    n = 1_000_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        zntol.get_table()
+    t_get = (time.perf_counter() - t0) / n
+    print(f"rename to publication: median {np.median(delays) * 1e3:.0f} ms, max {max(delays) * 1e3:.0f} ms "
+          f"(poll interval {args.interval * 1e3:.0f} ms); get_table() {t_get * 1e9:.0f} ns")
+
+    for failure in failures:
+        print("  FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
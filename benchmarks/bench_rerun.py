@@ -0,0 +1,99 @@
+# benchmarks/bench_rerun.py
+# Per-rerun script time of the Streamlit app, before and after caching the table.
+#
+#   python benchmarks/bench_rerun.py --sessions 16 --reruns 50
+#
+# "rebuild" is what every rerun paid when the grid and spline were built at
+# module level; "cached" is the current behaviour, where zntol.get_table()
+# hands back the process-wide object built on the first run.
+#
+# Two measurements:
+#   script  - full reruns of the app through streamlit.testing.AppTest
+#             (one session; AppTest does not support concurrent instances)
+#   table   - the table step of a rerun from many concurrent session threads
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from streamlit import logger as streamlit_logger
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = str(ROOT / "emb120_zntol_streamlit.py")
+
+sys.path.insert(0, str(ROOT))
+import zntol  # noqa: E402
+
+
+def summarize(mode: str, timings: list, wall: float) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(0.99 * len(timings)))]
+    print(
+        f"{mode:<10}{statistics.mean(timings) * 1e6:>10.1f}"
+        f"{statistics.median(timings) * 1e6:>10.1f}{p99 * 1e6:>10.1f}{wall:>10.2f}"
+    )
+
+
+def bench_script(reruns: int, rebuild: bool) -> tuple:
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    timings = []
+    t0 = time.perf_counter()
+    for _ in range(reruns):
+        if rebuild:
+            zntol.set_table(None)
+        t1 = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - t1)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return timings, time.perf_counter() - t0
+
+
+def bench_table(sessions: int, reruns: int, rebuild: bool) -> tuple:
+    step = zntol.build_table if rebuild else zntol.get_table
+    timings = []
+
+    def session() -> None:
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            step()
+            timings.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return timings, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    # Bare-mode runs warn about the missing ScriptRunContext on every call
+    streamlit_logger.set_log_level("error")
+
+    header = f"{'mode':<10}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'wall s':>10}"
+
+    print(f"script: 1 session x {args.reruns} reruns")
+    print(header)
+    for mode, rebuild in (("rebuild", True), ("cached", False)):
+        summarize(mode, *bench_script(args.reruns, rebuild))
+
+    print(f"\ntable: {args.sessions} sessions x {args.reruns} reruns")
+    print(header)
+    for mode, rebuild in (("rebuild", True), ("cached", False)):
+        summarize(mode, *bench_table(args.sessions, args.reruns, rebuild))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_routes.py
+# Route profiles: evaluate_routes over ragged CSR batches vs a Python loop.
+#
+#   python benchmarks/bench_routes.py --routes 10000 --max-obstacles 40
+#
+# Routes get 1..max-obstacles obstacles with cumulative fuel burn. The loop
+# baseline calls calculate_zntol per obstacle and takes the minimum; results
+# must agree for every route, otherwise the run exits non-zero.
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+
+
+def routes(n_routes: int, max_obstacles: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_obstacles + 1, n_routes)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    n = int(offsets[-1])
+    msa = np.round(rng.uniform(8000, 26000, n), -2)
+    isa_dev = np.repeat(np.round(rng.uniform(-20, 30, n_routes), 1), lengths) + np.round(rng.normal(0, 1, n), 1)
+    isa_dev = isa_dev.clip(-20, 30)
+    burn = rng.uniform(50, 300, n)
+    fuel_burn = np.cumsum(burn) - np.repeat(np.cumsum(burn)[offsets[:-1]] - burn[offsets[:-1]], lengths)
+    return isa_dev, msa, fuel_burn, offsets
+
+
+def loop(isa_dev, msa, fuel_burn, offsets, table) -> list:
+    isa_dev, msa, fuel_burn = isa_dev.tolist(), msa.tolist(), fuel_burn.tolist()
+    out = []
+    for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        results = [zntol.calculate_zntol(isa_dev[k], msa[k], fuel_burn[k], table) for k in range(start, stop)]
+        limiting = min(range(len(results)), key=lambda k: results[k]["zntol"])
+        out.append((limiting, results[limiting]["zntol"]))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=10_000)
+    parser.add_argument("--max-obstacles", type=int, default=40)
+    args = parser.parse_args()
+
+    table = zntol.get_table()
+    data = routes(args.routes, args.max_obstacles)
+    n = len(data[1])
+
+    t0 = time.perf_counter()
+    result = zntol.evaluate_routes(*data, table=table)
+    t_vec = time.perf_counter() - t0
+    zntol.obstacle_cache_clear()
+    t0 = time.perf_counter()
+    expected = loop(*data, table)
+    t_loop = time.perf_counter() - t0
+
+    got = list(zip(result["limiting"].tolist(), result["zntol"].tolist()))
+    mismatches = sum(g != e for g, e in zip(got, expected))
+    print(f"{args.routes:,} routes, {n:,} obstacles: {mismatches} mismatches")
+    print(f"evaluate_routes {t_vec * 1e3:.1f} ms ({args.routes / t_vec:,.0f} routes/s), "
+          f"calculate_zntol loop {t_loop * 1e3:.1f} ms ({args.routes / t_loop:,.0f} routes/s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# benchmarks/bench_sensitivity.py
+# Analytic ZNTOL partials vs finite differences, and their cost vs one evaluation.
+#
+#   python benchmarks/bench_sensitivity.py --n 1000000
+#
+# Random inputs plus inputs placed on every table knot and rule boundary. Each
+# one-sided partial is compared with the one-sided difference quotient
+# (f(v + 2h) - f(v + h)) / h (and its mirror), which converges to the slope of
+# the branch on that side even across a jump. zntol must equal
+# calculate_zntol_batch. Any disagreement exits non-zero.
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.limits import obstacle_weight_batch  # noqa: E402
+from zntol.sensitivity import MSA_BREAKS, isa_breaks  # noqa: E402
+
+STEP = 1e-7  # °C and ft
+TOLERANCE = 1e-3  # lbs per °C / per ft, relative to max(1, |partial|)
+
+
+def exact(isa_dev, msa, fuel_burn, table) -> np.ndarray:
+    # ZNTOL before rounding
+    effective = np.where(msa > 6000, msa - 1000, msa)
+    w, _ = obstacle_weight_batch(isa_dev, effective, table)
+    return np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW)
+
+
+def crosses(v, sign: int, grid, breaks) -> np.ndarray:
+    # Points whose difference quotient straddles a knot or boundary they do
+    # not sit on; the quotient says nothing about the slope there
+    edges = np.concatenate([grid, breaks])
+    far = v + 2 * sign * STEP
+    lo, hi = np.minimum(v, far), np.maximum(v, far)
+    return ((edges > lo[:, None]) & (edges < hi[:, None]) & (edges != v[:, None])).any(axis=1)
+
+
+def inputs(n: int, table, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    isa_dev = rng.uniform(-20 + 3 * STEP, 30 - 3 * STEP, n)
+    msa = rng.uniform(8000 + 3 * STEP, 26000 - 3 * STEP, n)
+    fuel_burn = rng.choice([0.0, 500.0, 2000.0], n)
+
+    # Knots and boundaries in each variable, crossed with random values
+    isa_edges = np.unique(np.concatenate([table.isa_grid[1:-1], isa_breaks(table)]))
+    msa_edges = np.unique(np.concatenate([table.msa_grid + 1000, np.array(MSA_BREAKS) + 1000]))
+    msa_edges = msa_edges[(msa_edges > 8000) & (msa_edges < 26000)]
+    m = 20000
+    isa_dev = np.concatenate([isa_dev, rng.choice(isa_edges, m), rng.uniform(-19, 29, m)])
+    msa = np.concatenate([msa, rng.uniform(8001, 25999, m), rng.choice(msa_edges, m)])
+    fuel_burn = np.concatenate([fuel_burn, rng.choice([0.0, 500.0, 2000.0], 2 * m)])
+    return isa_dev, msa, fuel_burn
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    table = zntol.get_table()
+    isa_dev, msa, fuel_burn = inputs(args.n, table)
+    result = zntol.calculate_sensitivities(isa_dev, msa, fuel_burn, table=table)
+
+    failures = int((result["zntol"] != zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)["zntol"]).sum())
+    for name, d_isa, d_msa in (("d_isa_plus", 1, 0), ("d_isa_minus", -1, 0),
+                               ("d_msa_plus", 0, 1), ("d_msa_minus", 0, -1)):
+        sign = d_isa + d_msa
+        near = exact(isa_dev + d_isa * STEP, msa + d_msa * STEP, fuel_burn, table)
+        far = exact(isa_dev + 2 * d_isa * STEP, msa + 2 * d_msa * STEP, fuel_burn, table)
+        quotient = (far - near) / STEP * sign
+        bad = np.abs(quotient - result[name]) > TOLERANCE * np.maximum(1, np.abs(result[name]))
+        bad &= ~crosses(isa_dev if d_isa else msa - 1000, sign, table.isa_grid if d_isa else table.msa_grid,
+                        isa_breaks(table) if d_isa else MSA_BREAKS)
+        failures += int(bad.sum())
+        print(f"{name}: {int(bad.sum())} disagreements")
+    print(f"{len(isa_dev):,} points, {int(result['kink'].sum()):,} on a kink, {failures} failures")
+
+    n = args.n
+    t0 = time.perf_counter()
+    zntol.calculate_zntol_batch(isa_dev[:n], msa[:n], fuel_burn[:n], table=table)
+    t_eval = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    zntol.calculate_sensitivities(isa_dev[:n], msa[:n], fuel_burn[:n], table=table)
+    t_sens = time.perf_counter() - t0
+    print(f"calculate_zntol_batch {t_eval * 1e3:.0f} ms, calculate_sensitivities {t_sens * 1e3:.0f} ms "
+          f"({t_sens / t_eval:.1f}x)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# benchmarks/bench_server.py
+# Load test for the HTTP service: latency percentiles and throughput.
+#
+#   python benchmarks/bench_server.py --connections 64 --requests 20000 [--window-ms 2]
+#   python benchmarks/bench_server.py --url http://127.0.0.1:8120   # an already running server
+#
+# Without --url a server is started in a subprocess (python -m zntol serve on
+# a free port) and stopped afterwards. Each connection is kept alive and sends
+# single POST /zntol requests back to back; one batch request is sent as well.
+# Every response is compared with calculate_zntol / calculate_zntol_batch in
+# this process, and any mismatch or unexpected status exits non-zero. 503s
+# (backpressure) are counted and reported, not treated as failures.
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import zntol  # noqa: E402
+
+
+async def request(reader, writer, method: str, path: str, payload: dict | None = None) -> tuple:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: zntol\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    length = next(int(line.split(":", 1)[1]) for line in head if line.lower().startswith("content-length:"))
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def worker(host: str, port: int, scenarios: list, latencies: list, responses: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for scenario in scenarios:
+            isa_dev, msa, fuel_burn = scenario
+            t0 = time.perf_counter()
+            status, result = await request(reader, writer, "POST", "/zntol",
+                                           {"isa_dev": isa_dev, "msa": msa, "fuel_burn": fuel_burn})
+            latencies.append(time.perf_counter() - t0)
+            responses.append((scenario, status, result))
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, connections: int, n: int) -> int:
+    rng = np.random.default_rng(0)
+    isa_dev = np.round(rng.uniform(-22, 32, n), 1).tolist()
+    msa = np.round(rng.uniform(7500, 26500, n), -2).tolist()
+    fuel_burn = np.round(rng.uniform(0, 3000, n)).tolist()
+    scenarios = list(zip(isa_dev, msa, fuel_burn))
+
+    # Wait for readiness
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(600):
+        status, ready = await request(reader, writer, "GET", "/readyz")
+        if status == 200:
+            break
+        await asyncio.sleep(0.05)
+    else:
+        print("server never became ready")
+        return 1
+
+    # Batch endpoint
+    status, batch = await request(reader, writer, "POST", "/zntol/batch",
+                                  {"isa_dev": isa_dev[:5000], "msa": msa[:5000], "fuel_burn": fuel_burn[:5000]})
+    expected = zntol.calculate_zntol_batch(isa_dev[:5000], msa[:5000], fuel_burn[:5000])
+    failures = [] if status == 200 and all(batch[k] == (v.tolist() if isinstance(v, np.ndarray) else v)
+                                          for k, v in expected.items()) else ["batch"]
+
+    latencies, responses = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, scenarios[k::connections], latencies, responses)
+                           for k in range(connections)))
+    elapsed = time.perf_counter() - t0
+    _, stats = await request(reader, writer, "GET", "/readyz")
+    writer.close()
+
+    # Checked after the timed run so the client stays light
+    busy = 0
+    for scenario, status, result in responses:
+        if status == 503:
+            busy += 1
+            continue
+        expected = zntol.calculate_zntol(*scenario)
+        if status != (422 if expected["error"] else 200) or result != expected:
+            failures.append((scenario, status, result))
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+    print(f"{len(latencies):,} requests over {connections} keep-alive connections: "
+          f"{len(latencies) / elapsed:,.0f} req/s, p50 {p50:.2f} ms, p99 {p99:.2f} ms, {busy} busy (503)")
+    print(f"server: {stats['batches']:,} evaluations for {stats['requests']:,} single requests "
+          f"({stats['requests'] / max(stats['batches'], 1):.1f} per evaluation), {len(failures)} failures")
+    for failure in failures[:5]:
+        print("  mismatch:", failure)
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="server to test; default: start one")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        return asyncio.run(run(url.hostname, url.port, args.connections, args.requests))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "zntol", "serve", "--port", "0", "--window-ms", str(args.window_ms),
+         "--queue-size", str(args.queue_size)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        port = int(re.search(r":(\d+)$", server.stdout.readline().strip()).group(1))
+        return asyncio.run(run("127.0.0.1", port, args.connections, args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
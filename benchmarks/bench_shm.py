@@ -0,0 +1,165 @@
+# benchmarks/bench_shm.py
+# Host memory of N worker processes: per-process table vs one shared table.
+#
+#   python benchmarks/bench_shm.py [--workers 1 4 16]
+#
+# For each worker count, N processes are started in each mode and all stay
+# alive while they are measured:
+#   build   every process builds its own table (build_table())
+#   shared  ZNTOL_SHARED_TABLE=1 with the block published beforehand
+#           (python -m zntol shm publish): every process attaches
+#   race    ZNTOL_SHARED_TABLE=1 with no block: the workers race to publish,
+#           one wins and the others attach
+# Each worker reports the heap its table added (tracemalloc, which NumPy
+# reports to: the table's arrays plus the kernel's derived per-process copies)
+# and whether the table's arrays are views into the shared block. The parent
+# reads each worker's mapping of the block from /proc/<pid>/smaps. Host memory
+# for the table is the workers' heap plus the block, counted once.
+# Exits non-zero unless, in shared and race mode, every worker maps the same
+# block with its pages shared (no private copy) and the table's arrays are
+# views into it; attached workers hold less heap than one that built its
+# table; and every worker's results match build_table(). What an attached
+# worker still holds (about 9 KiB, in race mode too) is per-process objects:
+# array headers, the parsed artifact header and the kernel's axis locators;
+# the scalar path's lists are only built on the first scalar call.
+# tests/test_shm.py checks that this does not grow with the number of workers.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def mapping(pid, path: str) -> dict:
+    # Resident, shared and private bytes of the mappings of one file, and their address ranges
+    totals, ranges, current = {"rss": 0, "shared": 0, "private": 0}, [], None
+    with open(f"/proc/{pid}/smaps") as fh:
+        for line in fh:
+            field = line.split()
+            if not field[0].endswith(":"):
+                current = field[5] if len(field) > 5 else ""
+                if current == path:
+                    ranges.append(tuple(int(a, 16) for a in field[0].split("-")))
+            elif current == path:
+                key = {"Rss:": "rss", "Shared_Clean:": "shared", "Shared_Dirty:": "shared",
+                       "Private_Clean:": "private", "Private_Dirty:": "private"}.get(field[0])
+                if key:
+                    totals[key] += int(field[1]) * 1024
+    return {**totals, "ranges": ranges}
+
+
+def worker(mode: str) -> None:
+    import tracemalloc
+
+    import zntol
+    import zntol.shm
+    from zntol.tables import build_table, get_table
+
+    rng = np.random.default_rng(0)
+    isa_dev, msa, fuel_burn = rng.uniform(-20, 30, 1000), rng.uniform(8000, 26000, 1000), rng.uniform(0, 3000, 1000)
+    reference = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=build_table())
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = build_table() if mode == "build" else get_table()
+    heap = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    result = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+
+    block = "/dev/shm/" + zntol.shm.shared_name() if mode != "build" else None
+    ranges = mapping("self", block)["ranges"] if block else []
+    arrays = (table.isa_grid, table.msa_grid, table.weight_grid, table.kernel.isa_inv, table.kernel.msa_inv,
+              table.kernel.cells)
+    print(json.dumps({
+        "heap": heap,
+        "block": block,
+        "version": table.version,
+        "views": all(any(lo <= _address(a) and _address(a) + a.nbytes <= hi for lo, hi in ranges) for a in arrays),
+        "match": all(np.array_equal(result[k], reference[k]) for k in result),
+    }), flush=True)
+    sys.stdin.read()  # stay alive until the parent has measured every worker
+
+
+def run(mode: str, n: int) -> dict:
+    env = {"ZNTOL_SHARED_TABLE": "1"} if mode != "build" else {}
+    procs = [subprocess.Popen([sys.executable, __file__, "--worker", mode], cwd=ROOT, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, env={**_environ(), **env})
+             for _ in range(n)]
+    try:
+        reports = [json.loads(p.stdout.readline()) for p in procs]
+        for p, report in zip(procs, reports):
+            report["mapping"] = mapping(p.pid, report["block"]) if report["block"] else None
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return reports
+
+
+def _address(a: np.ndarray) -> int:
+    return a.__array_interface__["data"][0]
+
+
+def _environ() -> dict:
+    return {k: v for k, v in os.environ.items() if k not in ("ZNTOL_SHARED_TABLE", "ZNTOL_TABLE")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker)
+        return 0
+
+    from zntol.artifact import to_bytes
+    from zntol.shm import publish_shared, unlink_shared
+    from zntol.tables import build_table
+
+    size = len(to_bytes(build_table()))
+    print(f"table artifact: {size:,} bytes")
+    failures = []
+    for n in args.workers:
+        unlink_shared()
+        results = {"build": run("build", n)}
+        results["race"] = run("race", n)
+        unlink_shared()
+        published = publish_shared(build_table())
+        results["shared"] = run("shared", n)
+        del published
+        unlink_shared()
+        for mode, reports in results.items():
+            heap = sum(r["heap"] for r in reports)
+            block = size if mode != "build" else 0
+            print(f"{n:3d} workers {mode:6s}: heap {np.median([r['heap'] for r in reports]) / 1024:5.1f} KiB/worker "
+                  f"(median), shared block {block / 1024:4.1f} KiB once, host {(heap + block) / 1024:7.1f} KiB")
+            if not all(r["match"] for r in reports):
+                failures.append(f"{mode}/{n}: results differ from build_table()")
+
+        for mode in ("race", "shared"):
+            reports = results[mode]
+            if len({r["block"] for r in reports}) != 1 or len({r["version"] for r in reports}) != 1:
+                failures.append(f"{mode}/{n}: workers did not attach one block")
+            if not all(r["views"] for r in reports):
+                failures.append(f"{mode}/{n}: table arrays are not views into the block")
+            if n > 1 and any(r["mapping"]["private"] or not r["mapping"]["shared"] for r in reports):
+                failures.append(f"{mode}/{n}: block pages are not shared")
+        # Attached workers hold only object headers and axis locators, less than a built table
+        if max(r["heap"] for r in results["shared"]) >= min(r["heap"] for r in results["build"]):
+            failures.append(f"shared/{n}: an attached worker holds as much heap as a built table")
+
+    for failure in failures:
+        print("  FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# benchmarks/bench_sobol.py
+# Sobol indices of ZNTOL: run time with one process and with a pool.
+#
+#   python benchmarks/bench_sobol.py --samples 1000000 --processes 4
+#
+# The analysis must give identical indices with one process and with
+# --processes, or the run exits non-zero. tests/test_sobol.py checks the
+# estimators against the analytic Ishigami indices.
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+from zntol.sobol import INPUTS  # noqa: E402
+
+# Route families: (ISA, MSA, fuel burn) boxes
+FAMILIES = {
+    "low, cold to warm": [[-15, 15], [8000, 16000], [200, 1500]],
+    "mid": [[-10, 20], [12000, 22000], [500, 2500]],
+    "high, cold": [[-20, 0], [18000, 26000], [800, 3000]],
+    "high, hot": [[10, 30], [18000, 26000], [800, 3000]],
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+
+    bounds = list(FAMILIES.values())
+    evaluations = len(bounds) * args.samples * (len(INPUTS) + 2)
+    t0 = time.perf_counter()
+    result = zntol.sobol_analysis(bounds, samples=args.samples, processes=1)
+    t_one = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    parallel = zntol.sobol_analysis(bounds, samples=args.samples, processes=args.processes,
+                                    chunk_size=max(1, evaluations // (4 * args.processes)))
+    t_par = time.perf_counter() - t0
+    failures = sum(not np.array_equal(result[name], parallel[name], equal_nan=True) for name in result)
+
+    for k, family in enumerate(FAMILIES):
+        cells = ", ".join(f"{name} S1 {result['first'][k, i]:.3f}±{result['first_conf'][k, i]:.3f} "
+                          f"ST {result['total'][k, i]:.3f}±{result['total_conf'][k, i]:.3f}"
+                          for i, name in enumerate(INPUTS))
+        print(f"{family}: {cells}")
+    print(f"{evaluations:,} evaluations: 1 process {t_one:.1f} s, {args.processes} processes {t_par:.1f} s, "
+          f"{failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
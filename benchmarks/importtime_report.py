@@ -0,0 +1,97 @@
+# benchmarks/importtime_report.py
+# Startup profile of the engine from `python -X importtime`.
+#
+#   python benchmarks/importtime_report.py                  # rebuild path
+#   python benchmarks/importtime_report.py --table t.bin    # compiled artifact, no SciPy
+#   python benchmarks/importtime_report.py --max-ms 400 --forbid scipy streamlit
+#
+# Runs `import zntol; zntol.get_table()` in a fresh interpreter, prints the
+# slowest top-level packages by cumulative import time, and exits non-zero when
+# the total is over --max-ms or a --forbid package was imported.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = "import zntol; zntol.get_table()"
+
+
+def importtime(env: dict) -> list:
+    # [(self_us, cumulative_us, module)] in the order Python reports them
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()[1:]))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--table", help="compiled artifact to load via ZNTOL_TABLE")
+    parser.add_argument("--compile", action="store_true", help="compile an artifact to a temp file and profile loading it")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, help="fail when total import time exceeds this")
+    parser.add_argument("--forbid", nargs="*", default=[], help="fail when any of these packages is imported")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop("ZNTOL_TABLE", None)
+    tmp = None
+    if args.compile:
+        sys.path.insert(0, str(ROOT))
+        import zntol
+
+        tmp = tempfile.NamedTemporaryFile(suffix=".bin", delete=False)
+        tmp.close()
+        zntol.compile_table(zntol.build_table(), tmp.name)
+        args.table = tmp.name
+    if args.table:
+        env["ZNTOL_TABLE"] = str(Path(args.table).resolve())
+
+    try:
+        rows = importtime(env)
+    finally:
+        if tmp:
+            os.unlink(tmp.name)
+
+    # Top-level imports are the unindented names; their cumulative time covers
+    # everything they pulled in
+    packages = defaultdict(int)
+    for _, cumulative_us, name in rows:
+        if not name.startswith(" "):
+            packages[name.split(".")[0]] += cumulative_us
+    total_us = sum(packages.values())
+    imported = {name.strip().split(".")[0] for _, _, name in rows}
+
+    print(f"probe: {PROBE}" + (f"  (ZNTOL_TABLE={args.table})" if args.table else ""))
+    print(f"{'package':<28}{'cumulative ms':>14}{'share':>8}")
+    for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{name:<28}{us / 1e3:>14.1f}{us / total_us:>8.1%}")
+    print(f"{'total':<28}{total_us / 1e3:>14.1f}")
+    print("scipy imported:", "scipy" in imported)
+
+    failed = False
+    for name in args.forbid:
+        if name in imported:
+            print(f"FAIL: {name} was imported")
+            failed = True
+    if args.max_ms is not None and total_us / 1e3 > args.max_ms:
+        print(f"FAIL: total import time over {args.max_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
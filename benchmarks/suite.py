@@ -0,0 +1,305 @@
+# benchmarks/suite.py
+# Benchmark suite for the ZNTOL engine, with a stored baseline.
+#
+#   python benchmarks/suite.py                       # run, write results, compare
+#   python benchmarks/suite.py --quick               # batch sizes up to 1e6 only
+#   python benchmarks/suite.py --update-baseline     # accept results as the new baseline
+#
+# Results are written as JSON (benchmarks/results.json by default) and compared
+# with benchmarks/baseline.json; any metric worse than the baseline by more
+# than --tolerance fails the run.
+#
+# Timings are compared relative to the host. Every timing repeat is preceded
+# by a run of a fixed calibration loop (CALIBRATION: NumPy-bound for batch.*,
+# interpreter-bound for the rest), and the loop's best time is stored with the
+# metric. A timing is scaled by how much slower or faster its loop ran than
+# when the baseline was recorded (the median over all metrics on that loop);
+# memory metrics are not scaled. So a baseline taken on another machine gates
+# code changes rather than hardware. Load that comes and goes within a run is
+# only partly compensated: on a shared host, rerun a failing run before
+# bisecting.
+#
+# Regenerate the baseline with --update-baseline on an otherwise idle machine,
+# in the same commit as any change that adds a metric, changes a measured path
+# or changes CALIBRATION, so new metrics are gated from the start.
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from bisect import bisect_right
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+import zntol  # noqa: E402
+from bench_import import measure as measure_import  # noqa: E402
+
+BASELINE = HERE / "baseline.json"
+RESULTS = HERE / "results.json"
+
+# One representative input per calculate_zntol branch
+BRANCHES = {
+    "structural_limit": (-5.0, 12000.0, 2000.0),
+    "structural_blend": (1.5, 12000.0, 2000.0),
+    "warm_low_msa": (10.0, 12000.0, 2000.0),
+    "interpolation_2d": (10.0, 21000.0, 2000.0),
+    "cold_high_pulldown": (-15.0, 23000.0, 2000.0),
+}
+
+BATCH_SIZES = [10 ** k for k in range(3, 8)]
+
+
+# ────────────────────────────────────────────────
+# Host calibration
+# ────────────────────────────────────────────────
+def _python_loop() -> float:
+    # Float arithmetic, list indexing and a bisect, like the scalar engine
+    xs = [float(k) for k in range(64)]
+    total = 0.0
+    for k in range(2000):
+        x = (k % 630) / 10.0
+        i = bisect_right(xs, x) - 1
+        total += xs[i] * 0.5 + (x - xs[i]) * 1.5
+    return total
+
+
+_CAL_X = np.random.default_rng(42).uniform(0, 1, 1_000_000)
+_CAL_I = np.random.default_rng(43).integers(0, 1_000_000, 1_000_000)
+
+
+def _numpy_loop() -> np.ndarray:
+    # Elementwise arithmetic, a gather and a select over 1M rows, like a batch
+    x = _CAL_X
+    y = x.take(_CAL_I) * 3.0 + x * x
+    return np.where(y > 1.0, np.minimum(y, 2.0), y - x)
+
+
+# One run of each calibration loop, in ms (about 10 and 20 ms here, close to
+# one timing repeat of the cases they calibrate)
+CALIBRATION = {
+    "python": lambda: timeit.timeit(_python_loop, number=20) * 1e3,
+    "numpy": lambda: timeit.timeit(_numpy_loop, number=1) * 1e3,
+}
+
+
+def timed(fn, number: int, repeat: int = 5, loop: str = "python") -> tuple:
+    # (seconds per call, calibration ms), each the fastest of its repeats.
+    # Calibration runs are interleaved with the timings, so both minimums come
+    # from the same stretch of time on the host.
+    times, calibrations = [], []
+    for _ in range(repeat):
+        calibrations.append(CALIBRATION[loop]())
+        times.append(timeit.timeit(fn, number=number) / number)
+    return min(times), min(calibrations)
+
+
+def host_factors(results: dict, baseline: dict) -> dict:
+    # Per calibration loop, how much slower (> 1) the host ran it than when the
+    # baseline was recorded: the median over the metrics timed with that loop,
+    # since one calibration can land in a burst of load on its own. 1 when no
+    # metric has a calibration in both runs (e.g. a baseline from before
+    # calibration).
+    ratios = {"python": [], "numpy": []}
+    for name, current in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base and current.get("calibration") and base.get("calibration"):
+            ratios[calibration_loop(name)].append(current["calibration"] / base["calibration"])
+    return {loop: float(np.median(r)) if r else 1.0 for loop, r in ratios.items()}
+
+
+def calibration_loop(name: str) -> str:
+    return "numpy" if name.startswith("batch.") else "python"
+
+
+def scenarios(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-20, 30, n), rng.uniform(8000, 26000, n), rng.uniform(0, 6000, n)
+
+
+# ────────────────────────────────────────────────
+# Cases: each returns {metric: (value, unit, better, calibration ms or None)}
+# ────────────────────────────────────────────────
+def bench_scalar(number: int) -> dict:
+    table = zntol.get_table()
+    metrics = {}
+    for branch, (isa_dev, msa, fuel_burn) in BRANCHES.items():
+        t, cal = timed(lambda: zntol.calculate_zntol(isa_dev, msa, fuel_burn, table), number)
+        metrics[f"scalar.{branch}"] = (t * 1e6, "us", "lower", cal)
+    return metrics
+
+
+def bench_cache(number: int) -> dict:
+    # Miss: a fresh input on every call; hit: the same input repeated
+    def per_call_us(fn, n: int = number) -> tuple:
+        t, cal = timed(fn, n)
+        return t * 1e6, "us", "lower", cal
+
+    metrics = {}
+    lookup = zntol.get_lookup()
+    metrics["cache.dense_lookup_hit"] = per_call_us(lambda: lookup.calculate(10.0, 21000.0, 2000.0))
+    # Engine obstacle-weight cache: a new fuel value per call still hits
+    table = zntol.get_table()
+    fuel = itertools.count(1000.0, 0.5)
+    metrics["cache.obstacle_hit"] = per_call_us(lambda: zntol.calculate_zntol(10.0, 21000.0, next(fuel), table))
+    isa = itertools.count(-20.0, 1e-7)
+    metrics["cache.obstacle_miss"] = per_call_us(lambda: zntol.calculate_zntol(next(isa), 21000.0, 2000.0, table))
+    results = zntol.ResultCache(maxsize=1024)
+    results(10.0, 21000.0, 2000.0)
+    metrics["cache.result_hit"] = per_call_us(lambda: results(10.0, 21000.0, 2000.0))
+    try:
+        import streamlit as st
+        from streamlit import logger as streamlit_logger
+    except ImportError:
+        return metrics
+
+    streamlit_logger.set_log_level("error")
+    cached = st.cache_data(zntol.calculate_zntol)
+    cached(10.0, 21000.0, 2000.0)
+    metrics["cache.st_cache_data_hit"] = per_call_us(lambda: cached(10.0, 21000.0, 2000.0))
+    fuel = itertools.count(1000.0, 0.5)
+    metrics["cache.st_cache_data_miss"] = per_call_us(lambda: cached(10.0, 21000.0, next(fuel)), min(number, 2000))
+    cached.clear()
+    return metrics
+
+
+def bench_tables(repeat: int = 5) -> dict:
+    import tempfile
+
+    def once_ms(fn) -> tuple:
+        t, cal = timed(fn, 1, repeat)
+        return t * 1e3, "ms", "lower", cal
+
+    metrics = {}
+    metrics["tables.build_table"] = once_ms(zntol.build_table)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "table.bin"
+        zntol.compile_table(zntol.build_table(), path)
+        metrics["tables.load_artifact"] = once_ms(lambda: zntol.load_artifact(path))
+    metrics["tables.dense_lookup_build"] = once_ms(lambda: zntol.DenseLookup(zntol.get_table()))
+    return metrics
+
+
+def bench_import(repeat: int = 5) -> dict:
+    # Fresh interpreters, interleaved with calibration runs as in timed()
+    calibrations, runs = [], []
+    for _ in range(repeat):
+        calibrations.append(CALIBRATION["python"]())
+        runs.append(measure_import(repeat=1))
+    result, cal = min(runs, key=lambda r: r["import_s"]), min(calibrations)
+    return {
+        "import.zntol": (result["import_s"] * 1e3, "ms", "lower", cal),
+        "import.first_get_table": (result["first_table_s"] * 1e3, "ms", "lower", cal),
+    }
+
+
+def bench_batch(sizes: list) -> dict:
+    table = zntol.get_table()
+    metrics = {}
+    for n in sizes:
+        isa_dev, msa, fuel_burn = scenarios(n)
+        number = max(1, 1_000_000 // n)
+        t, cal = timed(lambda: zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table), number, repeat=3,
+                       loop="numpy")
+        metrics[f"batch.rows_per_s.{n:.0e}"] = (n / t, "rows/s", "higher", cal)
+    return metrics
+
+
+def bench_memory(n: int) -> dict:
+    table = zntol.get_table()
+    isa_dev, msa, fuel_burn = scenarios(n)
+    tracemalloc.start()
+    zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        f"memory.batch_peak_mib.{n:.0e}": (peak / 2 ** 20, "MiB", "lower", None),
+        f"memory.batch_peak_bytes_per_row.{n:.0e}": (peak / n, "B/row", "lower", None),
+    }
+
+
+# ────────────────────────────────────────────────
+# Baseline comparison
+# ────────────────────────────────────────────────
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    # Changes are after scaling timings to the baseline host (see
+    # host_factors); "host" is the factor used, 1 for memory metrics
+    factors = host_factors(results, baseline)
+    regressions = []
+    print(f"\n{'metric':<44}{'baseline':>14}{'current':>14}{'host':>7}{'change':>9}")
+    for name, current in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:<44}{'-':>14}{current['value']:>14.4g}{'':>7}{'new':>9}")
+            continue
+        factor = factors[calibration_loop(name)] if current.get("calibration") else 1.0
+        value = current["value"] * factor if current["better"] == "higher" else current["value"] / factor
+        change = value / base["value"] - 1 if base["value"] else 0.0
+        worse = change > tolerance if current["better"] == "lower" else change < -tolerance
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<44}{base['value']:>14.4g}{current['value']:>14.4g}{factor:>7.2f}{change:>+9.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, default=RESULTS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown after host calibration (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="batch sizes up to 1e6 rows")
+    parser.add_argument("--number", type=int, default=20000, help="calls per scalar timing")
+    args = parser.parse_args()
+
+    sizes = [n for n in BATCH_SIZES if not args.quick or n <= 1_000_000]
+    zntol.get_table()
+
+    raw = {}
+    for step, case in (
+        ("import", bench_import),
+        ("tables", bench_tables),
+        ("scalar", lambda: bench_scalar(args.number)),
+        ("cache", lambda: bench_cache(args.number)),
+        ("batch", lambda: bench_batch(sizes)),
+        ("memory", lambda: bench_memory(1_000_000)),
+    ):
+        t0 = time.perf_counter()
+        raw.update(case())
+        print(f"{step:<8} done in {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+
+    results = {
+        "machine": {"python": platform.python_version(), "numpy": np.__version__,
+                    "platform": platform.platform(), "processor": platform.processor()},
+        "table_version": zntol.get_table().version,
+        "metrics": {name: {"value": value, "unit": unit, "better": better, "calibration": calibration}
+                    for name, (value, unit, better, calibration) in raw.items()},
+    }
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
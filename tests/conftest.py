@@ -0,0 +1,29 @@
+# tests/conftest.py
+# Shared fixtures; the tests import zntol from the repository root
+#
+#   python -m pytest -q tests
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import zntol  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def table():
+    return zntol.get_table()
+
+
+@pytest.fixture
+def private_blocks():
+    # Returns a function listing this process's private shared-memory blocks
+    # (see shm.private_name); POSIX shared memory shows up in /dev/shm
+    from zntol.shm import NAME_PREFIX
+
+    shm = Path("/dev/shm")
+    prefix = f"{NAME_PREFIX}{os.getpid()}_"
+    return lambda: {p.name for p in shm.glob(prefix + "*")} if shm.is_dir() else set()
@@ -0,0 +1,38 @@
+# tests/test_aio.py
+# Async evaluation matches the batch engine, and chunks from different table
+# versions are never joined
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.aio import _join, calculate_zntol_batch_async, evaluate_async
+
+
+def test_async_matches_batch(table):
+    rng = np.random.default_rng(0)
+    isa_dev, msa, fuel_burn = rng.uniform(-25, 35, 1000), rng.uniform(7000, 27000, 1000), rng.uniform(0, 4000, 1000)
+    result = asyncio.run(calculate_zntol_batch_async(isa_dev, msa, fuel_burn, chunk_size=300, table=table))
+    expected = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    for name, column in expected.items():
+        assert np.array_equal(result[name], column) if name != "table_version" else result[name] == column
+
+    async def rows():
+        for row in zip(isa_dev.tolist(), msa.tolist(), fuel_burn.tolist()):
+            yield row
+
+    async def collect():
+        return [part async for part in evaluate_async(rows(), chunk_size=300, table=table)]
+
+    parts = asyncio.run(collect())
+    assert [len(p["zntol"]) for p in parts] == [300, 300, 300, 100]
+    assert np.array_equal(np.concatenate([p["zntol"] for p in parts]), expected["zntol"])
+
+
+def test_join_refuses_mixed_versions():
+    part = {"zntol": np.zeros(2, dtype=np.int64), "table_version": "a"}
+    assert _join([part, part], (4,))["table_version"] == "a"
+    with pytest.raises(RuntimeError):
+        _join([part, {**part, "table_version": "b"}], (4,))
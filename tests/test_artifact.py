@@ -0,0 +1,72 @@
+# tests/test_artifact.py
+# Compiled table artifacts: round trip, and damaged files rejected with
+# ArtifactError so get_table() rebuilds instead of crashing
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol import tables
+from zntol.artifact import MAGIC, to_bytes
+
+
+@pytest.fixture(scope="module")
+def blob(table):
+    return to_bytes(table)
+
+
+def test_round_trip(table, tmp_path):
+    path = tmp_path / "table.bin"
+    assert zntol.compile_table(table, path) == table.version
+    loaded = zntol.load_artifact(path)
+    assert loaded.version == table.version and loaded.source_hash == table.source_hash
+    assert np.array_equal(loaded.weight_grid, table.weight_grid)
+    assert loaded.constants == table.constants
+
+
+def test_truncated(blob, tmp_path):
+    path = tmp_path / "table.bin"
+    for size in sorted({0, 4, len(MAGIC), len(MAGIC) + 2, len(MAGIC) + 4, 100, *range(0, len(blob), 97),
+                        len(blob) - 1}):
+        path.write_bytes(blob[:size])
+        with pytest.raises(zntol.ArtifactError):
+            zntol.load_artifact(path)
+
+
+def header_with(blob: bytes, change) -> bytes:
+    # blob with its JSON header edited by change(header), padded to the same length
+    start = len(MAGIC) + 4
+    (length,) = struct.unpack_from("<I", blob, len(MAGIC))
+    header = json.loads(blob[start:start + length])
+    head = json.dumps(change(header)).encode()
+    assert len(head) <= length
+    return blob[:start] + head.ljust(length) + blob[start + length:]
+
+
+@pytest.mark.parametrize("change", [
+    lambda h: [],
+    lambda h: {k: v for k, v in h.items() if k != "arrays"},
+    lambda h: {k: v for k, v in h.items() if k != "version"},
+    lambda h: {**h, "constants": 1},
+    lambda h: {**h, "arrays": {**h["arrays"], "cells": {**h["arrays"]["cells"], "shape": ["x"]}}},
+    lambda h: {**h, "arrays": {**h["arrays"], "isa_grid": {**h["arrays"]["isa_grid"], "offset": -64}}},
+    lambda h: {**h, "arrays": {**h["arrays"], "msa_grid": {"dtype": "<f8"}}},
+])
+def test_malformed_header(blob, tmp_path, change):
+    path = tmp_path / "table.bin"
+    path.write_bytes(header_with(blob, change))
+    with pytest.raises(zntol.ArtifactError):
+        zntol.load_artifact(path)
+
+
+def test_damaged_default_artifact_is_rebuilt(table, blob, tmp_path, monkeypatch):
+    path = tmp_path / "zntol_table.bin"
+    monkeypatch.setattr(tables, "DEFAULT_ARTIFACT", path)
+    monkeypatch.delenv("ZNTOL_TABLE", raising=False)
+    monkeypatch.delenv("ZNTOL_DATA", raising=False)
+    for data in (blob[:len(blob) // 2], blob[:len(MAGIC) + 2], header_with(blob, lambda h: {"format": 3})):
+        path.write_bytes(data)
+        assert tables.load_table().version == table.version
@@ -0,0 +1,31 @@
+# tests/test_bulk.py
+# evaluate_bulk matches calculate_zntol_batch in input order and cleans up
+# its shared memory
+
+import numpy as np
+import pytest
+
+import zntol
+
+
+def inputs(n: int = 5000) -> tuple:
+    rng = np.random.default_rng(0)
+    return rng.uniform(-25, 35, n), rng.uniform(7000, 27000, n), rng.uniform(-100, 4000, n)
+
+
+@pytest.mark.parametrize("processes, chunk_size", [(1, 1000), (2, 1000), (3, 777)])
+def test_bulk_matches_batch(table, private_blocks, processes, chunk_size):
+    before = private_blocks()
+    result = zntol.evaluate_bulk(*inputs(), processes=processes, chunk_size=chunk_size, table=table)
+    expected = zntol.calculate_zntol_batch(*inputs(), table=table)
+    assert result.keys() == expected.keys()
+    for name, column in expected.items():
+        assert np.array_equal(result[name], column) if name != "table_version" else result[name] == column
+    assert private_blocks() == before
+
+
+def test_bulk_checks_inputs():
+    with pytest.raises(ValueError):
+        zntol.evaluate_bulk([1.0, 2.0], [15000.0], [0.0, 0.0])
+    with pytest.raises(ValueError):
+        zntol.evaluate_bulk([1.0], [15000.0], [0.0], chunk_size=0)
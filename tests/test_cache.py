@@ -0,0 +1,64 @@
+# tests/test_cache.py
+# ResultCache: range checks on the raw inputs, lattice keys, exact
+# evaluation off the lattice
+
+import math
+
+import pytest
+
+import zntol
+
+
+@pytest.fixture
+def cache():
+    return zntol.ResultCache(maxsize=4)
+
+
+@pytest.mark.parametrize("args, error", [
+    ((-20.04, 15000, 0), 1),  # rounds to -20.0, but is out of range
+    ((30.04, 15000, 0), 1),
+    ((10, 26049, 0), 2),  # rounds to 26,000 ft
+    ((10, 7951, 0), 2),
+    ((10, 15000, -0.4), 3),
+])
+def test_range_errors_on_raw_inputs(cache, args, error):
+    assert dict(cache.calculate(*args)) == {"error": zntol.ERRORS[error]}
+    assert zntol.calculate_zntol(*args)["error"] == zntol.ERRORS[error]
+    assert cache.cache_info().currsize == 0
+
+
+def test_off_lattice_evaluated_exactly(cache):
+    # 2.04 °C would round to 2.0, across the end of the early-drop blend
+    result = cache.calculate(2.04, 15000, 0)
+    assert dict(result) == zntol.calculate_zntol(2.04, 15000, 0)
+    assert result["zntol"] == 26147
+    assert cache.calculate(2.0, 15000, 0)["zntol"] == 26300
+    assert cache.cache_info().currsize == 1
+
+
+def test_lattice_noise_shares_an_entry(cache):
+    first = cache.calculate(0.1 + 0.2, 15000, 500)
+    assert cache.calculate(0.3, 15000.0, 500.0) is first
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert dict(first) == zntol.calculate_zntol(0.3, 15000, 500)
+
+
+def test_eviction(cache):
+    for k in range(6):
+        cache.calculate(float(k), 15000, 0)
+    info = cache.cache_info()
+    assert (info.currsize, info.evictions) == (4, 2)
+    cache.clear()
+    assert cache.cache_info().currsize == 0
+
+
+def test_results_are_read_only(cache):
+    with pytest.raises(TypeError):
+        cache.calculate(10, 15000, 0)["zntol"] = 0
+
+
+def test_not_finite(cache):
+    assert dict(cache.calculate(math.nan, 15000, 0)) == zntol.calculate_zntol(math.nan, 15000, 0)
+    assert dict(cache.calculate(10, 15000, math.inf)) == {"error": zntol.ERRORS[5]}
+    assert cache.cache_info().currsize == 0
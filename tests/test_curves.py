@@ -0,0 +1,59 @@
+# tests/test_curves.py
+# The compiled ZNTOL-vs-ISA curves against evaluate_routes
+
+import numpy as np
+import pytest
+
+import zntol
+from test_routes import routes
+from zntol.curves import LATTICE, STEP_ISA
+
+
+@pytest.fixture(scope="module")
+def compiled(table):
+    _, msa, fuel_burn, offsets = routes()
+    return zntol.compile_curves(msa, fuel_burn, offsets, table=table), msa, fuel_burn, offsets
+
+
+def test_curves_exact_on_lattice(table, compiled):
+    curves, msa, fuel_burn, offsets = compiled
+    everyone = np.arange(len(curves))
+    for isa_dev in LATTICE[::5]:
+        expected = zntol.evaluate_routes(np.full(len(msa), isa_dev), msa, fuel_burn, offsets, table=table)
+        got = curves.evaluate(everyone, isa_dev)
+        assert np.array_equal(got["zntol"], expected["zntol"])
+        assert np.array_equal(got["error"], expected["error"])
+
+
+@pytest.mark.parametrize("low, high", [(-20, 30), (STEP_ISA, STEP_ISA + 0.1)])
+def test_curves_never_overestimate(table, compiled, low, high):
+    # Off the lattice the curve is linear between knots and must stay at or
+    # below the route ZNTOL, including just above the +2 °C blend step
+    curves, msa, fuel_burn, offsets = compiled
+    rng = np.random.default_rng(1)
+    sample = rng.integers(0, len(curves), 2000)
+    isa_dev = rng.uniform(low, high, 2000)
+    rows = np.concatenate([np.arange(offsets[r], offsets[r + 1]) for r in sample])
+    lengths = offsets[sample + 1] - offsets[sample]
+    sub_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    expected = zntol.evaluate_routes(np.repeat(isa_dev, lengths), msa[rows], fuel_burn[rows], sub_offsets,
+                                     table=table)
+    assert (curves.evaluate(sample, isa_dev)["zntol"] <= expected["zntol"]).all()
+
+
+def test_curves_isa_errors(compiled):
+    curves = compiled[0]
+    isa_dev = [zntol.MIN_ISA - 0.1, zntol.MAX_ISA + 0.1, np.nan]
+    result = curves.evaluate([0, 1, 2], isa_dev)
+    assert result["error"].tolist() == [1, 1, 5]
+    assert result["zntol"].tolist() == [0, 0, 0]
+
+
+def test_stale_curves_are_rebuilt(table, compiled, tmp_path):
+    curves = compiled[0]
+    path = tmp_path / "routes.bin"
+    curves.save(path)
+    assert zntol.load_curves(path, table=table).table_version == table.version
+    changed = zntol.ZntolTable(table.isa_grid, table.msa_grid, np.asarray(table.weight_grid) - 1.0)
+    assert zntol.load_curves(path, table=changed).table_version == changed.version
+    assert zntol.load_curves(path, table=changed).table_version == changed.version
@@ -0,0 +1,46 @@
+# tests/test_import.py
+# import zntol stays headless and cheap: no Streamlit, no SciPy (only needed
+# to build a table from source), within the cold-start budget of
+# benchmarks/bench_import.py
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET = 1.0  # seconds, best of REPEAT fresh interpreters
+REPEAT = 3
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import zntol
+t1 = time.perf_counter()
+zntol.get_table()
+zntol.calculate_zntol(10, 15000, 500)
+zntol.calculate_zntol_batch([10], [15000], [500])
+print(json.dumps({"import_s": t1 - t0, "modules": sorted(sys.modules)}))
+"""
+
+
+def probe() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def imported(modules: list, package: str) -> bool:
+    return any(m.split(".")[0] == package for m in modules)
+
+
+def test_import_is_headless():
+    assert not imported(probe()["modules"], "streamlit")
+
+
+def test_import_budget():
+    assert min(probe()["import_s"] for _ in range(REPEAT)) < BUDGET
+
+
+def test_import_skips_scipy():
+    # The kernel replaces the spline, and the grid is filled without interp1d
+    assert not imported(probe()["modules"], "scipy")
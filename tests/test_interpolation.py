@@ -0,0 +1,54 @@
+# tests/test_interpolation.py
+# The bilinear kernel matches RectBivariateSpline bit for bit (see
+# zntol/interpolation.py); benchmarks/bench_bilinear.py runs the dense check
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.interpolation import CELL_DTYPE
+
+
+def points(table) -> tuple:
+    # Every knot, the doubles either side of it, cell interiors and points
+    # outside the grid
+    x = np.union1d(np.linspace(-21, 31, 105),
+                   np.concatenate([np.nextafter(table.isa_grid, d) for d in (-np.inf, 0, np.inf)]))
+    y = np.union1d(np.linspace(7900, 26100, 183),
+                   np.concatenate([np.nextafter(table.msa_grid, d) for d in (-np.inf, 0, np.inf)]))
+    return tuple(a.ravel() for a in np.meshgrid(x, y, indexing="ij"))
+
+
+def test_batch_matches_spline(table):
+    pytest.importorskip("scipy")
+    x, y = points(table)
+    assert np.array_equal(table.kernel.batch(x, y), table.spline.ev(x, y))
+
+
+def test_scalar_matches_spline(table):
+    pytest.importorskip("scipy")
+    x, y = points(table)
+    sample = np.random.default_rng(0).integers(0, len(x), 2000)
+    for k in sample:
+        assert table.kernel.scalar(float(x[k]), float(y[k])) == table.spline(x[k], y[k])[0, 0]
+
+
+def test_call_dispatch(table):
+    assert table.kernel(12.3, 21300.0) == table.kernel.scalar(12.3, 21300.0)
+    assert np.array_equal(table.kernel([12.3, -4.0], [21300.0, 9000.0]),
+                          table.kernel.batch([12.3, -4.0], [21300.0, 9000.0]))
+
+
+def test_cells(table):
+    cells = table.kernel.cells
+    assert cells.dtype == CELL_DTYPE and cells.flags.c_contiguous
+    assert cells.shape == (len(table.isa_grid) - 1, len(table.msa_grid) - 1)
+    z = np.asarray(table.weight_grid)
+    assert np.array_equal(cells["z01"], z[:-1, 1:]) and np.array_equal(cells["z10"], z[1:, :-1])
+
+
+def test_artifact_kernel_matches_built(table, tmp_path):
+    path = tmp_path / "table.bin"
+    zntol.compile_table(table, path)
+    x, y = points(table)
+    assert np.array_equal(zntol.load_artifact(path).kernel.batch(x, y), table.kernel.batch(x, y))
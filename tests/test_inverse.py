@@ -0,0 +1,73 @@
+# tests/test_inverse.py
+# Inverse solvers against a brute-force scan of the forward engine, as in
+# benchmarks/bench_inverse.py on a smaller sample
+
+import numpy as np
+
+import zntol
+from zntol.limits import obstacle_weight_batch
+
+
+def zntol_unrounded(isa_dev, msa, fuel_burn, table) -> tuple:
+    isa_dev, msa = np.broadcast_arrays(np.atleast_1d(np.asarray(isa_dev, dtype=float)),
+                                       np.atleast_1d(np.asarray(msa, dtype=float)))
+    w, source = obstacle_weight_batch(isa_dev, msa - 1000, table)
+    return np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW), source
+
+
+def test_max_msa_matches_scan(table):
+    rng = np.random.default_rng(1)
+    isa_dev = np.round(rng.uniform(-20, 30, 200), 1)
+    fuel_burn = np.round(rng.uniform(0, 4000, 200))
+    takeoff_weight = np.round(rng.uniform(12000, 27000, 200))
+    result = zntol.solve_max_msa(isa_dev, fuel_burn, takeoff_weight, table)
+    msa = np.arange(zntol.MIN_MSA, zntol.MAX_MSA + 1, dtype=float)
+    for q in range(len(isa_dev)):
+        z, _ = zntol_unrounded(isa_dev[q], msa, fuel_burn[q], table)
+        feasible = msa[z >= takeoff_weight[q] - 1e-6]
+        answer = result["max_msa"][q]
+        if not len(feasible):
+            assert np.isnan(answer)
+            continue
+        z_at, source_at = zntol_unrounded(isa_dev[q], answer, fuel_burn[q], table)
+        assert feasible[-1] <= answer < feasible[-1] + 1
+        assert z_at[0] >= takeoff_weight[q] - 1e-6
+        assert source_at[0] == result["source"][q]
+
+
+def test_max_msa_errors(table):
+    result = zntol.solve_max_msa([35.0, 10.0], [0.0, -1.0], [20000.0, 20000.0], table)
+    assert result["error"].tolist() == [1, 3]
+    assert np.isnan(result["max_msa"]).all()
+
+
+def test_max_isa_matches_scan(table):
+    rng = np.random.default_rng(2)
+    msa = np.round(rng.uniform(zntol.MIN_MSA, zntol.MAX_MSA, 200), -2)
+    fuel_burn = np.round(rng.uniform(0, 4000, 200))
+    takeoff_weight = np.round(rng.uniform(12000, 27000, 200))
+    result = zntol.solve_max_isa(msa, fuel_burn, takeoff_weight, table)
+    step = 0.001
+    isa = np.linspace(zntol.MIN_ISA, zntol.MAX_ISA, 50001)
+    for q in range(len(msa)):
+        z, _ = zntol_unrounded(isa, msa[q], fuel_burn[q], table)
+        legal = z >= takeoff_weight[q] - 1e-6
+        top, bottom = result["max_isa"][q], result["min_isa"][q]
+        if not legal.any():
+            assert np.isnan(top)
+            continue
+        last = np.flatnonzero(legal)[-1]
+        illegal_below = np.flatnonzero(~legal[:last])
+        first = illegal_below[-1] + 1 if len(illegal_below) else 0
+        z_at, source_at = zntol_unrounded(top, msa[q], fuel_burn[q], table)
+        assert isa[last] - 1e-9 <= top < isa[last] + step
+        assert isa[first] - step < bottom <= isa[first] + 1e-9
+        assert bool(result["monotone"][q]) == (first == 0)
+        assert z_at[0] >= takeoff_weight[q] - 1e-6
+        assert source_at[0] == result["source"][q]
+
+
+def test_max_isa_errors(table):
+    result = zntol.solve_max_isa([30000.0, 15000.0], [0.0, -1.0], [20000.0, 20000.0], table)
+    assert result["error"].tolist() == [2, 3]
+    assert np.isnan(result["max_isa"]).all() and np.isnan(result["min_isa"]).all()
@@ -0,0 +1,97 @@
+# tests/test_limits.py
+# calculate_zntol and calculate_zntol_batch agree row for row, errors included
+
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.limits import check_inputs, check_inputs_batch, obstacle_weight
+
+
+def scenarios(n: int = 5000) -> tuple:
+    # Random inputs, some out of range, and the same count on the UI lattice
+    rng = np.random.default_rng(3)
+    isa_dev = np.concatenate([rng.uniform(-25, 35, n), np.round(rng.uniform(-20, 30, n), 1)])
+    msa = np.concatenate([rng.uniform(7000, 27000, n), np.round(rng.uniform(8000, 26000, n), -2)])
+    fuel_burn = np.concatenate([rng.uniform(-100, 6000, n), np.round(rng.uniform(0, 6000, n))])
+    return isa_dev, msa, fuel_burn
+
+
+def test_scalar_matches_batch(table):
+    isa_dev, msa, fuel_burn = scenarios()
+    batch = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    assert batch["table_version"] == table.version
+    for k in range(len(isa_dev)):
+        scalar = zntol.calculate_zntol(float(isa_dev[k]), float(msa[k]), float(fuel_burn[k]), table)
+        assert zntol.ERRORS[batch["error"][k]] == scalar["error"]
+        if scalar["error"]:
+            continue
+        assert (scalar["w_obstacle_max"], scalar["zntol"], scalar["capped"], scalar["source"],
+                scalar["effective_msa"]) == (batch["w_obstacle_max"][k], batch["zntol"][k], bool(batch["capped"][k]),
+                                             zntol.SOURCES[batch["source"][k]], batch["effective_msa"][k])
+
+
+def test_batch_keeps_shape(table):
+    isa_dev, msa, fuel_burn = (a[:12].reshape(3, 4) for a in scenarios())
+    batch = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    flat = zntol.calculate_zntol_batch(isa_dev.ravel(), msa.ravel(), fuel_burn.ravel(), table=table)
+    for name, column in flat.items():
+        if name != "table_version":
+            assert batch[name].shape == (3, 4)
+            assert np.array_equal(batch[name].ravel(), column)
+
+
+def test_check_inputs_batch_matches_scalar():
+    isa_dev, msa, fuel_burn = scenarios(2000)
+    codes = check_inputs_batch(isa_dev, msa, fuel_burn)
+    assert codes.dtype == np.int8
+    assert [zntol.ERRORS[c] for c in codes.tolist()] == [
+        check_inputs(*args) for args in zip(isa_dev.tolist(), msa.tolist(), fuel_burn.tolist())
+    ]
+
+
+@pytest.mark.parametrize("isa_dev, msa, fuel_burn, code", [
+    (zntol.MIN_ISA, zntol.MIN_MSA, 0, 0),
+    (zntol.MAX_ISA, zntol.MAX_MSA, 0, 0),
+    (np.nextafter(zntol.MIN_ISA, -np.inf), 15000, 0, 1),
+    (np.nextafter(zntol.MAX_ISA, np.inf), 15000, 0, 1),
+    (10, np.nextafter(zntol.MAX_MSA, np.inf), 0, 2),
+    (10, 15000, -1, 3),
+])
+def test_range_limits(isa_dev, msa, fuel_burn, code):
+    assert check_inputs_batch(np.array([isa_dev]), np.array([msa]), np.array([fuel_burn]))[0] == code
+    assert check_inputs(isa_dev, msa, fuel_burn) == zntol.ERRORS[code]
+
+
+@pytest.mark.parametrize("row", [
+    (math.nan, 15000, 0), (10, math.nan, 0), (10, 15000, math.nan), (10, 15000, math.inf),
+])
+def test_not_finite(table, row):
+    # A dedicated code with zeroed outputs, and no warnings from the casts
+    isa_dev, msa, fuel_burn = (np.array([v, good]) for v, good in zip(row, (10, 15000, 0)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        batch = zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    assert zntol.ERRORS[batch["error"][0]] == "Inputs must be finite numbers"
+    assert zntol.calculate_zntol(*row, table) == {"error": "Inputs must be finite numbers"}
+    assert (batch["w_obstacle_max"][0], batch["zntol"][0], batch["capped"][0], batch["effective_msa"][0]) == (0, 0, 0, 0)
+    assert batch["source"][0] == -1
+    assert batch["error"][1] == 0
+    assert batch["zntol"][1] == zntol.calculate_zntol(10, 15000, 0, table)["zntol"]
+
+
+def test_obstacle_cache_ignores_fuel_burn(table):
+    # Every fuel burn for one obstacle and temperature shares an entry
+    zntol.obstacle_cache_clear()
+    results = [zntol.calculate_zntol(3.7, 16400, fuel_burn, table) for fuel_burn in (0, 250.5, 4000)]
+    info = zntol.obstacle_cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+    w_obstacle_max, source = obstacle_weight(3.7, 15400, table)
+    for result, fuel_burn in zip(results, (0, 250.5, 4000)):
+        assert result["zntol"] == round(min(w_obstacle_max + fuel_burn, zntol.STRUCTURAL_MTOW))
+        assert result["source"] == source
+    zntol.calculate_zntol(3.7, 16400, 0, zntol.ZntolTable(table.isa_grid, table.msa_grid, table.weight_grid - 1.0))
+    assert zntol.obstacle_cache_info().misses == 2
@@ -0,0 +1,58 @@
+# tests/test_lookup.py
+# DenseLookup answers like calculate_zntol on its 501 x 181 lattice and off it
+
+import math
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.lookup import DenseLookup
+
+
+@pytest.fixture(scope="module")
+def lookup(table):
+    return DenseLookup(table)
+
+
+def test_lattice_shape(lookup):
+    assert lookup.w_obstacle_max.shape == (501, 181)
+    assert (lookup.isa_axis[0], lookup.isa_axis[-1]) == (zntol.MIN_ISA, zntol.MAX_ISA)
+    assert (lookup.msa_axis[0], lookup.msa_axis[-1]) == (zntol.MIN_MSA, zntol.MAX_MSA)
+
+
+def test_every_lattice_node(table, lookup):
+    for fuel_burn in (0.0, 1234.0, 9000.0):  # 9000 lb reaches the structural cap
+        for isa_dev in lookup.isa_axis.tolist():
+            for msa in lookup.msa_axis.tolist():
+                assert lookup.index(isa_dev, msa) is not None
+                assert lookup.calculate(isa_dev, msa, fuel_burn) == zntol.calculate_zntol(isa_dev, msa, fuel_burn,
+                                                                                          table)
+
+
+def test_off_lattice_falls_back(table, lookup):
+    rng = np.random.default_rng(4)
+    for isa_dev, msa, fuel_burn in zip(rng.uniform(-20, 30, 5000).tolist(), rng.uniform(8000, 26000, 5000).tolist(),
+                                       rng.uniform(0, 4000, 5000).tolist()):
+        assert lookup.index(isa_dev, msa) is None
+        assert lookup.calculate(isa_dev, msa, fuel_burn) == zntol.calculate_zntol(isa_dev, msa, fuel_burn, table)
+
+
+@pytest.mark.parametrize("args", [
+    (-20.1, 15000, 0), (30.1, 15000, 0), (10, 7900, 0), (10, 26100, 0), (10, 15000, -1),
+])
+def test_out_of_range(lookup, args):
+    result = lookup.calculate(*args)
+    assert result["error"]
+    assert result == zntol.calculate_zntol(*args)
+
+
+def test_not_finite(lookup):
+    result = lookup.calculate(math.nan, 15000, 0)
+    assert result == zntol.calculate_zntol(math.nan, 15000, 0) == {"error": zntol.ERRORS[5]}
+
+
+def test_shared_lookup_follows_table(table):
+    assert zntol.get_lookup(table) is zntol.get_lookup(table)
+    changed = zntol.ZntolTable(table.isa_grid, table.msa_grid, np.asarray(table.weight_grid) - 1.0)
+    assert zntol.get_lookup(changed).version == changed.version
@@ -0,0 +1,40 @@
+# tests/test_montecarlo.py
+# Monte Carlo forecasts: the same result for any process count, and
+# out-of-range samples counted rather than dropped
+
+import numpy as np
+
+import zntol
+from zntol import montecarlo
+
+
+def test_independent_of_processes(table, monkeypatch, private_blocks):
+    monkeypatch.setattr(montecarlo, "CHUNK_SAMPLES", 2000)  # two chunks for these scenarios
+    args = ([0.0, 12.5, 28.0, 35.0], [15000, 20000, 9000, 15000], [500, 0, 1200, 0], 2.0)
+    options = dict(fuel_sigma=100.0, target=24000, samples=1000, seed=7, table=table)
+    before = private_blocks()
+    one = zntol.simulate(*args, processes=1, **options)
+    two = zntol.simulate(*args, processes=2, **options)
+    assert private_blocks() == before
+    for name in one:
+        assert np.array_equal(one[name], two[name], equal_nan=name != "error"), name
+    assert one["error"].tolist() == [0, 0, 0, 1]
+
+
+def test_out_of_range_samples(table):
+    # Near +30 °C a third or so of the samples have no ZNTOL: they count as
+    # below any target and stay out of the statistics unless clipped
+    result = zntol.simulate([29.0], [15000], [0], 3.0, target=0.0, samples=4000, table=table)
+    share = result["out_of_range"][0]
+    assert 0.3 < share < 0.45
+    assert result["p_below"][0] == share
+    assert np.isfinite(result["zntol_mean"][0])
+
+    clipped = zntol.simulate([29.0], [15000], [0], 3.0, target=0.0, samples=4000, clip=True, table=table)
+    assert clipped["out_of_range"][0] == share
+    assert clipped["p_below"][0] == 0.0
+
+
+def test_not_finite_forecast(table):
+    result = zntol.simulate([np.nan, 10.0], [15000, 15000], [0, 0], 2.0, samples=500, table=table)
+    assert result["error"].tolist() == [5, 0]
@@ -0,0 +1,50 @@
+# tests/test_reload.py
+# TableWatcher: a changed data file swaps the table, a bad one keeps it
+
+import json
+import os
+
+import pytest
+
+import zntol
+
+
+@pytest.fixture
+def data_file(table, tmp_path):
+    # Puts the session table back afterwards, so other tests still see it
+    path = tmp_path / "afm.json"
+    path.write_text(json.dumps(zntol.default_data()), encoding="utf-8")
+    yield path
+    zntol.set_table(table)
+
+
+def replace(path, data) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def test_reload_swaps_table(table, data_file):
+    published = []
+    watcher = zntol.TableWatcher(data_file, on_reload=published.append)
+    assert not watcher.check()  # same data as the current table
+    assert zntol.get_table().version == table.version
+
+    data = zntol.default_data()
+    data["tuning"]["BLEND_EXPONENT"] = 1.5
+    replace(data_file, data)
+    assert watcher.check()
+    new = zntol.get_table()
+    assert new.version != table.version and published == [new]
+    assert zntol.calculate_zntol(10, 15000, 500)["table_version"] == new.version
+    assert zntol.calculate_zntol(10, 15000, 500) == zntol.calculate_zntol(10, 15000, 500, zntol.build_table(data))
+    assert zntol.get_result_cache().calculate(10, 15000, 500)["table_version"] == new.version
+
+
+def test_bad_file_keeps_table(table, data_file):
+    watcher = zntol.TableWatcher(data_file)
+    watcher.check()
+    replace(data_file, json.dumps(zntol.default_data())[:-100])
+    assert not watcher.check()
+    assert watcher.error is not None
+    assert zntol.get_table().version == table.version
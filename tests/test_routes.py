@@ -0,0 +1,39 @@
+# tests/test_routes.py
+# Route profiles against per-obstacle calculate_zntol
+
+import numpy as np
+import pytest
+
+import zntol
+
+
+def routes(n_routes: int = 300, max_obstacles: int = 12, seed: int = 0) -> tuple:
+    # Ragged routes with cumulative fuel burn, as in benchmarks/bench_routes.py
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_obstacles + 1, n_routes)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    n = int(offsets[-1])
+    msa = np.round(rng.uniform(8000, 26000, n), -2)
+    isa_dev = np.repeat(np.round(rng.uniform(-20, 30, n_routes), 1), lengths) + np.round(rng.normal(0, 1, n), 1)
+    isa_dev = isa_dev.clip(-20, 30)
+    fuel_burn = np.concatenate([np.cumsum(rng.uniform(50, 300, k)) for k in lengths])
+    return isa_dev, msa, fuel_burn, offsets
+
+
+def test_routes_match_obstacle_loop(table):
+    isa_dev, msa, fuel_burn, offsets = routes()
+    result = zntol.evaluate_routes(isa_dev, msa, fuel_burn, offsets, table=table)
+    for r, (start, stop) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+        results = [zntol.calculate_zntol(isa_dev[k], msa[k], fuel_burn[k], table) for k in range(start, stop)]
+        limiting = min(range(len(results)), key=lambda k: results[k]["zntol"])
+        assert (result["limiting"][r], result["zntol"][r]) == (limiting, results[limiting]["zntol"])
+
+
+def test_route_errors(table):
+    # An empty route, and a route with one obstacle out of range
+    result = zntol.evaluate_routes(10.0, [15000, 15000, 30000], 0.0, [0, 0, 1, 3], table=table)
+    assert result["error"].tolist() == [zntol.ERRORS.index("Route has no obstacles"), 0, 2]
+    assert result["limiting"].tolist() == [-1, 0, -1]
+    assert zntol.evaluate_route(10.0, [15000, 30000], 0.0, table=table)["error"] == zntol.ERRORS[2]
+    with pytest.raises(ValueError):
+        zntol.evaluate_routes(10.0, [15000], 0.0, [0, 2], table=table)
@@ -0,0 +1,79 @@
+# tests/test_sensitivity.py
+# calculate_sensitivities against one-sided difference quotients of ZNTOL
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.limits import obstacle_weight_batch
+from zntol.sensitivity import MSA_BREAKS, isa_breaks
+
+STEP = 1e-7  # °C and ft
+TOLERANCE = 1e-3  # relative to max(1, |partial|)
+SIDES = (("d_isa_plus", 1, 0), ("d_isa_minus", -1, 0), ("d_msa_plus", 0, 1), ("d_msa_minus", 0, -1))
+
+
+def exact(isa_dev, msa, fuel_burn, table) -> np.ndarray:
+    # ZNTOL before rounding
+    effective = np.where(msa > 6000, msa - 1000, msa)
+    w, _ = obstacle_weight_batch(isa_dev, effective, table)
+    return np.minimum(w + fuel_burn, zntol.STRUCTURAL_MTOW)
+
+
+def quotients(isa_dev, msa, fuel_burn, table) -> dict:
+    # (f(v + 2h) - f(v + h)) / h on each side: neither point is v itself, so
+    # at a jump the quotient is the slope of the branch on that side
+    out = {}
+    for name, d_isa, d_msa in SIDES:
+        sign = d_isa + d_msa
+        near = exact(isa_dev + d_isa * STEP, msa + d_msa * STEP, fuel_burn, table)
+        far = exact(isa_dev + 2 * d_isa * STEP, msa + 2 * d_msa * STEP, fuel_burn, table)
+        out[name] = (far - near) / STEP * sign
+    return out
+
+
+def assert_close(result, expected):
+    for name, _, _ in SIDES:
+        np.testing.assert_allclose(result[name], expected[name], rtol=0,
+                                   atol=TOLERANCE * np.maximum(1, np.abs(result[name])).max())
+
+
+def test_random_points(table):
+    # Away from every knot and rule boundary, so each quotient stays in one piece
+    rng = np.random.default_rng(5)
+    isa_dev = rng.uniform(-20, 30, 20000)
+    msa = rng.uniform(8000, 26000, 20000)
+    fuel_burn = rng.choice([0.0, 500.0, 2000.0], 20000)
+    isa_edges = np.concatenate([table.isa_grid, isa_breaks(table)])
+    msa_edges = np.concatenate([table.msa_grid, MSA_BREAKS]) + 1000
+    far = ((np.abs(isa_dev[:, None] - isa_edges).min(axis=1) > 1e-5)
+           & (np.abs(msa[:, None] - msa_edges).min(axis=1) > 1e-5))
+    isa_dev, msa, fuel_burn = isa_dev[far], msa[far], fuel_burn[far]
+
+    result = zntol.calculate_sensitivities(isa_dev, msa, fuel_burn, table=table)
+    assert (result["error"] == 0).all()
+    assert not result["kink"].any()
+    assert np.array_equal(result["zntol"], zntol.calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)["zntol"])
+    assert_close(result, quotients(isa_dev, msa, fuel_burn, table))
+
+
+@pytest.mark.parametrize("isa_dev, msa", [
+    (2.0, 12000.5),   # end of the early blend drop
+    (3.3, 16000.0),   # effective MSA 15,000 ft: end of the structural band
+    (-5.3, 19000.0),  # effective MSA 18,000 ft: start of the pull-down
+])
+def test_jumps(table, isa_dev, msa):
+    isa_dev, msa, fuel_burn = np.array([isa_dev]), np.array([msa]), np.array([0.0])
+    result = zntol.calculate_sensitivities(isa_dev, msa, fuel_burn, table=table)
+    assert_close(result, quotients(isa_dev, msa, fuel_burn, table))
+
+
+def test_scalar_input(table):
+    scalar = zntol.calculate_sensitivities(2.0, 16000.0, 100.0, table=table)
+    batch = zntol.calculate_sensitivities([2.0], [16000.0], [100.0], table=table)
+    for name, column in batch.items():
+        assert scalar[name].shape == ()
+        assert scalar[name] == column[0]
+    value, d_isa, d_msa = table.kernel.gradient(2.5, 16000.0)
+    assert value.shape == d_isa.shape == d_msa.shape == ()
+    assert value == table.kernel.scalar(2.5, 16000.0)
@@ -0,0 +1,75 @@
+# tests/test_server.py
+# Smoke test of the HTTP service on a free local port: readiness, single and
+# batch requests, and rejected input
+
+import asyncio
+import json
+
+import numpy as np
+
+import zntol
+from zntol.server import ZntolServer
+
+
+async def request(port: int, method: str, path: str, body: bytes = b"") -> tuple:
+    # One request per connection: (status, decoded JSON body)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: zntol\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        length = next(int(line.split(":", 1)[1]) for line in head if line.lower().startswith("content-length:"))
+        return int(head[0].split(" ")[1]), json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+def post(port: int, path: str, payload) -> tuple:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return request(port, "POST", path, body)
+
+
+async def session(table) -> dict:
+    server = ZntolServer(port=0, window=0.001, table=table)
+    await server.start()
+    port = server.port
+    try:
+        await asyncio.wait_for(server.ready.wait(), 10)
+        isa_dev, msa, fuel_burn = [10.0, 35.0, -5.0], [15000, 15000, 24000], [500, 0, 1200]
+        return {
+            "ready": await request(port, "GET", "/readyz"),
+            "single": await asyncio.gather(*(post(port, "/zntol", {"isa_dev": i, "msa": m, "fuel_burn": f})
+                                             for i, m, f in zip(isa_dev, msa, fuel_burn))),
+            "batch": await post(port, "/zntol/batch", {"isa_dev": isa_dev, "msa": msa, "fuel_burn": fuel_burn}),
+            "huge": await post(port, "/zntol", b'{"isa_dev": 1' + b"0" * 400 + b', "msa": 15000, "fuel_burn": 0}'),
+            "huge_batch": await post(port, "/zntol/batch",
+                                     b'{"isa_dev": [1' + b"0" * 400 + b'], "msa": [15000], "fuel_burn": [0]}'),
+            "text": await post(port, "/zntol", {"isa_dev": "warm", "msa": 15000, "fuel_burn": 0}),
+            "not_json": await post(port, "/zntol", b"{"),
+            "missing": await request(port, "GET", "/nowhere"),
+            "method": await request(port, "GET", "/zntol"),
+        }
+    finally:
+        await server.close()
+
+
+def test_server(table):
+    responses = asyncio.run(session(table))
+    assert responses["ready"] == (200, {**responses["ready"][1], "status": "ready", "table_version": table.version})
+
+    for (status, result), args in zip(responses["single"], [(10.0, 15000, 500), (35.0, 15000, 0), (-5.0, 24000, 1200)]):
+        expected = zntol.calculate_zntol(*args, table=table)
+        assert status == (422 if expected["error"] else 200)
+        assert result == expected
+
+    status, batch = responses["batch"]
+    expected = zntol.calculate_zntol_batch([10.0, 35.0, -5.0], [15000, 15000, 24000], [500, 0, 1200], table=table)
+    assert status == 200
+    for name, column in expected.items():
+        assert batch[name] == (column.tolist() if isinstance(column, np.ndarray) else column), name
+
+    for name in ("huge", "huge_batch", "text", "not_json"):
+        assert responses[name][0] == 400, name
+    assert responses["missing"][0] == 404
+    assert responses["method"][0] == 405
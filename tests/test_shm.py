@@ -0,0 +1,109 @@
+# tests/test_shm.py
+# The table in shared memory: round trip, version checks, and the heap each
+# attached worker holds (flat in the number of workers, below a worker that
+# builds its own table), as in benchmarks/bench_shm.py
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.artifact import ArtifactError
+from zntol.shm import attach_shared, private_name, publish_shared, unlink_shared
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heap the worker's table added (tracemalloc, which NumPy reports to) and
+# whether its arrays lie in the shared block's mapping
+WORKER = """
+import json, sys, tracemalloc
+import zntol
+from zntol.tables import build_table, get_table
+
+tracemalloc.start()
+table = build_table() if sys.argv[1] == "build" else get_table()
+heap = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+ranges = []
+with open("/proc/self/maps") as fh:
+    for line in fh:
+        if line.rstrip().endswith("/dev/shm/" + sys.argv[2]):
+            ranges.append([int(a, 16) for a in line.split()[0].split("-")])
+arrays = (table.isa_grid, table.msa_grid, table.weight_grid, table.kernel.cells)
+views = all(any(lo <= a.ctypes.data and a.ctypes.data + a.nbytes <= hi for lo, hi in ranges) for a in arrays)
+print(json.dumps({"heap": heap, "version": table.version, "views": views}), flush=True)
+sys.stdin.read()  # stay alive until every worker has reported
+"""
+
+
+def run_workers(mode: str, n: int, name: str) -> list:
+    # n workers alive at once; "build" builds a table, "attach" uses
+    # ZNTOL_SHARED_TABLE=name
+    env = {k: v for k, v in os.environ.items() if k not in ("ZNTOL_SHARED_TABLE", "ZNTOL_TABLE", "ZNTOL_DATA")}
+    if mode == "attach":
+        env["ZNTOL_SHARED_TABLE"] = name
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER, mode, name], cwd=ROOT, env=env, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE) for _ in range(n)]
+    try:
+        return [json.loads(p.stdout.readline()) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+
+def test_shared_table_round_trip(table, private_blocks):
+    before = private_blocks()
+    shared = publish_shared(table, private_name())
+    try:
+        attached = attach_shared(shared.name, version=table.version, source_hash=table.source_hash)
+        assert attached.table.version == table.version
+        assert np.array_equal(attached.table.kernel.batch([10.5, -3.2], [15050, 22000]),
+                              table.kernel.batch([10.5, -3.2], [15050, 22000]))
+        with pytest.raises(ArtifactError):
+            attach_shared(shared.name, version="other", source_hash=table.source_hash)
+        attached.close()
+    finally:
+        shared.close()
+        assert unlink_shared(shared.name)
+    assert not unlink_shared(shared.name)
+    assert private_blocks() == before
+
+
+@pytest.fixture
+def block_name():
+    if not Path("/dev/shm").is_dir():
+        pytest.skip("needs POSIX shared memory in /dev/shm")
+    name = private_name()
+    yield name
+    unlink_shared(name)
+
+
+def test_worker_heap_is_flat(table, block_name):
+    built = max(r["heap"] for r in run_workers("build", 2, block_name))
+    shared = publish_shared(table, block_name)
+    try:
+        heaps = {}
+        for n in (1, 4):
+            reports = run_workers("attach", n, block_name)
+            assert all(r["views"] and r["version"] == table.version for r in reports)
+            heaps[n] = max(r["heap"] for r in reports)
+    finally:
+        shared.close()
+    assert heaps[4] <= heaps[1] + 256  # bytes: allocator noise, nothing per worker
+    assert heaps[4] < built
+
+
+def test_race_to_publish(table, block_name):
+    # No block yet: one worker publishes the default artifact's bytes and the
+    # others attach. None of them holds a table of its own next to the block.
+    built = max(r["heap"] for r in run_workers("build", 2, block_name))
+    reports = run_workers("attach", 4, block_name)
+    assert all(r["views"] and r["version"] == table.version for r in reports)
+    assert max(r["heap"] for r in reports) < built
@@ -0,0 +1,75 @@
+# tests/test_sobol.py
+# Sobol estimators against the analytic Ishigami indices, and the ZNTOL
+# analysis: indices in range and independent of the process count
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol.sobol import sobol_indices
+
+# Route families: (ISA, MSA, fuel burn) boxes, as in benchmarks/bench_sobol.py
+FAMILIES = [
+    [[-15, 15], [8000, 16000], [200, 1500]],
+    [[-10, 20], [12000, 22000], [500, 2500]],
+    [[-20, 0], [18000, 26000], [800, 3000]],
+    [[10, 30], [18000, 26000], [800, 3000]],
+]
+
+
+def ishigami(x: np.ndarray, a: float = 7.0, b: float = 0.1) -> np.ndarray:
+    return np.sin(x[..., 0]) + a * np.sin(x[..., 1]) ** 2 + b * x[..., 2] ** 4 * np.sin(x[..., 0])
+
+
+def test_ishigami(n: int = 200_000, a: float = 7.0, b: float = 0.1):
+    variance = a ** 2 / 8 + b * np.pi ** 4 / 5 + b ** 2 * np.pi ** 8 / 18 + 0.5
+    v1 = 0.5 * (1 + b * np.pi ** 4 / 5) ** 2
+    v2 = a ** 2 / 8
+    v13 = b ** 2 * np.pi ** 8 * (1 / 18 - 1 / 50)
+    first = np.array([v1, v2, 0]) / variance
+    total = np.array([v1 + v13, v2, v13]) / variance
+
+    rng = np.random.default_rng(0)
+    xa, xb = rng.uniform(-np.pi, np.pi, (2, n, 3))
+    xab = np.repeat(xa[None], 3, axis=0)
+    for i in range(3):
+        xab[i, :, i] = xb[:, i]
+    result = sobol_indices(ishigami(xa)[None], ishigami(xb)[None], ishigami(xab)[None], resamples=50)
+    np.testing.assert_allclose(result["first"][0], first, rtol=0, atol=0.01)
+    np.testing.assert_allclose(result["total"][0], total, rtol=0, atol=0.01)
+    assert (result["first_conf"][0] > 0).all() and (result["first_conf"][0] < 0.02).all()
+
+
+@pytest.fixture(scope="module")
+def analysis(table):
+    return zntol.sobol_analysis(FAMILIES, samples=20_000, resamples=50, processes=1, table=table)
+
+
+def test_zntol_indices_in_range(analysis):
+    # 0 <= S1 <= ST, up to the estimators' own confidence intervals
+    first, total = analysis["first"], analysis["total"]
+    slack = analysis["first_conf"] + analysis["total_conf"]
+    assert (first >= -analysis["first_conf"]).all()
+    assert (first <= total + slack).all()
+    assert (total <= 1 + analysis["total_conf"]).all()
+    assert (analysis["variance"] > 0).all()
+
+
+def test_zntol_independent_of_processes(table, analysis, private_blocks):
+    before = private_blocks()
+    parallel = zntol.sobol_analysis(FAMILIES, samples=20_000, resamples=50, processes=2, chunk_size=100_000,
+                                    table=table)
+    assert private_blocks() == before
+    for name, column in analysis.items():
+        assert np.array_equal(parallel[name], column, equal_nan=True), name
+
+
+@pytest.mark.parametrize("bounds", [
+    [[-15, 15], [8000, 16000]],
+    [[15, -15], [8000, 16000], [200, 1500]],
+    [[-25, 15], [8000, 16000], [200, 1500]],
+    [[-15, 15], [8000, 16000], [-1, 1500]],
+])
+def test_bad_bounds(bounds):
+    with pytest.raises(ValueError):
+        zntol.sobol_analysis(bounds, samples=10)
@@ -0,0 +1,61 @@
+# tests/test_stream.py
+# Streaming CSV files through the batch engine
+
+import io
+
+import pytest
+
+import zntol
+from zntol.stream import OUTPUT_COLUMNS, PARSE_ERROR, CsvWriter, ParquetWriter, evaluate_stream, read_csv
+
+CSV = """isa_dev,msa,fuel_burn
+10,15000,500
+abc,15000,500
+5,  12000
+10,30000,0
+
+nan,10000,0
+-5,24000,1200
+"""
+
+
+def run_csv(text: str, chunk_size: int = 2) -> tuple:
+    out = io.StringIO()
+    counts = evaluate_stream(read_csv(io.StringIO(text), chunk_size), CsvWriter(out))
+    return counts, [line.split(",", 3) for line in out.getvalue().splitlines()]
+
+
+def test_csv_stream(table):
+    (rows, invalid), lines = run_csv(CSV)
+    assert (rows, invalid) == (6, 4)
+    assert lines[0] == list(OUTPUT_COLUMNS[:3]) + [",".join(OUTPUT_COLUMNS[3:])]
+    body = lines[1:]
+    # Unparseable rows are echoed as written, other rows as numbers
+    assert [line[:3] for line in body] == [
+        ["10.0", "15000.0", "500.0"], ["abc", "15000", "500"], ["5", "12000", ""],
+        ["10.0", "30000.0", "0.0"], ["nan", "10000.0", "0.0"], ["-5.0", "24000.0", "1200.0"],
+    ]
+    assert [line[3].endswith(PARSE_ERROR + '"') for line in body] == [False, True, True, False, True, False]
+    assert body[3][3].endswith(zntol.ERRORS[2] + '"')
+    assert body[0][3].split(",")[1] == str(zntol.calculate_zntol(10, 15000, 500)["zntol"])
+
+
+def test_results_do_not_depend_on_chunking():
+    assert run_csv(CSV, chunk_size=1) == run_csv(CSV, chunk_size=100)
+
+
+def test_csv_header_is_checked():
+    with pytest.raises(ValueError, match="fuel_burn"):
+        read_csv(io.StringIO("isa_dev,msa\n1,2\n"))
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    writer = ParquetWriter(str(path))
+    evaluate_stream(read_csv(io.StringIO(CSV), 2), writer)
+    writer.close()
+    rows = pq.read_table(path).to_pylist()
+    assert [row["error"] is None for row in rows] == [True, False, False, False, False, True]
+    assert (rows[1]["isa_dev"], rows[1]["msa"]) == (None, 15000.0)  # "abc" is not a number
+    assert rows[0]["zntol"] == zntol.calculate_zntol(10, 15000, 500)["zntol"]
@@ -0,0 +1,48 @@
+# tests/test_tables.py
+# The table is built once per process and rebuilt only when asked to; the
+# grid fill rounds exactly like interp1d
+
+import numpy as np
+import pytest
+
+import zntol
+from zntol import tables
+from zntol.tables import fill_rows_linear
+
+
+def test_table_built_once(table):
+    assert zntol.get_table() is table
+    assert zntol.get_table() is zntol.get_table()
+
+
+def test_build_matches_loaded_table(table):
+    assert zntol.build_table().version == table.version
+
+
+@pytest.fixture
+def sparse_grid(monkeypatch):
+    # The built-in weight grid before its rows are filled
+    monkeypatch.setattr(tables, "fill_rows_linear", lambda grid, x: grid)
+    return tables.assemble_grid(tables.isa_grid, tables.msa_grid, tables.high_data, tables.low_data)
+
+
+def test_fill_matches_interp1d(table, sparse_grid):
+    interpolate = pytest.importorskip("scipy.interpolate")
+    x = np.asarray(tables.msa_grid, dtype=float)
+    filled = fill_rows_linear(sparse_grid, x)
+    for row, values in zip(filled, sparse_grid):
+        known = np.isfinite(values)
+        expected = interpolate.interp1d(x[known], values[known], kind="linear", fill_value="extrapolate")(x)
+        assert np.array_equal(row, expected)
+    assert np.array_equal(filled, table.weight_grid)
+
+
+def test_fill_edge_rows():
+    x = np.array([0.0, 1.0, 3.0, 5.0])
+    grid = np.array([[np.nan] * 4, [np.nan, 2.0, np.nan, 10.0], [1.0, 2.0, 3.0, 4.0]])
+    filled = fill_rows_linear(grid, x)
+    assert np.isnan(filled[0]).all()
+    assert np.array_equal(filled[1], [0.0, 2.0, 6.0, 10.0])
+    assert np.array_equal(filled[2], grid[2])
+    with pytest.raises(ValueError):
+        fill_rows_linear(np.array([[np.nan, 1.0, np.nan, np.nan]]), x)
@@ -0,0 +1,84 @@
+# zntol/__init__.py
+# Headless EMB-120 ZNTOL engine (no Streamlit dependency)
+
+from .artifact import ArtifactError, compile_table, load_artifact
+from .bulk import evaluate_bulk
+from .cache import CacheInfo, ResultCache, get_result_cache
+from .curves import RouteCurves, compile_curves, load_curves
+from .limits import (
+    ERRORS,
+    SOURCES,
+    calculate_zntol,
+    calculate_zntol_batch,
+    obstacle_cache_clear,
+    obstacle_cache_info,
+)
+from .inverse import ISA_LIMITS, LIMITS, solve_max_isa, solve_max_msa
+from .lookup import DenseLookup, get_lookup
+from .montecarlo import simulate
+from .reload import TableWatcher, watch_tables
+from .route import evaluate_route, evaluate_routes
+from .sensitivity import calculate_sensitivities
+from .sobol import sobol_analysis
+from .tables import (
+    HIGH_MSA_PULLDOWN_THRESHOLD,
+    MAX_ISA,
+    MAX_MSA,
+    MIN_ISA,
+    MIN_MSA,
+    STRUCTURAL_MSA_THRESHOLD,
+    STRUCTURAL_MTOW,
+    TUNING,
+    ZntolTable,
+    build_table,
+    default_data,
+    get_table,
+    load_data,
+    set_table,
+)
+
+__all__ = [
+    "ArtifactError",
+    "CacheInfo",
+    "DenseLookup",
+    "ERRORS",
+    "HIGH_MSA_PULLDOWN_THRESHOLD",
+    "ISA_LIMITS",
+    "LIMITS",
+    "MAX_ISA",
+    "MAX_MSA",
+    "MIN_ISA",
+    "MIN_MSA",
+    "ResultCache",
+    "RouteCurves",
+    "SOURCES",
+    "STRUCTURAL_MSA_THRESHOLD",
+    "STRUCTURAL_MTOW",
+    "TUNING",
+    "TableWatcher",
+    "ZntolTable",
+    "build_table",
+    "compile_table",
+    "evaluate_bulk",
+    "evaluate_route",
+    "evaluate_routes",
+    "calculate_sensitivities",
+    "calculate_zntol",
+    "calculate_zntol_batch",
+    "compile_curves",
+    "default_data",
+    "get_lookup",
+    "get_result_cache",
+    "get_table",
+    "load_artifact",
+    "load_curves",
+    "load_data",
+    "obstacle_cache_clear",
+    "obstacle_cache_info",
+    "set_table",
+    "simulate",
+    "sobol_analysis",
+    "solve_max_isa",
+    "solve_max_msa",
+    "watch_tables",
+]
@@ -0,0 +1,133 @@
+# zntol/__main__.py
+# Command-line entry point
+#
+#   python -m zntol compile [-o PATH]          compile the table artifact
+#   python -m zntol data [-o PATH]             write the AFM data and tuning as a JSON data file
+#   python -m zntol calc [INPUT] [-o OUTPUT]   stream scenarios (CSV/Parquet) through the engine
+#   python -m zntol serve [--port 8120]        HTTP service (see zntol/server.py); --watch
+#                                              reloads the data file on change (zntol/reload.py)
+#   python -m zntol shm publish|status|unlink  host-wide shared table (see zntol/shm.py)
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .artifact import compile_table
+from .stream import DEFAULT_CHUNK_SIZE, evaluate_stream, open_reader, open_writer
+from .tables import DEFAULT_ARTIFACT, build_table, default_data, get_table, load_data, load_table
+
+
+def compile_command(args: argparse.Namespace) -> int:
+    version = compile_table(build_table(load_data(args.data)), args.output)
+    print(f"{args.output}: {os.path.getsize(args.output)} bytes, version {version}")
+    return 0
+
+
+def data_command(args: argparse.Namespace) -> int:
+    text = json.dumps(default_data(), indent=1) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    return 0
+
+
+def calc_command(args: argparse.Namespace) -> int:
+    table = get_table()
+    chunks, in_fh = open_reader(args.input, args.input_format, args.chunk_size)
+    writer, out_fh = open_writer(args.output, args.output_format)
+    t0 = time.perf_counter()
+    try:
+        rows, invalid = evaluate_stream(chunks, writer, table=table)
+    finally:
+        writer.close()
+        for fh in (in_fh, out_fh):
+            if fh is not None:
+                fh.close()
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{rows:,} rows ({invalid:,} invalid) in {elapsed:.2f} s, {rows / elapsed if elapsed else 0:,.0f} rows/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    # Imported here so the other commands do not load asyncio
+    from .server import serve
+
+    if args.watch is not None:
+        from .reload import TableWatcher
+
+        watcher = TableWatcher(args.watch, args.watch_interval,
+                               on_reload=lambda table: print(f"reloaded table {table.version}", flush=True))
+        watcher.start()
+        if watcher.error is not None:
+            raise watcher.error
+    serve(args.host, args.port, window=args.window_ms / 1000, max_batch=args.max_batch, queue_size=args.queue_size)
+    return 0
+
+
+def shm_command(args: argparse.Namespace) -> int:
+    from .shm import attach_shared, publish_shared, shared_name, unlink_shared
+
+    name = args.name or shared_name()
+    if args.action == "unlink":
+        print(f"{name}: {'unlinked' if unlink_shared(name) else 'not found'}")
+        return 0
+    shared = publish_shared(load_table(), name) if args.action == "publish" else attach_shared(name)
+    print(f"{name}: {shared.size} bytes, version {shared.table.version}"
+          f"{' (published)' if shared.created else ''}")
+    return 0
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m zntol", description="EMB-120 ZNTOL engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("compile", help="compile the table to a memory-mappable artifact")
+    p.add_argument("-o", "--output", default=str(DEFAULT_ARTIFACT))
+    p.add_argument("--data", help="JSON data file to compile (default: ZNTOL_DATA, else the built-in data)")
+    p.set_defaults(func=compile_command)
+
+    p = commands.add_parser("data", help="write the built-in AFM data and tuning as a JSON data file")
+    p.add_argument("-o", "--output", default="-", help="data file (- for stdout)")
+    p.set_defaults(func=data_command)
+
+    p = commands.add_parser("calc", help="compute ZNTOL for every row of a CSV or Parquet file")
+    p.add_argument("input", nargs="?", default="-", help="scenario file with isa_dev, msa, fuel_burn columns (- for stdin)")
+    p.add_argument("-o", "--output", default="-", help="result file (- for stdout)")
+    p.add_argument("--input-format", choices=("csv", "parquet"), help="default: from the file extension")
+    p.add_argument("--output-format", choices=("csv", "parquet"), help="default: from the file extension")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    p.set_defaults(func=calc_command)
+
+    p = commands.add_parser("serve", help="serve the engine over HTTP with request micro-batching")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8120)
+    p.add_argument("--window-ms", type=float, default=2.0, help="how long a single request waits for others")
+    p.add_argument("--max-batch", type=int, default=4096, help="single requests per evaluation")
+    p.add_argument("--queue-size", type=int, default=10_000, help="pending single requests before 503")
+    p.add_argument("--watch", nargs="?", const="", metavar="DATA",
+                   help="reload the tables when this JSON data file changes (default: ZNTOL_DATA)")
+    p.add_argument("--watch-interval", type=float, default=1.0, help="seconds between checks of the data file")
+    p.set_defaults(func=serve_command)
+
+    p = commands.add_parser("shm", help="publish, check or remove the host-wide shared-memory table")
+    p.add_argument("action", choices=("publish", "status", "unlink"))
+    p.add_argument("--name", help="block name (default: derived from the AFM data, as ZNTOL_SHARED_TABLE=1 uses)")
+    p.set_defaults(func=shm_command)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, RuntimeError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
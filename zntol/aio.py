@@ -0,0 +1,142 @@
+# zntol/aio.py
+# Asyncio entry points: batch evaluation off the event loop
+#
+#   async for result in evaluate_async(source):
+#       ...  # calculate_zntol_batch columns, one dict per chunk, in input order
+#
+#   result = await calculate_zntol_batch_async(isa_dev, msa, fuel_burn)
+#
+# source is an awaitable resolving to one set of columns, an async iterable of
+# column sets, or an async iterable of (isa_dev, msa, fuel_burn) rows. A column
+# set is a (isa_dev, msa, fuel_burn) tuple of arrays or a mapping with those
+# keys. Input is regrouped into chunks of at most chunk_size rows and each
+# chunk runs calculate_zntol_batch in an executor: the loop's default thread
+# pool, or any concurrent.futures executor passed in (a ProcessPoolExecutor
+# included; its workers load the table themselves unless one is passed).
+# Every chunk's result carries the table_version it was evaluated on. Without
+# a process pool all chunks use one table snapshot; process workers can load
+# different versions across a hot reload, and calculate_zntol_batch_async
+# then raises rather than join chunks from different tables.
+#
+# At most max_in_flight chunks are submitted and not yet yielded; the source
+# is not read further until the consumer takes a result, so a slow consumer
+# holds back a fast producer. Closing the generator or cancelling the task
+# that iterates it cancels every chunk that has not started, and stops reading
+# the source. A chunk that is already running finishes in its worker (a thread
+# cannot be interrupted), which chunk_size keeps short. A consumer that breaks
+# out of the loop early should close the generator itself, e.g. with
+# contextlib.aclosing(), rather than leave that to garbage collection.
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+from .limits import calculate_zntol_batch
+from .stream import INPUT_COLUMNS
+from .tables import ZntolTable, get_table
+
+DEFAULT_CHUNK_SIZE = 65536
+DEFAULT_IN_FLIGHT = 2
+
+
+async def evaluate_async(source, chunk_size: int = DEFAULT_CHUNK_SIZE, max_in_flight: int = DEFAULT_IN_FLIGHT,
+                         executor: Executor | None = None, table: ZntolTable | None = None) -> AsyncIterator[dict]:
+    if chunk_size < 1 or max_in_flight < 1:
+        raise ValueError("chunk_size and max_in_flight must be positive")
+    loop = asyncio.get_running_loop()
+    if table is None and not isinstance(executor, ProcessPoolExecutor):
+        # One table snapshot for the whole source, even across a hot reload
+        # (process workers load their own rather than receive it pickled)
+        table = get_table()
+    pending = deque()
+    try:
+        async for isa_dev, msa, fuel_burn in _chunks(source, chunk_size):
+            pending.append(loop.run_in_executor(executor, calculate_zntol_batch, isa_dev, msa, fuel_burn, table))
+            if len(pending) >= max_in_flight:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def calculate_zntol_batch_async(isa_dev, msa, fuel_burn, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                      max_in_flight: int = DEFAULT_IN_FLIGHT, executor: Executor | None = None,
+                                      table: ZntolTable | None = None) -> dict:
+    # Same result as calculate_zntol_batch; each argument may also be awaitable
+    isa_dev, msa, fuel_burn = [await a if _is_awaitable(a) else a for a in (isa_dev, msa, fuel_burn)]
+    isa_dev, msa, fuel_burn = (np.asarray(a, dtype=float) for a in (isa_dev, msa, fuel_burn))
+    if not isa_dev.shape == msa.shape == fuel_burn.shape:
+        raise ValueError("isa_dev, msa and fuel_burn must have the same shape")
+    parts = [part async for part in evaluate_async((isa_dev.ravel(), msa.ravel(), fuel_burn.ravel()), chunk_size,
+                                                    max_in_flight, executor, table)]
+    if not parts:
+        return calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    # Joining large results is a copy of every column; kept off the loop too
+    return await asyncio.get_running_loop().run_in_executor(None, _join, parts, isa_dev.shape)
+
+
+async def _chunks(source, chunk_size: int) -> AsyncIterator[tuple]:
+    # (isa_dev, msa, fuel_burn) float arrays of at most chunk_size rows
+    if _is_awaitable(source):
+        source = await source
+    if not isinstance(source, AsyncIterable):
+        for chunk in _split(_columns(source), chunk_size):
+            yield chunk
+        return
+
+    rows = []
+    async for item in source:
+        if isinstance(item, Mapping) or np.ndim(item[0]) > 0:
+            if rows:
+                yield _rows(rows)
+                rows = []
+            for chunk in _split(_columns(item), chunk_size):
+                yield chunk
+        else:
+            rows.append(item)
+            if len(rows) == chunk_size:
+                yield _rows(rows)
+                rows = []
+    if rows:
+        yield _rows(rows)
+
+
+def _columns(item) -> tuple:
+    if isinstance(item, Mapping):
+        missing = [name for name in INPUT_COLUMNS if name not in item]
+        if missing:
+            raise ValueError(f"input is missing column(s): {', '.join(missing)}")
+        item = tuple(item[name] for name in INPUT_COLUMNS)
+    isa_dev, msa, fuel_burn = (np.ravel(np.asarray(a, dtype=float)) for a in item)
+    if not len(isa_dev) == len(msa) == len(fuel_burn):
+        raise ValueError("isa_dev, msa and fuel_burn must have the same length")
+    return isa_dev, msa, fuel_burn
+
+
+def _rows(rows: list) -> tuple:
+    return tuple(np.array(rows, dtype=float).reshape(-1, 3).T)
+
+
+def _join(parts: list, shape: tuple) -> dict:
+    versions = {p["table_version"] for p in parts}
+    if len(versions) > 1:
+        raise RuntimeError(f"chunks were evaluated on {len(versions)} table versions (reloaded during the call); "
+                           "retry, or pass a table")
+    result = {name: np.concatenate([p[name] for p in parts]).reshape(shape) for name in parts[0]
+              if name != "table_version"}
+    result["table_version"] = parts[0]["table_version"]
+    return result
+
+
+def _split(columns: tuple, chunk_size: int):
+    for start in range(0, len(columns[0]), chunk_size):
+        yield tuple(a[start:start + chunk_size] for a in columns)
+
+
+def _is_awaitable(value) -> bool:
+    return hasattr(value, "__await__")
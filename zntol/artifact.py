@@ -0,0 +1,230 @@
+# zntol/artifact.py
+# Compiled table artifact: one versioned binary file, memory-mapped at load
+#
+#   python -m zntol compile [-o zntol/zntol_table.bin]
+#
+# Layout (little-endian):
+#   8 bytes   magic b"ZNTOLTB\0"
+#   4 bytes   header length (uint32)
+#   header    UTF-8 JSON: format version, constants (engine constants and the
+#             table's tuning), AFM source hash, content hash and the
+#             dtype/shape/offset of each array
+#   arrays    raw C-order bytes, each at a 64-byte aligned offset
+#
+# The content hash (sha256 over the constants, array specs and array bytes) is
+# the table version. Loading maps the file read-only and wraps the arrays with
+# np.frombuffer, so worker processes on one host share the same pages.
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .interpolation import CELL_DTYPE, BilinearKernel
+from .tables import CONSTANTS, TUNING, ZntolTable
+
+MAGIC = b"ZNTOLTB\0"
+FORMAT_VERSION = 3
+ALIGN = 64
+
+# Arrays stored in every artifact, in file order
+ARRAYS = ("isa_grid", "msa_grid", "weight_grid", "isa_inv", "msa_inv", "cells")
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+def _arrays(table: ZntolTable) -> dict:
+    kernel = table.kernel
+    arrays = {
+        "isa_grid": kernel.isa_grid,
+        "msa_grid": kernel.msa_grid,
+        "weight_grid": table.weight_grid,
+        "isa_inv": kernel.isa_inv,
+        "msa_inv": kernel.msa_inv,
+        "cells": kernel.cells,
+    }
+    return {name: np.ascontiguousarray(a, dtype=CELL_DTYPE if name == "cells" else "<f8")
+            for name, a in arrays.items()}
+
+
+def _digest(constants: dict, specs: dict, arrays: dict) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps({"format": FORMAT_VERSION, "constants": constants, "arrays": specs}, sort_keys=True).encode())
+    for name in ARRAYS:
+        h.update(memoryview(arrays[name]).cast("B"))
+    return h.hexdigest()
+
+
+def _specs(arrays: dict) -> dict:
+    # Structured dtypes are stored as their field list
+    return {name: {"dtype": a.dtype.descr if a.dtype.names else a.dtype.str, "shape": list(a.shape)}
+            for name, a in arrays.items()}
+
+
+def _dtype(spec) -> np.dtype:
+    return np.dtype([tuple(field) for field in spec] if isinstance(spec, list) else spec)
+
+
+def content_hash(table: ZntolTable) -> str:
+    arrays = _arrays(table)
+    return _digest(table.constants, _specs(arrays), arrays)
+
+
+def to_bytes(table: ZntolTable) -> bytes:
+    arrays = _arrays(table)
+    specs = _specs(arrays)
+    header = {
+        "format": FORMAT_VERSION,
+        "constants": table.constants,
+        "source_hash": table.source_hash,
+        "version": _digest(table.constants, specs, arrays),
+    }
+    return pack(MAGIC, header, arrays, ARRAYS)
+
+
+def read_artifact(buf, verify: bool = True) -> tuple:
+    # (header, arrays) after every check from_buffer() makes, without
+    # building the kernel
+    header, arrays = unpack(buf, MAGIC, ARRAYS, "ZNTOL table artifact")
+    if header.get("format") != FORMAT_VERSION:
+        raise ArtifactError(f"unsupported artifact format {header.get('format')!r} (expected {FORMAT_VERSION})")
+
+    missing = [key for key in ("constants", "source_hash", "version") if key not in header]
+    if missing:
+        raise ArtifactError(f"corrupt ZNTOL table artifact: header lacks {', '.join(missing)}")
+    if verify:
+        specs = {name: {"dtype": header["arrays"][name]["dtype"], "shape": header["arrays"][name]["shape"]}
+                 for name in ARRAYS}
+        if _digest(header["constants"], specs, arrays) != header["version"]:
+            raise ArtifactError("artifact checksum mismatch")
+    # Engine constants must match the code; the tuning is the table's own
+    constants = header["constants"]
+    if not isinstance(constants, dict):
+        raise ArtifactError("corrupt ZNTOL table artifact: constants are not a JSON object")
+    engine = {name: constants.get(name) for name in CONSTANTS}
+    if engine != CONSTANTS:
+        raise ArtifactError(f"artifact compiled with constants {engine}, engine uses {CONSTANTS}")
+    if set(constants) != set(CONSTANTS) | set(TUNING):
+        raise ArtifactError(f"artifact has tuning parameters {sorted(set(constants) - set(CONSTANTS))}, "
+                            f"engine expects {sorted(TUNING)}")
+    return header, arrays
+
+
+def from_buffer(buf, verify: bool = True) -> ZntolTable:
+    # Zero-copy: the returned arrays are read-only views into buf
+    header, arrays = read_artifact(buf, verify)
+    kernel = BilinearKernel(arrays["isa_grid"], arrays["msa_grid"], arrays["isa_inv"], arrays["msa_inv"],
+                            arrays["cells"])
+    return ZntolTable(arrays["isa_grid"], arrays["msa_grid"], arrays["weight_grid"], kernel=kernel,
+                      constants=header["constants"], source_hash=header["source_hash"], version=header["version"])
+
+
+# ────────────────────────────────────────────────
+# Container layout shared by the binary files the engine writes
+# ────────────────────────────────────────────────
+def pack(magic: bytes, header: dict, arrays: dict, order: tuple) -> bytes:
+    # header gains an "arrays" entry with each array's dtype, shape and offset
+    specs = _specs(arrays)
+
+    # Offsets depend on the header length, which depends on the offsets; space
+    # is reserved with placeholder offsets at least as wide as the real ones
+    def encode(offsets: dict) -> bytes:
+        return json.dumps({
+            **header,
+            "arrays": {name: {**specs[name], "offset": offsets[name]} for name in order},
+        }, sort_keys=True).encode()
+
+    placeholder = encode({name: 10 ** 12 for name in order})
+    data_start = _align(len(magic) + 4 + len(placeholder))
+    offsets, pos = {}, data_start
+    for name in order:
+        offsets[name] = pos
+        pos = _align(pos + arrays[name].nbytes)
+
+    head = encode(offsets)
+    buf = bytearray(pos)
+    buf[:len(magic)] = magic
+    buf[len(magic):len(magic) + 4] = struct.pack("<I", len(head))
+    buf[len(magic) + 4:len(magic) + 4 + len(head)] = head
+    for name in order:
+        a = arrays[name]
+        buf[offsets[name]:offsets[name] + a.nbytes] = a.tobytes()
+    return bytes(buf)
+
+
+def unpack(buf, magic: bytes, order: tuple, kind: str) -> tuple:
+    # (header, arrays); the arrays are read-only views into buf. A truncated
+    # or malformed file raises ArtifactError, like a bad checksum.
+    view = memoryview(buf)
+    if bytes(view[:len(magic)]) != magic:
+        raise ArtifactError(f"not a {kind}")
+    try:
+        return _unpack(buf, view, len(magic), order, kind)
+    except ArtifactError:
+        raise
+    except (struct.error, KeyError, TypeError, ValueError) as exc:
+        raise ArtifactError(f"corrupt {kind}: {type(exc).__name__}: {exc}") from None
+
+
+def _unpack(buf, view: memoryview, start: int, order: tuple, kind: str) -> tuple:
+    (header_len,) = struct.unpack_from("<I", view, start)
+    if start + 4 + header_len > len(view):
+        raise ArtifactError(f"{kind} truncated in its header")
+    try:
+        header = json.loads(bytes(view[start + 4:start + 4 + header_len]))
+    except ValueError as exc:
+        raise ArtifactError(f"corrupt {kind} header: {exc}") from None
+    if not isinstance(header, dict):
+        raise ArtifactError(f"corrupt {kind} header: not a JSON object")
+
+    arrays = {}
+    for name in order:
+        spec = header["arrays"][name]
+        try:
+            dtype = _dtype(spec["dtype"])
+        except (TypeError, ValueError):
+            raise ArtifactError(f"bad dtype for {name!r}: {spec['dtype']!r}") from None
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        if spec["offset"] < 0 or spec["offset"] + count * dtype.itemsize > len(view):
+            raise ArtifactError(f"{kind} truncated in {name!r}")
+        a = np.frombuffer(buf, dtype=dtype, count=count, offset=spec["offset"])
+        shape = tuple(spec["shape"])
+        arrays[name] = a if a.shape == shape else a.reshape(shape)  # 1-D arrays need no second object
+    return header, arrays
+
+
+def write_atomic(path, data: bytes) -> None:
+    # Written to a temporary file and renamed, so readers never see a partial file
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def map_file(path):
+    # Read-only memory map of a whole file
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            raise ArtifactError(f"{path}: empty file") from None
+
+
+def compile_table(table: ZntolTable, path) -> str:
+    write_atomic(path, to_bytes(table))
+    return table.version
+
+
+def load_artifact(path, verify: bool = True) -> ZntolTable:
+    return from_buffer(map_file(path), verify=verify)
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
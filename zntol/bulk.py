@@ -0,0 +1,116 @@
+# zntol/bulk.py
+# Multiprocess bulk evaluation for very large scenario sets
+#
+# Rows are split into chunks and evaluated with calculate_zntol_batch in a
+# process pool. Nothing large is pickled per task: the compiled table is
+# published once into a private shared block (shm.py; every worker attaches
+# it zero-copy and checks it), and the input and output columns live in a
+# second shared block that workers read and write in place, so results land
+# in input order.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .limits import calculate_zntol_batch
+from .shm import attach_shared, private_name, publish_shared, unlink_shared
+from .tables import ZntolTable, get_table
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Column layout of the shared input/output block
+INPUTS = (("isa_dev", "<f8"), ("msa", "<f8"), ("fuel_burn", "<f8"))
+OUTPUTS = (
+    ("w_obstacle_max", "<i8"),
+    ("zntol", "<i8"),
+    ("capped", "?"),
+    ("source", "i1"),
+    ("effective_msa", "<i8"),
+    ("error", "i1"),
+)
+
+
+def _columns(buf, n: int) -> dict:
+    # Views of every input and output column, packed back to back (8-byte aligned)
+    columns, offset = {}, 0
+    for name, dtype in INPUTS + OUTPUTS:
+        dtype = np.dtype(dtype)
+        columns[name] = np.ndarray((n,), dtype=dtype, buffer=buf, offset=offset)
+        offset += -(-n * dtype.itemsize // 8) * 8
+    return columns
+
+
+def _block_size(n: int) -> int:
+    return sum(-(-n * np.dtype(dtype).itemsize // 8) * 8 for _, dtype in INPUTS + OUTPUTS) or 1
+
+
+# Per-worker state, set by _init_worker. Pool workers share the parent's
+# resource tracker, and the parent unlinks both blocks when the run ends.
+_worker = {}
+
+
+def _init_worker(table_name: str, version: str, source_hash: str, io_name: str, n: int) -> None:
+    shared = attach_shared(table_name, version=version, source_hash=source_hash)
+    io_shm = SharedMemory(name=io_name)
+    _worker.update(shared=shared, io_shm=io_shm, table=shared.table, columns=_columns(io_shm.buf, n))
+
+
+def _run_chunk(bounds: tuple) -> int:
+    start, stop = bounds
+    columns = _worker["columns"]
+    result = calculate_zntol_batch(
+        columns["isa_dev"][start:stop], columns["msa"][start:stop], columns["fuel_burn"][start:stop],
+        table=_worker["table"],
+    )
+    for name, _ in OUTPUTS:
+        columns[name][start:stop] = result[name]
+    return stop - start
+
+
+def evaluate_bulk(isa_dev, msa, fuel_burn, processes: int | None = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, table: ZntolTable | None = None) -> dict:
+    # Same columns and results as calculate_zntol_batch, in input order
+    isa_dev = np.ravel(np.asarray(isa_dev, dtype=float))
+    msa = np.ravel(np.asarray(msa, dtype=float))
+    fuel_burn = np.ravel(np.asarray(fuel_burn, dtype=float))
+    if not len(isa_dev) == len(msa) == len(fuel_burn):
+        raise ValueError("isa_dev, msa and fuel_burn must have the same length")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    if table is None:
+        table = get_table()
+    n = len(isa_dev)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or n <= chunk_size:
+        return calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+
+    shared = publish_shared(table, private_name())
+    io_shm = SharedMemory(create=True, size=_block_size(n))
+    columns = None
+    try:
+        columns = _columns(io_shm.buf, n)
+        columns["isa_dev"][:] = isa_dev
+        columns["msa"][:] = msa
+        columns["fuel_burn"][:] = fuel_burn
+
+        chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(chunks)),
+            initializer=_init_worker,
+            initargs=(shared.name, table.version, table.source_hash, io_shm.name, n),
+        ) as pool:
+            for _ in pool.map(_run_chunk, chunks):
+                pass
+
+        result = {name: columns[name].copy() for name, _ in OUTPUTS}
+        result["table_version"] = table.version
+        return result
+    finally:
+        columns = None  # release the views before closing the block
+        shared.close()
+        unlink_shared(shared.name)
+        io_shm.close()
+        io_shm.unlink()
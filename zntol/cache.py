@@ -0,0 +1,150 @@
+# zntol/cache.py
+# Bounded, quantized result cache for long-running servers
+#
+# Inputs are range-checked as given, and errors are returned without being
+# stored. Inputs on the input lattice of the UI (0.1 °C ISA deviation, 100 ft
+# MSA, 1 lb fuel burn), up to floating-point noise, share one entry per
+# lattice point, so 0.30000000000000004 and 0.3 hit the same entry; any other
+# input is evaluated exactly and not stored, so rounding never moves a result
+# across a rule boundary or out of range. Keys also carry
+# the version of the table current at the call, so after a hot reload new
+# calls compute on the new table and old entries age out. The cache holds at
+# most maxsize results and evicts the least recently used one. Results are
+# read-only mappings shared by every caller, so a hit returns the stored
+# object as is, without a copy.
+
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, NamedTuple
+
+from .limits import check_inputs
+from .lookup import get_lookup
+from .tables import ZntolTable, get_table
+
+DEFAULT_CACHE_SIZE = 65536
+
+# Input resolution used for keys
+ISA_STEPS_PER_DEG, MSA_STEP = 10, 100  # 0.1 °C, 100 ft; fuel burn to 1 lb
+KEY_TOLERANCE = 1e-12  # relative (absolute near 0): floating-point noise only
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+    nbytes: int  # approximate memory held by keys, results and the index
+
+
+def quantize(isa_dev: float, msa: float, fuel_burn: float) -> tuple:
+    # k / 10 and k * 100 are the same doubles as the dense lookup axes. Raises
+    # ValueError/OverflowError for NaN and infinity.
+    return (
+        round(isa_dev * ISA_STEPS_PER_DEG) / ISA_STEPS_PER_DEG,
+        float(round(msa / MSA_STEP) * MSA_STEP),
+        float(round(fuel_burn)),
+    )
+
+
+def lattice_point(isa_dev: float, msa: float, fuel_burn: float) -> tuple | None:
+    # The quantized inputs when every input is within KEY_TOLERANCE of them,
+    # else None (also for NaN and infinity)
+    try:
+        point = quantize(isa_dev, msa, fuel_burn)
+    except (ValueError, OverflowError):
+        return None
+    for value, q in zip((isa_dev, msa, fuel_burn), point):
+        if not math.isclose(value, q, rel_tol=KEY_TOLERANCE, abs_tol=KEY_TOLERANCE):
+            return None
+    return point
+
+
+def _entry_size(key: tuple, result: dict) -> int:
+    # Result dict keys and the version string are shared and are not counted
+    return _KEY_SIZE + sys.getsizeof(result) + sum(map(sys.getsizeof, result.values()))
+
+
+_KEY_SIZE = sys.getsizeof(("", 0.0, 0.0, 0.0)) + 3 * sys.getsizeof(0.0)
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, calculate: Callable | None = None):
+        # calculate(isa_dev, msa, fuel_burn) replaces the engine; by default
+        # the dense lookup of the current table (stored entries sit on its
+        # lattice)
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._calculate = calculate
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._nbytes = 0
+
+    def calculate(self, isa_dev: float, msa: float, fuel_burn: float) -> MappingProxyType:
+        # Same contract as calculate_zntol; read-only result
+        error = check_inputs(isa_dev, msa, fuel_burn)
+        if error:
+            return MappingProxyType({"error": error})
+
+        table = get_table()
+        point = lattice_point(isa_dev, msa, fuel_burn)
+        if point is None:
+            # Off the lattice or not finite: evaluated as given and not stored
+            return MappingProxyType(self._evaluate(table, isa_dev, msa, fuel_burn))
+        key = (table.version,) + point
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Computed outside the lock; two threads missing on the same key both
+        # compute it and the second store wins
+        result = self._evaluate(table, *key[1:])
+        size = _entry_size(key, result)
+        result = MappingProxyType(result)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._entries[key] = (result, size)
+            self._nbytes += size
+            while len(self._entries) > self.maxsize:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_size
+                self._evictions += 1
+        return result
+
+    __call__ = calculate
+
+    def _evaluate(self, table: ZntolTable, isa_dev: float, msa: float, fuel_burn: float) -> dict:
+        if self._calculate is not None:
+            return self._calculate(isa_dev, msa, fuel_burn)
+        return get_lookup(table).calculate(isa_dev, msa, fuel_burn)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, self.maxsize, len(self._entries),
+                self._nbytes + sys.getsizeof(self._entries),
+            )
+
+    def clear(self) -> None:
+        # Drops every entry and resets the counters
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._nbytes = 0
+
+
+# Shared by every caller in the process; ZNTOL_CACHE_SIZE sets the bound
+@lru_cache(maxsize=None)
+def get_result_cache() -> ResultCache:
+    return ResultCache(int(os.environ.get("ZNTOL_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
@@ -0,0 +1,238 @@
+# zntol/curves.py
+# Per-route ZNTOL-vs-ISA curves for daily dispatch
+#
+# A route's obstacles (MSA and cumulative fuel burn) change rarely; only the
+# temperature changes from day to day. compile_curves evaluates every route
+# once on the 0.1 °C ISA lattice of the dense lookup and keeps the route ZNTOL
+# (lowest over its obstacles, before rounding) as a piecewise-linear curve.
+# Lattice points that the neighbouring knots reproduce to within
+# CURVE_TOLERANCE are dropped, so straight stretches cost two knots. Dispatch
+# is then one 1-D interpolation per flight. It is exact to within
+# CURVE_TOLERANCE at lattice ISAs and linear between them.
+#
+# ZNTOL steps down just above STEP_ISA, where the early-drop blend ends, so
+# the curve also has a point on the right-hand side of the step and never
+# interpolates across it. Elsewhere ZNTOL is continuous and concave between
+# lattice points, so the line between them does not overestimate it.
+#
+# Curves are saved in the same container layout as compiled tables, together
+# with the route definitions and the version of the table they were built
+# from. load_curves rebuilds and rewrites the file when the table version
+# changes, so stale curves are never served.
+
+import numpy as np
+
+from .artifact import ArtifactError, map_file, pack, unpack, write_atomic
+from .limits import check_inputs_batch, obstacle_weight_batch
+from .lookup import ISA_STEPS_PER_DEG, DenseLookup, get_lookup
+from .route import check_offsets, route_errors
+from .tables import MAX_ISA, MIN_ISA, STRUCTURAL_MTOW, ZntolTable, get_table
+
+MAGIC = b"ZNTOLRC\0"
+FORMAT_VERSION = 1
+ARRAYS = ("route_offsets", "msa", "fuel_burn", "error", "knot_offsets", "knot_pos", "knot_zntol")
+
+CURVE_TOLERANCE = 1e-6  # lbs, before rounding
+CHUNK_OBSTACLES = 16384
+
+LATTICE = np.arange(MIN_ISA * ISA_STEPS_PER_DEG, MAX_ISA * ISA_STEPS_PER_DEG + 1) / ISA_STEPS_PER_DEG
+
+# Curve points: the lattice plus the right-hand side of the blend step, at
+# index STEP + 1 (STEP is the lattice index of STEP_ISA)
+STEP_ISA = 2.0  # °C, end of the early-drop blend (limits.obstacle_weight)
+STEP = round((STEP_ISA - MIN_ISA) * ISA_STEPS_PER_DEG)
+POINTS = np.insert(LATTICE, STEP + 1, np.nextafter(STEP_ISA, np.inf))
+_LATTICE_HEADER = [MIN_ISA, MAX_ISA, ISA_STEPS_PER_DEG, STEP_ISA]  # older indexes are rebuilt
+
+
+class RouteCurves:
+    def __init__(self, arrays: dict, table_version: str, names: list | None = None):
+        # arrays as listed in ARRAYS; see compile_curves()
+        self.route_offsets = arrays["route_offsets"]
+        self.msa = arrays["msa"]
+        self.fuel_burn = arrays["fuel_burn"]
+        self.error = arrays["error"]
+        self.knot_offsets = arrays["knot_offsets"]
+        self.knot_pos = arrays["knot_pos"]
+        self.knot_zntol = arrays["knot_zntol"]
+        self.table_version = table_version
+        self.names = names
+
+        # Knots of all routes on one sorted axis: route r, point p sits at
+        # r * stride + p, so one searchsorted serves every route
+        self._stride = len(POINTS)
+        knot_route = np.repeat(np.arange(len(self)), np.diff(self.knot_offsets))
+        self._keys = knot_route * self._stride + self.knot_pos.astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.route_offsets) - 1
+
+    def arrays(self) -> dict:
+        return {name: getattr(self, name) for name in ARRAYS}
+
+    def route_index(self, names) -> np.ndarray:
+        if self.names is None:
+            raise ValueError("these curves were compiled without route names")
+        lookup = {name: k for k, name in enumerate(self.names)}
+        try:
+            return np.array([lookup[name] for name in names], dtype=np.int64)
+        except KeyError as exc:
+            raise ValueError(f"unknown route {exc.args[0]!r}") from None
+
+    def curve(self, route: int) -> tuple:
+        # (ISA deviations, ZNTOL before rounding) at the knots of one route
+        knots = slice(self.knot_offsets[route], self.knot_offsets[route + 1])
+        return POINTS[self.knot_pos[knots]], self.knot_zntol[knots]
+
+    def evaluate(self, route, isa_dev) -> dict:
+        # Columns like calculate_zntol_batch: zntol (int64, 0 on error) and
+        # error (ERRORS code of the route, or of the ISA deviation check)
+        route = np.asarray(route, dtype=np.int64)
+        isa_dev = np.asarray(isa_dev, dtype=float)
+        route, isa_dev = np.broadcast_arrays(route, isa_dev)
+        if ((route < 0) | (route >= len(self))).any():
+            raise IndexError("route index out of range")
+
+        isa_error = check_inputs_batch(isa_dev=isa_dev)
+        error = np.where(isa_error != 0, isa_error, self.error[route]).astype(np.int8)
+        ok = error == 0
+        pos = (np.where(ok, isa_dev, MIN_ISA) - MIN_ISA) * ISA_STEPS_PER_DEG
+        whole = np.rint(pos)
+        pos = np.where(np.abs(pos - whole) < 1e-9, whole, pos)  # lattice ISAs land on their knot
+        # Position among POINTS: above STEP_ISA, one further along, so ISAs
+        # just above the step read its right-hand side
+        pos = pos + (np.where(ok, isa_dev, MIN_ISA) > STEP_ISA)
+
+        # Segment [j, j + 1] of the route's knots containing pos; routes with
+        # an error have no knots and read knot 0 (or nothing) instead
+        first, last = self.knot_offsets[route], self.knot_offsets[route + 1] - 1
+        j = np.searchsorted(self._keys, route * self._stride + pos, side="right") - 1
+        j = np.clip(j, first, np.maximum(last - 1, first))
+        k = np.minimum(j + 1, last)
+        if not len(self.knot_pos):
+            return {"zntol": np.zeros(route.shape, dtype=np.int64), "error": error}
+        j, k = np.where(ok, j, 0), np.where(ok, k, 0)
+        p0, p1 = self.knot_pos[j].astype(float), self.knot_pos[k].astype(float)
+        v0, v1 = self.knot_zntol[j], self.knot_zntol[k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = np.where(p1 > p0, v0 + (v1 - v0) * (pos - p0) / (p1 - p0), v0)
+        return {
+            "zntol": np.where(ok, np.rint(value), 0).astype(np.int64),
+            "error": error,
+        }
+
+    def save(self, path) -> None:
+        header = {"format": FORMAT_VERSION, "table_version": self.table_version, "names": self.names,
+                  "lattice": _LATTICE_HEADER, "tolerance": CURVE_TOLERANCE}
+        write_atomic(path, pack(MAGIC, header, {name: np.ascontiguousarray(a) for name, a in self.arrays().items()},
+                                ARRAYS))
+
+
+def compile_curves(msa, fuel_burn, offsets, table: ZntolTable | None = None, names: list | None = None) -> RouteCurves:
+    # Routes as in evaluate_routes: obstacles offsets[r]:offsets[r + 1]
+    # belong to route r. A route with an invalid obstacle (or none) gets that
+    # error for every ISA instead of a curve.
+    msa = np.ravel(np.asarray(msa, dtype=float))
+    fuel_burn = np.broadcast_to(np.asarray(fuel_burn, dtype=float), msa.shape).copy()
+    offsets = check_offsets(offsets, len(msa))
+    if names is not None and len(names) != len(offsets) - 1:
+        raise ValueError("names must have one entry per route")
+    if table is None:
+        table = get_table()
+    lookup = get_lookup(table) if table == get_table() else DenseLookup(table)
+
+    # Route errors from the MSA and fuel burn checks (ISA is checked per lookup)
+    lengths = np.diff(offsets)
+    obstacle_error = check_inputs_batch(msa=msa, fuel_burn=fuel_burn)
+    error = route_errors(obstacle_error, offsets)
+
+    curves = np.zeros((len(lengths), len(POINTS)))
+    start = 0
+    while start < len(lengths):
+        # Routes whose obstacles fit in one chunk (at least one route)
+        stop = max(start + 1, int(np.searchsorted(offsets, offsets[start] + CHUNK_OBSTACLES, side="right")) - 1)
+        stop = min(stop, len(lengths))
+        rows = np.arange(start, stop)
+        rows = rows[(error[rows] == 0)]
+        if len(rows):
+            curves[rows] = _route_minimum(msa, fuel_burn, offsets, rows, lookup, table)
+        start = stop
+
+    knot_offsets, knot_pos, knot_zntol = _knots(curves, error == 0)
+    arrays = {"route_offsets": offsets, "msa": msa, "fuel_burn": fuel_burn, "error": error,
+              "knot_offsets": knot_offsets, "knot_pos": knot_pos, "knot_zntol": knot_zntol}
+    return RouteCurves(arrays, table.version, list(names) if names is not None else None)
+
+
+def _route_minimum(msa, fuel_burn, offsets, rows, lookup, table) -> np.ndarray:
+    # ZNTOL before rounding at POINTS, lowest over each route's obstacles
+    starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+    local = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    obstacles = np.repeat(starts - local, lengths) + np.arange(lengths.sum())
+    m = msa[obstacles]
+    effective = np.where(m > 6000, m - 1000, m)
+
+    # Obstacle weight: a column of the dense lookup on its 100 ft lattice, the
+    # batch engine elsewhere
+    j = np.rint((m - lookup.msa_axis[0]) / (lookup.msa_axis[1] - lookup.msa_axis[0])).astype(np.int64)
+    j = np.clip(j, 0, len(lookup.msa_axis) - 1)
+    on_lattice = lookup.msa_axis[j] == m
+    w = np.empty((len(m), len(LATTICE)))
+    w[on_lattice] = lookup.w_obstacle_max[:, j[on_lattice]].T
+    off = np.flatnonzero(~on_lattice)
+    if len(off):
+        w_off, _ = obstacle_weight_batch(np.tile(LATTICE, len(off)), np.repeat(effective[off], len(LATTICE)), table)
+        w[off] = w_off.reshape(len(off), len(LATTICE))
+    w_step, _ = obstacle_weight_batch(np.full(len(m), POINTS[STEP + 1]), effective, table)
+    w = np.insert(w, STEP + 1, w_step, axis=1)
+
+    zntol = np.minimum(w + fuel_burn[obstacles][:, None], STRUCTURAL_MTOW)
+    return np.minimum.reduceat(zntol, local, axis=0)
+
+
+def _knots(curves: np.ndarray, valid: np.ndarray) -> tuple:
+    # Keep the ends, both sides of the step and every point where the curve
+    # bends; a route whose reduced curve misses a dropped point by more than
+    # CURVE_TOLERANCE keeps all of its points. With the step points always
+    # kept, no segment spans the uneven spacing around them.
+    n_routes, n = curves.shape
+    bend = np.zeros(curves.shape, dtype=bool)
+    bend[:, [0, STEP, STEP + 1, -1]] = True
+    bend[:, 1:-1] = np.abs(curves[:, :-2] - 2 * curves[:, 1:-1] + curves[:, 2:]) > CURVE_TOLERANCE
+
+    pos = np.arange(n)
+    left = np.maximum.accumulate(np.where(bend, pos, 0), axis=1)
+    right = np.minimum.accumulate(np.where(bend, pos, n - 1)[:, ::-1], axis=1)[:, ::-1]
+    rows = np.arange(n_routes)[:, None]
+    v0, v1 = curves[rows, left], curves[rows, right]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rebuilt = np.where(right > left, v0 + (v1 - v0) * (pos - left) / (right - left), v0)
+    bend[np.abs(rebuilt - curves).max(axis=1) > CURVE_TOLERANCE] = True
+
+    # Routes with an error get no knots
+    bend[~valid] = False
+    counts = bend.sum(axis=1)
+    knot_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    route, knot = np.nonzero(bend)
+    return knot_offsets, knot.astype(np.uint16), curves[route, knot]
+
+
+def load_curves(path, table: ZntolTable | None = None) -> RouteCurves:
+    # Memory-mapped; recompiled from the stored routes and rewritten when they
+    # were built from a different table version
+    if table is None:
+        table = get_table()
+    header, arrays = unpack(map_file(path), MAGIC, ARRAYS, "ZNTOL route curve index")
+    if header.get("format") != FORMAT_VERSION:
+        raise ArtifactError(f"unsupported curve index format {header.get('format')!r} (expected {FORMAT_VERSION})")
+    if header.get("lattice") != _LATTICE_HEADER or header.get("tolerance") != CURVE_TOLERANCE:
+        stale = True
+    else:
+        stale = header["table_version"] != table.version
+    if not stale:
+        return RouteCurves(arrays, header["table_version"], header["names"])
+
+    curves = compile_curves(arrays["msa"], arrays["fuel_burn"], arrays["route_offsets"], table=table,
+                            names=header["names"])
+    curves.save(path)
+    return curves
@@ -0,0 +1,185 @@
+# zntol/interpolation.py
+# 2D linear interpolation over ISA and MSA on the weight grid
+#
+# BilinearKernel evaluates the same piecewise-bilinear surface as
+# RectBivariateSpline(isa_grid, msa_grid, weight_grid, kx=1, ky=1), without
+# FITPACK. Each grid cell is one bilinear patch, and its coefficients are
+# precomputed into a contiguous structured array (CELL_DTYPE) when the table
+# is built. A query finds its cell and evaluates one closed-form expression.
+#
+# Equivalence guarantee: for every finite input, scalar() and batch() return
+# exactly the float the spline returns, bit for bit, including points on
+# knots and points outside the grid (clamped to the edge, like FITPACK).
+# That holds because the patch is kept in the tensor-product form FITPACK
+# evaluates: corner values z00..z11 weighted by the fpbspl basis values
+# hx = f * (t[l+1] - x), f * (x - t[l]) and summed left to right, with
+# f = 1 / (t[l+1] - t[l]) precomputed per interval. Expanding the patch into
+# monomials a + b*isa + c*msa + d*isa*msa would round differently (measured:
+# about half of all points differ, by up to 2e-11 lb). That form is not used.
+# benchmarks/bench_bilinear.py checks the guarantee and exits non-zero on any
+# mismatch.
+
+from bisect import bisect_right
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tables import ZntolTable
+
+# Coefficients of one cell's patch: corner values at (isa, msa) =
+# (lo, lo), (lo, hi), (hi, lo), (hi, hi)
+CELL_DTYPE = np.dtype([("z00", "<f8"), ("z01", "<f8"), ("z10", "<f8"), ("z11", "<f8")])
+
+
+class BilinearKernel:
+    def __init__(self, isa_grid: np.ndarray, msa_grid: np.ndarray, isa_inv: np.ndarray, msa_inv: np.ndarray,
+                 cells: np.ndarray):
+        # Precomputed coefficients, e.g. straight from a compiled artifact;
+        # use from_grid() to derive them from a weight grid
+        self.isa_grid = isa_grid
+        self.msa_grid = msa_grid
+        self.isa_inv = isa_inv
+        self.msa_inv = msa_inv
+        self.cells = cells
+
+        # One flat column per coefficient for the batch path (cell k = i * ny + j).
+        # Strided views, not copies: a table attached from shared memory keeps
+        # no private copy of its cells, and a cell's four corners share a cache line
+        self._corners = [self.cells[name].reshape(-1) for name in CELL_DTYPE.names]
+        self._isa_locator = _CellLocator(self.isa_grid)
+        self._msa_locator = _CellLocator(self.msa_grid)
+
+    # Plain-Python copies for the scalar path, built on the first scalar call:
+    # processes that only run batches (e.g. bulk workers attached to a shared
+    # table) never hold them
+    @cached_property
+    def _axes(self) -> tuple:
+        return self.isa_grid.tolist(), self.msa_grid.tolist(), self.isa_inv.tolist(), self.msa_inv.tolist()
+
+    @cached_property
+    def _cells(self) -> list:
+        return self.cells.tolist()
+
+    @classmethod
+    def from_grid(cls, isa_grid: np.ndarray, msa_grid: np.ndarray, weight_grid: np.ndarray) -> "BilinearKernel":
+        isa_grid = np.asarray(isa_grid, dtype=float)
+        msa_grid = np.asarray(msa_grid, dtype=float)
+        z = np.asarray(weight_grid, dtype=float)
+
+        # Per-interval reciprocal widths (FITPACK's f = 1 / (t[l+1] - t[l]))
+        isa_inv = 1.0 / np.diff(isa_grid)
+        msa_inv = 1.0 / np.diff(msa_grid)
+
+        # Per-cell patch coefficients, one contiguous record per cell
+        cells = np.empty((len(isa_grid) - 1, len(msa_grid) - 1), dtype=CELL_DTYPE)
+        cells["z00"], cells["z01"] = z[:-1, :-1], z[:-1, 1:]
+        cells["z10"], cells["z11"] = z[1:, :-1], z[1:, 1:]
+        return cls(isa_grid, msa_grid, isa_inv, msa_inv, cells)
+
+    def __call__(self, isa_dev, msa):
+        if isinstance(isa_dev, (int, float)) and isinstance(msa, (int, float)):
+            return self.scalar(float(isa_dev), float(msa))
+        return self.batch(isa_dev, msa)
+
+    def scalar(self, isa_dev: float, msa: float) -> float:
+        xs, ys, isa_inv, msa_inv = self._axes
+        x = min(max(isa_dev, xs[0]), xs[-1])
+        y = min(max(msa, ys[0]), ys[-1])
+        i = min(max(bisect_right(xs, x) - 1, 0), len(xs) - 2)
+        j = min(max(bisect_right(ys, y) - 1, 0), len(ys) - 2)
+
+        fx, fy = isa_inv[i], msa_inv[j]
+        hx0, hx1 = fx * (xs[i + 1] - x), fx * (x - xs[i])
+        hy0, hy1 = fy * (ys[j + 1] - y), fy * (y - ys[j])
+
+        z00, z01, z10, z11 = self._cells[i][j]
+        return z00 * hx0 * hy0 + z01 * hx0 * hy1 + z10 * hx1 * hy0 + z11 * hx1 * hy1
+
+    def batch(self, isa_dev, msa) -> np.ndarray:
+        xs, ys = self.isa_grid, self.msa_grid
+        x = np.clip(np.asarray(isa_dev, dtype=float), xs[0], xs[-1])
+        y = np.clip(np.asarray(msa, dtype=float), ys[0], ys[-1])
+        i = self._isa_locator(x)
+        j = self._msa_locator(y)
+
+        fx, fy = self.isa_inv.take(i), self.msa_inv.take(j)
+        hx0, hx1 = fx * (xs.take(i + 1) - x), fx * (x - xs.take(i))
+        hy0, hy1 = fy * (ys.take(j + 1) - y), fy * (y - ys.take(j))
+
+        k = i * (len(ys) - 1) + j
+        z00, z01, z10, z11 = (c.take(k) for c in self._corners)
+        return z00 * hx0 * hy0 + z01 * hx0 * hy1 + z10 * hx1 * hy0 + z11 * hx1 * hy1
+
+    def gradient(self, isa_dev, msa, side_isa: int = 0, side_msa: int = 0) -> tuple:
+        # (value, d/dISA per °C, d/dMSA per ft) from one cell lookup; the value
+        # is batch() exactly unless a side of -1 moves a point on a knot to the
+        # cell below it (then it agrees to rounding). side_isa/side_msa pick
+        # the cell a point on a knot belongs to: +1 the cell above it (as
+        # batch() does), -1 the one below. Outside the grid the surface is
+        # flat, and so is the outward side of its edge.
+        xs, ys = self.isa_grid, self.msa_grid
+        x0, y0 = np.broadcast_arrays(np.asarray(isa_dev, dtype=float), np.asarray(msa, dtype=float))
+        shape = x0.shape
+        x0, y0 = x0.reshape(-1), y0.reshape(-1)  # scalars too, for the masked zeroing below
+        x, y = np.clip(x0, xs[0], xs[-1]), np.clip(y0, ys[0], ys[-1])
+        i = self._isa_locator(x)
+        j = self._msa_locator(y)
+        if side_isa < 0:
+            i -= (x == xs.take(i)) & (i > 0)
+        if side_msa < 0:
+            j -= (y == ys.take(j)) & (j > 0)
+
+        fx, fy = self.isa_inv.take(i), self.msa_inv.take(j)
+        hx0, hx1 = fx * (xs.take(i + 1) - x), fx * (x - xs.take(i))
+        hy0, hy1 = fy * (ys.take(j + 1) - y), fy * (y - ys.take(j))
+
+        k = i * (len(ys) - 1) + j
+        z00, z01, z10, z11 = (c.take(k) for c in self._corners)
+        value = z00 * hx0 * hy0 + z01 * hx0 * hy1 + z10 * hx1 * hy0 + z11 * hx1 * hy1
+        d_isa = fx * (hy0 * (z10 - z00) + hy1 * (z11 - z01))
+        d_msa = fy * (hx0 * (z01 - z00) + hx1 * (z11 - z10))
+
+        d_isa[_outside(x0, xs, side_isa)] = 0.0
+        d_msa[_outside(y0, ys, side_msa)] = 0.0
+        return value.reshape(shape), d_isa.reshape(shape), d_msa.reshape(shape)
+
+
+def _outside(v: np.ndarray, grid: np.ndarray, side: int) -> np.ndarray:
+    # Points where the clamped surface is flat in the direction of side
+    if side > 0:
+        return (v < grid[0]) | (v >= grid[-1])
+    if side < 0:
+        return (v <= grid[0]) | (v > grid[-1])
+    return (v < grid[0]) | (v > grid[-1])
+
+
+class _CellLocator:
+    # Vectorized replacement for searchsorted(grid, v, "right") - 1 clipped to
+    # the last cell, for values already clipped to the grid. A uniform bin
+    # table at half the smallest spacing gives the cell to within one, and a
+    # comparison either side settles points next to a knot.
+    def __init__(self, grid: np.ndarray):
+        self.origin = grid[0]
+        self.inv_step = 2.0 / np.diff(grid).min()
+        n_bins = int(np.ceil((grid[-1] - grid[0]) * self.inv_step)) + 1
+        starts = grid[0] + np.arange(n_bins) / self.inv_step
+        self.bins = np.clip(np.searchsorted(grid, starts, side="right") - 1, 0, len(grid) - 2)
+        self.lower = grid[:-1]
+        self.upper = np.append(grid[1:-1], np.inf)  # last cell is closed on the right
+
+    def __call__(self, v: np.ndarray) -> np.ndarray:
+        b = ((v - self.origin) * self.inv_step).astype(np.intp)
+        i = self.bins.take(b, mode="clip")  # NaN casts to an arbitrary bin; it stays NaN below
+        i -= v < self.lower.take(i)
+        i += v >= self.upper.take(i)
+        return i
+
+
+def interpolate(table: "ZntolTable", isa_dev: float, msa: float) -> float:
+    return table.kernel.scalar(isa_dev, msa)
+
+
+def interpolate_batch(table: "ZntolTable", isa_dev: np.ndarray, msa: np.ndarray) -> np.ndarray:
+    return table.kernel.batch(isa_dev, msa)
@@ -0,0 +1,312 @@
+# zntol/inverse.py
+# Inverse queries: highest obstacle MSA, or warmest ISA deviation, that still
+# allows a takeoff weight
+#
+# For a fixed ISA deviation the obstacle weight is piecewise linear in
+# effective MSA. The pieces are split at the grid's MSA knots, the structural
+# threshold and the pull-down threshold, and each piece uses one rule (a
+# structural limit, a blend with a fixed fraction, the bare table value, or
+# the table value minus a fixed pull-down). So instead of bisecting,
+# solve_max_msa evaluates every breakpoint once and solves each piece's
+# linear equation in closed form. The answer is the largest solution over
+# all pieces, which is also correct where the weight does not fall
+# monotonically with MSA.
+#
+# Over ISA at a fixed MSA the weight is piecewise linear, except in the
+# structural blend (0 < ISA <= 5 at low MSA). There frac ** 1.8 and the blend
+# with the table make it curved, and it steps down at ISA +2. The pull-down
+# can make the weight rise with ISA below -10 (PULLDOWN_ISA of the table's
+# tuning). solve_max_isa splits the ISA range at the grid knots and at
+# PULLDOWN_ISA, 0, +2 and +5, and cuts the blend pieces
+# into short sub-pieces. It solves linear pieces in closed form and bisects
+# the blend. Legality is not always one threshold, so the result also gives
+# the legal bracket [min_isa, max_isa] that ends at the warmest legal ISA.
+
+import numpy as np
+
+from .interpolation import interpolate_batch
+from .limits import apply_rules, check_inputs_batch
+from .tables import (
+    HIGH_MSA_PULLDOWN_THRESHOLD,
+    MAX_ISA,
+    MAX_MSA,
+    MIN_ISA,
+    MIN_MSA,
+    STRUCTURAL_MSA_THRESHOLD,
+    STRUCTURAL_MTOW,
+    ZntolTable,
+    get_table,
+)
+
+CHUNK_SIZE = 65536
+
+# Blend pieces are cut into this many sub-pieces, each bisected to this depth
+BLEND_SUBDIVISIONS = 8
+BISECTION_STEPS = 60
+
+# What bounds the answer; index into this tuple for the text
+LIMITS = (
+    "obstacle weight",
+    "top of MSA range",
+    f"takeoff weight above structural limit ({STRUCTURAL_MTOW:,} lbs)",
+    f"obstacle weight too low at {MIN_MSA:,} ft",
+)
+ISA_LIMITS = (
+    "obstacle weight",
+    "top of ISA range",
+    f"takeoff weight above structural limit ({STRUCTURAL_MTOW:,} lbs)",
+    "not legal at any ISA deviation",
+)
+
+
+def _effective(msa: float) -> float:
+    return msa - 1000 if msa > 6000 else msa
+
+
+def breakpoints(table: ZntolTable) -> np.ndarray:
+    # Effective MSAs that split the valid range into linear pieces
+    lo, hi = _effective(MIN_MSA), _effective(MAX_MSA)
+    points = np.concatenate([table.msa_grid, [lo, hi, STRUCTURAL_MSA_THRESHOLD, HIGH_MSA_PULLDOWN_THRESHOLD]])
+    points = np.unique(points.astype(float))
+    return points[(points >= lo) & (points <= hi)]
+
+
+def solve_max_msa(isa_dev, fuel_burn, takeoff_weight, table: ZntolTable | None = None) -> dict:
+    # Columns, one row per query:
+    #   max_msa   highest MSA (ft) with calculate_zntol(...)["zntol"] >= the
+    #             takeoff weight before rounding; NaN when none or on error
+    #   source    SOURCES code of the rule that applies at max_msa (-1 if none)
+    #   limit     LIMITS code
+    #   error     ERRORS code (ISA and fuel burn checks as in calculate_zntol)
+    isa_dev = np.asarray(isa_dev, dtype=float)
+    fuel_burn = np.asarray(fuel_burn, dtype=float)
+    takeoff_weight = np.asarray(takeoff_weight, dtype=float)
+    if not isa_dev.shape == fuel_burn.shape == takeoff_weight.shape:
+        raise ValueError("isa_dev, fuel_burn and takeoff_weight must have the same shape")
+    if table is None:
+        table = get_table()
+
+    shape = isa_dev.shape
+    isa_dev, fuel_burn, takeoff_weight = (a.ravel() for a in (isa_dev, fuel_burn, takeoff_weight))
+    result = {
+        "max_msa": np.full(isa_dev.shape, np.nan),
+        "source": np.full(isa_dev.shape, -1, dtype=np.int8),
+        "limit": np.zeros(isa_dev.shape, dtype=np.int8),
+        "error": check_inputs_batch(isa_dev=isa_dev, fuel_burn=fuel_burn),
+    }
+    edges = breakpoints(table)
+    for start in range(0, len(isa_dev), CHUNK_SIZE):
+        rows = slice(start, start + CHUNK_SIZE)
+        _solve_chunk(isa_dev[rows], takeoff_weight[rows] - fuel_burn[rows], takeoff_weight[rows], edges, table,
+                     {name: column[rows] for name, column in result.items()})
+    return {name: column.reshape(shape) for name, column in result.items()}
+
+
+def _solve_chunk(isa_dev, need, takeoff_weight, edges, table, out) -> None:
+    # need: obstacle weight required; out: views of the result columns
+    ok = out["error"] == 0
+    over = ok & (takeoff_weight > STRUCTURAL_MTOW)
+    out["limit"][over] = 2
+    ok &= ~over
+
+    # Obstacle weight is clipped to [4600, MTOW], so the clip never decides:
+    # any need at or below 4600 clears the whole range
+    clear = ok & (need <= 4600)
+    ok &= ~clear
+
+    isa = isa_dev[ok][:, None]
+    need_ok = need[ok][:, None]
+    n, k = len(isa), len(edges)
+    a, b = edges[:-1], edges[1:]
+    mid = (a + b) / 2
+
+    # Table values at every breakpoint, then each piece's rule applied at
+    # both of its ends (a piece ending on a threshold uses its own rule there)
+    grid_isa = np.broadcast_to(isa, (n, k))
+    s = interpolate_batch(table, grid_isa.ravel(), np.broadcast_to(edges, (n, k)).ravel()).reshape(n, k)
+    piece_isa = np.broadcast_to(isa, (n, k - 1)).ravel()
+    low = np.broadcast_to(mid <= STRUCTURAL_MSA_THRESHOLD, (n, k - 1)).ravel()
+    high = np.broadcast_to(mid > HIGH_MSA_PULLDOWN_THRESHOLD, (n, k - 1)).ravel()
+    ga, source = apply_rules(piece_isa, s[:, :-1].ravel(), low, high, table.constants)
+    gb, _ = apply_rules(piece_isa, s[:, 1:].ravel(), low, high, table.constants)
+    ga, gb, source = ga.reshape(n, k - 1), gb.reshape(n, k - 1), source.reshape(n, k - 1)
+
+    # Largest point of each piece where the weight reaches need: its right
+    # end, or the root of the line when only the left end clears
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = a + (need_ok - ga) * (b - a) / (gb - ga)
+    best = np.where(gb >= need_ok, b, np.where(ga >= need_ok, root, -np.inf))
+
+    piece = best.argmax(axis=1)
+    e = best[np.arange(n), piece]
+    found = np.isfinite(e)
+
+    idx = np.flatnonzero(ok)
+    out["max_msa"][idx[found]] = e[found] + (MAX_MSA - _effective(MAX_MSA))
+    out["source"][idx] = np.where(found, source[np.arange(n), piece], -1)
+    out["limit"][idx] = np.where(~found, 3, np.where(e == edges[-1], 1, 0))
+
+    # Whole range clears: the top rule decides the source
+    if clear.any():
+        top = np.full(clear.sum(), edges[-1])
+        _, top_source = apply_rules(isa_dev[clear], np.zeros(top.shape),
+                                    top <= STRUCTURAL_MSA_THRESHOLD, top > HIGH_MSA_PULLDOWN_THRESHOLD,
+                                    table.constants)
+        out["max_msa"][clear] = MAX_MSA
+        out["source"][clear] = top_source
+        out["limit"][clear] = 1
+
+
+# ────────────────────────────────────────────────
+# Warmest ISA deviation for a takeoff weight
+# ────────────────────────────────────────────────
+def isa_breakpoints(table: ZntolTable) -> tuple:
+    # ISA deviations that split the range into pieces, and which pieces lie in
+    # the structural blend (curved at low MSA)
+    points = np.unique(np.concatenate([table.isa_grid, [table.constants["PULLDOWN_ISA"], 0, 2, 5]]).astype(float))
+    points = points[(points >= MIN_ISA) & (points <= MAX_ISA)]
+    pieces = []
+    for a, b in zip(points[:-1], points[1:]):
+        if 0 <= a and b <= 5:
+            pieces.extend(np.linspace(a, b, BLEND_SUBDIVISIONS + 1)[:-1])
+        else:
+            pieces.append(a)
+    edges = np.append(pieces, points[-1])
+    blend = (edges[:-1] >= 0) & (edges[1:] <= 5)
+    return edges, blend
+
+
+def _weight(isa_dev: np.ndarray, effective_msa: np.ndarray, table: ZntolTable) -> tuple:
+    # Obstacle weight before clipping, and its source code
+    interp_value = interpolate_batch(table, isa_dev, effective_msa)
+    return apply_rules(isa_dev, interp_value, effective_msa <= STRUCTURAL_MSA_THRESHOLD,
+                       effective_msa > HIGH_MSA_PULLDOWN_THRESHOLD, table.constants)
+
+
+def solve_max_isa(msa, fuel_burn, takeoff_weight, table: ZntolTable | None = None) -> dict:
+    # Columns, one row per query:
+    #   max_isa   warmest ISA deviation with calculate_zntol(...)["zntol"] >=
+    #             the takeoff weight before rounding; NaN when none or on error
+    #   min_isa   coldest ISA deviation of the legal interval ending at max_isa
+    #   monotone  True when every ISA from -20 up to max_isa is legal, i.e.
+    #             max_isa is a plain go/no-go threshold
+    #   source    SOURCES code of the rule that applies at max_isa (-1 if none)
+    #   limit     ISA_LIMITS code
+    #   error     ERRORS code (MSA and fuel burn checks as in calculate_zntol)
+    msa = np.asarray(msa, dtype=float)
+    fuel_burn = np.asarray(fuel_burn, dtype=float)
+    takeoff_weight = np.asarray(takeoff_weight, dtype=float)
+    if not msa.shape == fuel_burn.shape == takeoff_weight.shape:
+        raise ValueError("msa, fuel_burn and takeoff_weight must have the same shape")
+    if table is None:
+        table = get_table()
+
+    shape = msa.shape
+    msa, fuel_burn, takeoff_weight = (a.ravel() for a in (msa, fuel_burn, takeoff_weight))
+    result = {
+        "max_isa": np.full(msa.shape, np.nan),
+        "min_isa": np.full(msa.shape, np.nan),
+        "monotone": np.zeros(msa.shape, dtype=bool),
+        "source": np.full(msa.shape, -1, dtype=np.int8),
+        "limit": np.zeros(msa.shape, dtype=np.int8),
+        "error": check_inputs_batch(msa=msa, fuel_burn=fuel_burn),
+    }
+    edges, blend = isa_breakpoints(table)
+    for start in range(0, len(msa), CHUNK_SIZE):
+        rows = slice(start, start + CHUNK_SIZE)
+        effective_msa = np.where(msa[rows] > 6000, msa[rows] - 1000, msa[rows])
+        _solve_isa_chunk(effective_msa, takeoff_weight[rows] - fuel_burn[rows], takeoff_weight[rows],
+                         edges, blend, table, {name: column[rows] for name, column in result.items()})
+    return {name: column.reshape(shape) for name, column in result.items()}
+
+
+def _solve_isa_chunk(effective_msa, need, takeoff_weight, edges, blend, table, out) -> None:
+    ok = out["error"] == 0
+    over = ok & (takeoff_weight > STRUCTURAL_MTOW)
+    out["limit"][over] = 2
+    ok &= ~over
+    # The clip to [4600, MTOW] never decides (see _solve_chunk)
+    clear = ok & (need <= 4600)
+    ok &= ~clear
+
+    e = effective_msa[ok]
+    need_ok = need[ok]
+    n, k = len(e), len(edges) - 1
+    rows = np.arange(n)
+
+    # Each piece at the right-hand limit of its left end and at its right end
+    # (pieces are closed on the right, like the rules' <= thresholds)
+    left = np.nextafter(edges[:-1], np.inf)
+    ga, _ = _weight(np.broadcast_to(left, (n, k)).ravel(), np.repeat(e, k), table)
+    gb, source_b = _weight(np.broadcast_to(edges[1:], (n, k)).ravel(), np.repeat(e, k), table)
+    fa = ga.reshape(n, k) >= need_ok[:, None]
+    fb = gb.reshape(n, k) >= need_ok[:, None]
+
+    # Warmest legal point: right end of the last piece with a legal end, or
+    # the crossing inside it when only its left end is legal
+    any_legal = fa | fb
+    found = any_legal.any(axis=1)
+    p = k - 1 - np.argmax(any_legal[:, ::-1], axis=1)
+    p_full = fb[rows, p]
+    max_isa = np.where(p_full, edges[1:][p], np.nan)
+    cross = found & ~p_full
+    max_isa[cross] = _crossing(e[cross], need_ok[cross], p[cross], edges, blend, table, legal_left=True)
+
+    # Coldest point of the legal run ending there: walk left over fully legal
+    # pieces to the last piece q that is not; its crossing (or right end, if
+    # that is illegal) starts the run
+    full = fa & fb
+    j = np.arange(k)
+    q = np.where(~full & (j < p[:, None]), j, -1).max(axis=1)
+    min_isa = np.full(n, np.nan)
+    run_starts_in_p = found & ~fa[rows, p]
+    min_isa[run_starts_in_p] = _crossing(e[run_starts_in_p], need_ok[run_starts_in_p], p[run_starts_in_p],
+                                         edges, blend, table, legal_left=False)
+    extends = found & fa[rows, p]
+    at_bottom = extends & (q < 0)
+    min_isa[at_bottom] = edges[0]
+    q_cross = extends & (q >= 0) & fb[rows, np.maximum(q, 0)]
+    min_isa[q_cross] = _crossing(e[q_cross], need_ok[q_cross], q[q_cross], edges, blend, table, legal_left=False)
+    q_open = extends & (q >= 0) & ~fb[rows, np.maximum(q, 0)]
+    min_isa[q_open] = edges[q[q_open] + 1]
+
+    idx = np.flatnonzero(ok)
+    out["max_isa"][idx] = max_isa
+    out["min_isa"][idx] = min_isa
+    out["monotone"][idx] = at_bottom
+    _, source = _weight(np.where(found, max_isa, 0.0), e, table)
+    out["source"][idx] = np.where(found, source, -1)
+    out["limit"][idx] = np.where(~found, 3, np.where(max_isa == edges[-1], 1, 0))
+
+    if clear.any():
+        top = np.full(clear.sum(), float(edges[-1]))
+        _, top_source = _weight(top, effective_msa[clear], table)
+        out["max_isa"][clear] = edges[-1]
+        out["min_isa"][clear] = edges[0]
+        out["monotone"][clear] = True
+        out["source"][clear] = top_source
+        out["limit"][clear] = 1
+
+
+def _crossing(effective_msa, need, piece, edges, blend, table, legal_left: bool) -> np.ndarray:
+    # Point inside each piece where the weight crosses need, on the legal
+    # side: the last legal point when the left end is legal, else the first
+    a = np.nextafter(edges[:-1][piece], np.inf)
+    b = edges[1:][piece]
+    ga, _ = _weight(a, effective_msa, table)
+    gb, _ = _weight(b, effective_msa, table)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = a + (need - ga) * (b - a) / (gb - ga)
+    x = np.clip(x, a, b)
+
+    curved = blend[piece] & (effective_msa <= STRUCTURAL_MSA_THRESHOLD)
+    if curved.any():
+        lo, hi = a[curved], b[curved]
+        e, w = effective_msa[curved], need[curved]
+        for _ in range(BISECTION_STEPS):
+            mid = (lo + hi) / 2
+            legal = _weight(mid, e, table)[0] >= w
+            moves_lo = legal == legal_left
+            lo, hi = np.where(moves_lo, mid, lo), np.where(moves_lo, hi, mid)
+        x[curved] = lo if legal_left else hi
+    return x
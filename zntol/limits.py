@@ -0,0 +1,233 @@
+# zntol/limits.py
+# ZNTOL rules: structural cap and blend, 2D interpolation, cold/high pull-down
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from .interpolation import interpolate, interpolate_batch
+from .tables import (
+    HIGH_MSA_PULLDOWN_THRESHOLD,
+    MAX_ISA,
+    MAX_MSA,
+    MIN_ISA,
+    MIN_MSA,
+    STRUCTURAL_MSA_THRESHOLD,
+    STRUCTURAL_MTOW,
+    TUNING,
+    ZntolTable,
+    get_table,
+)
+
+OBSTACLE_CACHE_SIZE = 4096
+
+# Source and error codes used by the batch API; index into these tuples for the text
+SOURCES = (
+    "structural limit (cold/low MSA)",
+    "structural blend (low MSA)",
+    "2D linear interpolation (warm/low MSA)",
+    "2D linear interpolation",
+    "2D linear interpolation + cold/high pull-down",
+)
+ERRORS = (
+    None,
+    f"ISA deviation out of range ({MIN_ISA} to +{MAX_ISA} °C)",
+    f"MSA out of range ({MIN_MSA:,}–{MAX_MSA:,} ft)",
+    "Fuel burn cannot be negative",
+    "Route has no obstacles",
+    "Inputs must be finite numbers",
+)
+
+
+def check_inputs(isa_dev: float, msa: float, fuel_burn: float) -> str | None:
+    if isa_dev < MIN_ISA or isa_dev > MAX_ISA:
+        return ERRORS[1]
+    if msa < MIN_MSA or msa > MAX_MSA:
+        return ERRORS[2]
+    if fuel_burn < 0:
+        return ERRORS[3]
+    # NaN passes every range check above
+    if not (math.isfinite(isa_dev) and math.isfinite(msa) and math.isfinite(fuel_burn)):
+        return ERRORS[5]
+    return None
+
+
+def check_inputs_batch(isa_dev=None, msa=None, fuel_burn=None) -> np.ndarray:
+    # ERRORS code per row (int8, 0 when valid): the first failing check, in
+    # the order of check_inputs. Inputs passed as None are not checked.
+    conditions, codes = [], []
+    finite = True
+    if isa_dev is not None:
+        conditions.append((isa_dev < MIN_ISA) | (isa_dev > MAX_ISA))
+        codes.append(1)
+        finite = finite & np.isfinite(isa_dev)
+    if msa is not None:
+        conditions.append((msa < MIN_MSA) | (msa > MAX_MSA))
+        codes.append(2)
+        finite = finite & np.isfinite(msa)
+    if fuel_burn is not None:
+        conditions.append(fuel_burn < 0)
+        codes.append(3)
+        finite = finite & np.isfinite(fuel_burn)
+    conditions.append(~finite)
+    codes.append(5)
+    return np.select(conditions, codes, 0).astype(np.int8)
+
+
+def obstacle_weight(isa_dev: float, effective_msa: float, table: ZntolTable) -> tuple:
+    # Maximum weight at the obstacle and its source for in-range inputs. It
+    # depends only on ISA and effective MSA; fuel burn and the final cap are
+    # applied by the caller. Tuning comes from table.constants.
+
+    # Temperature-dependent structural cap with immediate & steeper blend
+    if effective_msa <= STRUCTURAL_MSA_THRESHOLD:
+        if isa_dev <= 0:
+            w_obstacle_max = STRUCTURAL_MTOW
+            source = "structural limit (cold/low MSA)"
+        elif isa_dev <= 5:
+            # Immediate blend from ISA 0 °C
+            interp_value = interpolate(table, isa_dev, effective_msa)
+            frac = (isa_dev - 0) / 5.0
+            # Steeper initial drop: use quadratic blend for first 2 °C
+            if isa_dev <= 2:
+                # accelerates drop early (try 1.3–1.8 if needed); np.power so the
+                # batch path below rounds identically
+                frac = float(np.power(frac, table.constants["BLEND_EXPONENT"]))
+            w_obstacle_max = STRUCTURAL_MTOW * (1 - frac) + interp_value * frac
+            source = "structural blend (low MSA)"
+        else:
+            w_obstacle_max = interpolate(table, isa_dev, effective_msa)
+            source = "2D linear interpolation (warm/low MSA)"
+    else:
+        # 2D spline interpolation
+        w_obstacle_max = interpolate(table, isa_dev, effective_msa)
+        source = "2D linear interpolation"
+
+        # Cold/high MSA pull-down
+        if isa_dev <= 0 and effective_msa > HIGH_MSA_PULLDOWN_THRESHOLD:
+            c = table.constants
+            pull_down = max(0, -c["PULLDOWN_WEIGHT"] * (isa_dev - c["PULLDOWN_ISA"]) / c["PULLDOWN_SPAN"])
+            w_obstacle_max -= pull_down
+            source += " + cold/high pull-down"
+
+    w_obstacle_max = min(max(w_obstacle_max, 4600), STRUCTURAL_MTOW)
+    return w_obstacle_max, source
+
+
+# Memoized per (ISA, effective MSA, table version): every fuel burn for the
+# same obstacle and temperature reuses one entry
+_obstacle_weight_cached = lru_cache(maxsize=OBSTACLE_CACHE_SIZE)(obstacle_weight)
+obstacle_cache_info = _obstacle_weight_cached.cache_info
+obstacle_cache_clear = _obstacle_weight_cached.cache_clear
+
+
+def calculate_zntol(isa_dev: float, msa: float, fuel_burn: float, table: ZntolTable | None = None) -> dict:
+    error = check_inputs(isa_dev, msa, fuel_burn)
+    if error:
+        return {"error": error}
+
+    if table is None:
+        table = get_table()
+
+    effective_msa = msa - 1000 if msa > 6000 else msa
+    w_obstacle_max, source = _obstacle_weight_cached(isa_dev, effective_msa, table)
+
+    zntol_uncapped = w_obstacle_max + fuel_burn
+    zntol = min(zntol_uncapped, STRUCTURAL_MTOW)
+
+    return {
+        "w_obstacle_max": round(w_obstacle_max),
+        "zntol": round(zntol),
+        "capped": zntol_uncapped > STRUCTURAL_MTOW,
+        "source": source,
+        "effective_msa": round(effective_msa),
+        "error": None,
+        "table_version": table.version,
+    }
+
+
+# ────────────────────────────────────────────────
+# Batch (columnar, same rules as calculate_zntol)
+# ────────────────────────────────────────────────
+def obstacle_weight_batch(isa_dev: np.ndarray, effective_msa: np.ndarray, table: ZntolTable) -> tuple:
+    # Maximum weight at the obstacle and source code for in-range inputs;
+    # fuel burn and the final cap are applied by the caller
+    low = effective_msa <= STRUCTURAL_MSA_THRESHOLD
+    high = effective_msa > HIGH_MSA_PULLDOWN_THRESHOLD
+
+    # Only rows that read the table are sent through the spline
+    interp_value = np.zeros(isa_dev.shape)
+    need = ~(low & (isa_dev <= 0))
+    interp_value[need] = interpolate_batch(table, isa_dev[need], effective_msa[need])
+
+    w_obstacle_max, source = apply_rules(isa_dev, interp_value, low, high, table.constants)
+    w_obstacle_max = np.minimum(np.maximum(w_obstacle_max, 4600), STRUCTURAL_MTOW)
+    return w_obstacle_max, source
+
+
+def apply_rules(isa_dev: np.ndarray, interp_value: np.ndarray, low: np.ndarray, high: np.ndarray,
+                tuning: dict = TUNING) -> tuple:
+    # Obstacle weight before clipping, and its source code, from the table
+    # value and the MSA band: low is effective MSA <= STRUCTURAL_MSA_THRESHOLD,
+    # high is effective MSA > HIGH_MSA_PULLDOWN_THRESHOLD. tuning: the
+    # table's constants (TUNING keys are read).
+    cold = isa_dev <= 0
+    structural = low & cold
+    blend = low & ~cold & (isa_dev <= 5)
+    warm_low = low & ~cold & ~blend
+    pulled = ~low & cold & high
+
+    # Structural blend with the quadratic early drop below ISA +2 °C
+    frac = isa_dev / 5.0
+    early = blend & (isa_dev <= 2)
+    frac[early] = np.power(frac[early], tuning["BLEND_EXPONENT"])
+    blended = STRUCTURAL_MTOW * (1 - frac) + interp_value * frac
+
+    # Cold/high pull-down
+    pull_down = np.where(pulled, np.maximum(0, -tuning["PULLDOWN_WEIGHT"] * (isa_dev - tuning["PULLDOWN_ISA"])
+                                            / tuning["PULLDOWN_SPAN"]), 0.0)
+
+    w_obstacle_max = np.select(
+        [structural, blend, warm_low],
+        [STRUCTURAL_MTOW, blended, interp_value],
+        interp_value - pull_down,
+    )
+    source = np.select([structural, blend, warm_low, pulled], [0, 1, 2, 4], 3).astype(np.int8)
+    return w_obstacle_max, source
+
+
+def calculate_zntol_batch(isa_dev, msa, fuel_burn, table: ZntolTable | None = None) -> dict:
+    isa_dev = np.asarray(isa_dev, dtype=float)
+    msa = np.asarray(msa, dtype=float)
+    fuel_burn = np.asarray(fuel_burn, dtype=float)
+    if not isa_dev.shape == msa.shape == fuel_burn.shape:
+        raise ValueError("isa_dev, msa and fuel_burn must have the same shape")
+
+    # First failing check wins, in the same order as calculate_zntol
+    error = check_inputs_batch(isa_dev, msa, fuel_burn)
+    ok = error == 0
+
+    if table is None:
+        table = get_table()
+
+    effective_msa = np.where(msa > 6000, msa - 1000, msa)
+
+    w_obstacle_max = np.zeros(isa_dev.shape)
+    source = np.full(isa_dev.shape, -1, dtype=np.int8)
+    w_obstacle_max[ok], source[ok] = obstacle_weight_batch(isa_dev[ok], effective_msa[ok], table)
+
+    # Rows with an error are zeroed before the integer casts (NaN has no int)
+    zntol_uncapped = np.where(ok, w_obstacle_max + fuel_burn, 0.0)
+    zntol = np.minimum(zntol_uncapped, STRUCTURAL_MTOW)
+    effective_msa = np.where(ok, effective_msa, 0.0)
+
+    return {
+        "w_obstacle_max": np.rint(w_obstacle_max).astype(np.int64),
+        "zntol": np.rint(zntol).astype(np.int64),
+        "capped": zntol_uncapped > STRUCTURAL_MTOW,
+        "source": source,
+        "effective_msa": np.rint(effective_msa).astype(np.int64),
+        "error": error,
+        "table_version": table.version,
+    }
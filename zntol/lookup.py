@@ -0,0 +1,91 @@
+# zntol/lookup.py
+# Dense precomputed lookup over every UI-reachable (ISA, MSA) input
+#
+# The UI quantizes ISA deviation to 0.1 °C and MSA to 100 ft, and the obstacle
+# weight does not depend on fuel burn, so the whole valid domain is a
+# 501 x 181 table. Queries on that lattice are answered by index; anything
+# else falls back to calculate_zntol.
+
+import numpy as np
+
+from .limits import SOURCES, calculate_zntol, check_inputs, obstacle_weight_batch
+from .tables import MAX_ISA, MAX_MSA, MIN_ISA, MIN_MSA, STRUCTURAL_MTOW, ZntolTable, get_table
+
+ISA_STEPS_PER_DEG, MSA_STEP = 10, 100  # 0.1 °C, 100 ft
+
+
+class DenseLookup:
+    def __init__(self, table: ZntolTable | None = None):
+        if table is None:
+            table = get_table()
+        self.table = table
+        self.version = table.version
+
+        # k / 10 is the double nearest to the decimal the UI sends
+        self.isa_axis = np.arange(MIN_ISA * ISA_STEPS_PER_DEG, MAX_ISA * ISA_STEPS_PER_DEG + 1) / ISA_STEPS_PER_DEG
+        self.msa_axis = np.arange(MIN_MSA, MAX_MSA + 1, MSA_STEP, dtype=float)
+
+        isa, msa = np.meshgrid(self.isa_axis, self.msa_axis, indexing="ij")
+        effective_msa = np.where(msa > 6000, msa - 1000, msa)
+        w_obstacle_max, source = obstacle_weight_batch(isa.ravel(), effective_msa.ravel(), table)
+
+        self.w_obstacle_max = w_obstacle_max.reshape(isa.shape)
+        self.effective_msa = effective_msa.astype(np.int64)
+        self.source = source.reshape(isa.shape)
+
+        # Nested lists for the scalar path: plain indexing, no NumPy scalars
+        self._isa = self.isa_axis.tolist()
+        self._msa = self.msa_axis.tolist()
+        self._w = self.w_obstacle_max.tolist()
+        self._source = self.source.tolist()
+        self._effective_msa = self.effective_msa[0].tolist()
+
+    def index(self, isa_dev: float, msa: float) -> tuple | None:
+        # (i, j) when the input sits exactly on the lattice, else None
+        i = round((isa_dev - MIN_ISA) * ISA_STEPS_PER_DEG)
+        j = round((msa - MIN_MSA) / MSA_STEP)
+        if not (0 <= i < len(self._isa) and 0 <= j < len(self._msa)):
+            return None
+        if self._isa[i] != isa_dev or self._msa[j] != msa:
+            return None
+        return i, j
+
+    def calculate(self, isa_dev: float, msa: float, fuel_burn: float) -> dict:
+        # Same contract and results as calculate_zntol
+        error = check_inputs(isa_dev, msa, fuel_burn)
+        if error:
+            return {"error": error}
+
+        ij = self.index(isa_dev, msa)
+        if ij is None:
+            return calculate_zntol(isa_dev, msa, fuel_burn, self.table)
+        i, j = ij
+
+        w_obstacle_max = self._w[i][j]
+        zntol_uncapped = w_obstacle_max + fuel_burn
+        zntol = min(zntol_uncapped, STRUCTURAL_MTOW)
+
+        return {
+            "w_obstacle_max": round(w_obstacle_max),
+            "zntol": round(zntol),
+            "capped": zntol_uncapped > STRUCTURAL_MTOW,
+            "source": SOURCES[self._source[i][j]],
+            "effective_msa": self._effective_msa[j],
+            "error": None,
+            "table_version": self.version,
+        }
+
+
+# Shared by every caller in the process, for the current table (or the given
+# one): rebuilt when the table version changes, e.g. after a hot reload
+_lookup = None
+
+
+def get_lookup(table: ZntolTable | None = None) -> DenseLookup:
+    global _lookup
+    if table is None:
+        table = get_table()
+    lookup = _lookup
+    if lookup is None or lookup.version != table.version:
+        lookup = _lookup = DenseLookup(table)
+    return lookup
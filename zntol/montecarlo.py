@@ -0,0 +1,161 @@
+# zntol/montecarlo.py
+# Monte Carlo propagation of ISA forecast error and fuel burn uncertainty
+#
+# Each scenario (a flight at one obstacle) draws `samples` ISA deviations and
+# fuel burns from normal distributions around its forecast, evaluates them all
+# with the batch engine, and reports ZNTOL percentiles and the probability of
+# falling below a target weight. Samples are generated and evaluated as
+# (scenarios x samples) blocks; only scenarios are iterated in Python, to seed
+# their streams.
+#
+# Scenario k always draws from SeedSequence(seed, spawn_key=(k,)), its own
+# independent stream, so results depend only on the seed and the scenario's
+# position, never on chunking or the number of processes.
+#
+# A sampled ISA deviation outside the AFM range (-20 to +30 °C) has no ZNTOL.
+# Such samples are left out of the mean, spread and percentiles, count as
+# below any target in p_below, and their share is reported as out_of_range.
+# clip=True instead evaluates them at the nearest end of the range, as if it
+# were legal there. Sampled fuel burns are floored at zero. With processes > 1
+# the table is published once in shared memory (as in evaluate_bulk) and each
+# worker evaluates whole chunks of scenarios.
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .limits import check_inputs_batch, obstacle_weight_batch
+from .shm import attach_shared, private_name, publish_shared, unlink_shared
+from .tables import MAX_ISA, MIN_ISA, STRUCTURAL_MTOW, ZntolTable, get_table
+
+DEFAULT_SAMPLES = 10_000
+DEFAULT_PERCENTILES = (5, 50, 95)
+CHUNK_SAMPLES = 2_000_000  # samples evaluated at once, across scenarios
+
+
+def simulate(isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma=0.0, target=None, samples: int = DEFAULT_SAMPLES,
+             seed: int = 0, percentiles=DEFAULT_PERCENTILES, processes: int = 1, clip: bool = False,
+             table: ZntolTable | None = None) -> dict:
+    # One row per scenario. isa_sigma (°C) and fuel_sigma (lbs) are standard
+    # deviations, scalars or per scenario; target (lbs) likewise, or None.
+    # Columns:
+    #   zntol_mean, zntol_std   of the rounded ZNTOL of in-range samples (NaN
+    #                           when there are none; all samples with clip)
+    #   percentiles             (scenarios, len(percentiles)) array, likewise
+    #   p_below                 P(ZNTOL < target or ISA out of range), only
+    #                           with a target; with clip, P(ZNTOL < target)
+    #   out_of_range            fraction of samples with ISA outside the AFM range
+    #   error                   ERRORS code of the forecast inputs
+    isa_dev = np.ravel(np.asarray(isa_dev, dtype=float))
+    n = len(isa_dev)
+    msa, fuel_burn, isa_sigma, fuel_sigma = (
+        np.broadcast_to(np.asarray(a, dtype=float), (n,)) for a in (msa, fuel_burn, isa_sigma, fuel_sigma)
+    )
+    if target is not None:
+        target = np.broadcast_to(np.asarray(target, dtype=float), (n,))
+    if samples < 1:
+        raise ValueError("samples must be positive")
+    if (isa_sigma < 0).any() or (fuel_sigma < 0).any():
+        raise ValueError("standard deviations cannot be negative")
+    percentiles = tuple(percentiles)
+    if table is None:
+        table = get_table()
+
+    error = check_inputs_batch(isa_dev, msa, fuel_burn)
+    out = {
+        "zntol_mean": np.zeros(n),
+        "zntol_std": np.zeros(n),
+        "percentiles": np.zeros((n, len(percentiles))),
+        "out_of_range": np.zeros(n),
+    }
+    if target is not None:
+        out["p_below"] = np.zeros(n)
+
+    rows = np.flatnonzero(error == 0)
+    per_chunk = max(1, CHUNK_SAMPLES // samples)
+    chunks = [rows[k:k + per_chunk] for k in range(0, len(rows), per_chunk)]
+    args = [(chunk, isa_dev[chunk], msa[chunk], fuel_burn[chunk], isa_sigma[chunk], fuel_sigma[chunk],
+             None if target is None else target[chunk], samples, seed, percentiles, clip) for chunk in chunks]
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(chunks) < 2:
+        results = (_simulate_chunk(*a, table=table) for a in args)
+        _collect(out, zip(chunks, results))
+    else:
+        shared = publish_shared(table, private_name())
+        try:
+            with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), initializer=_init_worker,
+                                     initargs=(shared.name, table.version, table.source_hash)) as pool:
+                _collect(out, zip(chunks, pool.map(_run_chunk, args)))
+        finally:
+            shared.close()
+            unlink_shared(shared.name)
+
+    out["error"] = error
+    return out
+
+
+def _collect(out: dict, results) -> None:
+    for chunk, result in results:
+        for name, column in result.items():
+            out[name][chunk] = column
+
+
+def _simulate_chunk(rows, isa_dev, msa, fuel_burn, isa_sigma, fuel_sigma, target, samples: int, seed: int,
+                    percentiles: tuple, clip: bool, table: ZntolTable) -> dict:
+    # rows are the scenarios' positions in the whole run, used to seed them
+    draws = np.empty((len(rows), 2, samples))
+    for k, row in enumerate(rows.tolist()):
+        rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(row,))))
+        rng.standard_normal(out=draws[k])
+
+    isa = isa_dev[:, None] + isa_sigma[:, None] * draws[:, 0]
+    fuel = fuel_burn[:, None] + fuel_sigma[:, None] * draws[:, 1]
+    outside = (isa < MIN_ISA) | (isa > MAX_ISA)
+    np.clip(isa, MIN_ISA, MAX_ISA, out=isa)  # out-of-range samples are dropped below unless clip
+    np.maximum(fuel, 0, out=fuel)
+
+    effective_msa = np.where(msa > 6000, msa - 1000, msa)
+    w, _ = obstacle_weight_batch(isa.ravel(), np.repeat(effective_msa, samples), table)
+    zntol = np.rint(np.minimum(w.reshape(isa.shape) + fuel, STRUCTURAL_MTOW))
+
+    result = {"out_of_range": outside.mean(axis=1)}
+    if target is not None:
+        below = zntol < target[:, None]
+        result["p_below"] = (below if clip else below | outside).mean(axis=1)
+
+    # Scenarios with every sample in range (all of them with clip) take the
+    # plain reductions; the rest leave their out-of-range samples out
+    partial = np.zeros(len(rows), dtype=bool) if clip else outside.any(axis=1)
+    if not partial.any():
+        result.update(zntol_mean=zntol.mean(axis=1), zntol_std=zntol.std(axis=1),
+                      percentiles=np.percentile(zntol, percentiles, axis=1).T)
+        return result
+
+    full = ~partial
+    result.update(zntol_mean=np.empty(len(rows)), zntol_std=np.empty(len(rows)),
+                  percentiles=np.empty((len(rows), len(percentiles))))
+    z = zntol[full]
+    result["zntol_mean"][full], result["zntol_std"][full] = z.mean(axis=1), z.std(axis=1)
+    result["percentiles"][full] = np.percentile(z, percentiles, axis=1).T
+    z = np.where(outside[partial], np.nan, zntol[partial])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # scenarios with no sample in range give NaN
+        result["zntol_mean"][partial], result["zntol_std"][partial] = np.nanmean(z, axis=1), np.nanstd(z, axis=1)
+        result["percentiles"][partial] = np.nanpercentile(z, percentiles, axis=1).T
+    return result
+
+
+# Per-worker table, set by _init_worker; the parent unlinks the block
+_worker = {}
+
+
+def _init_worker(table_name: str, version: str, source_hash: str) -> None:
+    shared = attach_shared(table_name, version=version, source_hash=source_hash)
+    _worker.update(shared=shared, table=shared.table)
+
+
+def _run_chunk(args: tuple) -> dict:
+    return _simulate_chunk(*args, table=_worker["table"])
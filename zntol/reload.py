@@ -0,0 +1,123 @@
+# zntol/reload.py
+# Hot reload of the AFM data file: background rebuild, atomic snapshot swap
+#
+#   python -m zntol data -o afm.json            # start from the built-in data
+#   ZNTOL_DATA=afm.json python -m zntol serve --watch
+#   watcher = watch_tables("afm.json")          # in any long-running process
+#
+# A daemon thread polls the data file every interval seconds (size, mtime and
+# inode; no extra dependency). When it changes, the thread loads and checks
+# the data and builds the compiled table, all off the request path, then
+# publishes it with set_table(). The swap is one reference assignment:
+# get_table() takes no lock, a request that already holds the old table
+# finishes on it, and the next call sees the new one. Results carry
+# table_version, and the obstacle weight cache, the dense lookup and the
+# result cache are keyed by it, so nothing computed on the old table is
+# served for the new one.
+#
+# A file that does not load (half written, invalid JSON, bad data) leaves the
+# current table in place; the failure is kept in watcher.error and the file is
+# tried again when it next changes. Writing the new file next to the old one
+# and renaming it over it avoids reading a half-written file at all.
+#
+# With ZNTOL_SHARED_TABLE=1 the new table is attached from, or published to,
+# the shared block for its data version (see shm.py), so one process per host
+# builds it.
+
+import os
+import threading
+from functools import lru_cache
+from typing import Callable
+
+from .tables import ZntolTable, afm_source_hash, build_table, get_table, load_data, set_table
+
+DEFAULT_INTERVAL = 1.0  # s
+
+
+class TableWatcher:
+    def __init__(self, path=None, interval: float = DEFAULT_INTERVAL, shared: bool | None = None,
+                 on_reload: Callable | None = None):
+        # path defaults to ZNTOL_DATA; on_reload(table) runs on the watcher
+        # thread after each swap
+        path = path or os.environ.get("ZNTOL_DATA")
+        if not path:
+            raise ValueError("no data file to watch: pass a path or set ZNTOL_DATA")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.path = os.fspath(path)
+        self.interval = interval
+        self.shared = os.environ.get("ZNTOL_SHARED_TABLE") == "1" if shared is None else shared
+        self.on_reload = on_reload
+        self.reloads = 0
+        self.error = None  # last failure, cleared by the next good load
+        self._seen = None  # file signature last acted on
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        # One poll; True when a new table was published
+        try:
+            stat = os.stat(self.path)
+        except OSError as exc:
+            self.error = exc
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._seen:
+            return False
+        self._seen = signature
+
+        try:
+            data = load_data(self.path)
+            if afm_source_hash(data) == get_table().source_hash:
+                self.error = None  # touched, or already the current data
+                return False
+            table = self._build(data)
+        except (OSError, ValueError) as exc:
+            self.error = exc
+            return False
+        set_table(table)
+        self.reloads += 1
+        self.error = None
+        if self.on_reload is not None:
+            self.on_reload(table)
+        return True
+
+    def start(self) -> "TableWatcher":
+        # Checks once right away, so the file's table is current on return
+        if self._thread is None:
+            self.check()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="zntol-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as exc:  # keep watching; e.g. an on_reload failure
+                self.error = exc
+
+    def _build(self, data: dict) -> ZntolTable:
+        if self.shared:
+            from .shm import shared_table
+
+            return shared_table(data=data).table
+        return build_table(data)
+
+
+# Started on first call and shared by every caller in the process (e.g. every
+# Streamlit rerun)
+@lru_cache(maxsize=None)
+def watch_tables(path=None, interval: float = DEFAULT_INTERVAL) -> TableWatcher:
+    return TableWatcher(path, interval).start()
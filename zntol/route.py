@@ -0,0 +1,101 @@
+# zntol/route.py
+# Route profiles: the ZNTOL of a route is the lowest over its obstacles
+#
+# Each obstacle on a route has its own MSA, fuel burned up to that point and
+# ISA deviation. All obstacles of all routes are evaluated in one
+# calculate_zntol_batch call. The limiting obstacle of each route is then
+# picked with segment reductions over CSR-style offsets: route r owns
+# obstacles offsets[r]:offsets[r + 1], like the indptr of a sparse matrix.
+
+import numpy as np
+
+from .limits import ERRORS, SOURCES, calculate_zntol_batch
+from .tables import ZntolTable
+
+# calculate_zntol_batch columns copied from each route's limiting obstacle
+LIMITING_COLUMNS = ("w_obstacle_max", "zntol", "capped", "source", "effective_msa")
+EMPTY_ROUTE = ERRORS.index("Route has no obstacles")
+
+
+def evaluate_routes(isa_dev, msa, fuel_burn, offsets, table: ZntolTable | None = None) -> dict:
+    # Columns, one row per route:
+    #   limiting  index of the limiting obstacle within its route (lowest
+    #             ZNTOL, first one on ties); -1 on error
+    #   w_obstacle_max, zntol, capped, source, effective_msa
+    #             that obstacle's values (0 / -1 on error)
+    #   error     ERRORS code: the first invalid obstacle's code, or "Route
+    #             has no obstacles"
+    #   table_version  version of the table used
+    # plus "obstacles": calculate_zntol_batch columns for every obstacle
+    msa = np.ravel(np.asarray(msa, dtype=float))
+    isa_dev = np.broadcast_to(np.asarray(isa_dev, dtype=float), msa.shape)
+    fuel_burn = np.broadcast_to(np.asarray(fuel_burn, dtype=float), msa.shape)
+    offsets = check_offsets(offsets, len(msa))
+
+    obstacles = calculate_zntol_batch(isa_dev, msa, fuel_burn, table=table)
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    n_routes = len(lengths)
+    filled = lengths > 0
+    error = route_errors(obstacles["error"], offsets)
+    ok = error == 0
+
+    # Lowest ZNTOL per route, then the first obstacle that reaches it
+    limiting = np.full(n_routes, -1, dtype=np.int64)
+    if ok.any():
+        zntol = obstacles["zntol"]
+        route_min = np.minimum.reduceat(zntol, starts[filled])
+        at_min = np.flatnonzero(zntol == np.repeat(np.where(ok[filled], route_min, -1), lengths[filled]))
+        first = at_min[np.searchsorted(at_min, starts[ok])]
+        limiting[ok] = first - starts[ok]
+
+    result = {"limiting": limiting}
+    index = np.where(ok, starts + limiting, 0)
+    for name in LIMITING_COLUMNS:
+        column = obstacles[name][index] if len(msa) else np.zeros(n_routes, dtype=obstacles[name].dtype)
+        fill = -1 if name == "source" else 0
+        result[name] = np.where(ok, column, fill).astype(obstacles[name].dtype)
+    result["error"] = error
+    result["table_version"] = obstacles["table_version"]
+    result["obstacles"] = obstacles
+    return result
+
+
+def evaluate_route(isa_dev, msa, fuel_burn, table: ZntolTable | None = None) -> dict:
+    # One route, with the same keys and value types as calculate_zntol for
+    # the limiting obstacle, plus "limiting" and the per-obstacle "obstacles"
+    msa = np.ravel(np.asarray(msa, dtype=float))
+    result = evaluate_routes(isa_dev, msa, fuel_burn, [0, len(msa)], table=table)
+    error = ERRORS[result["error"][0]]
+    if error:
+        return {"error": error, "limiting": None, "obstacles": result["obstacles"]}
+    return {
+        "w_obstacle_max": int(result["w_obstacle_max"][0]),
+        "zntol": int(result["zntol"][0]),
+        "capped": bool(result["capped"][0]),
+        "source": SOURCES[result["source"][0]],
+        "effective_msa": int(result["effective_msa"][0]),
+        "error": None,
+        "table_version": result["table_version"],
+        "limiting": int(result["limiting"][0]),
+        "obstacles": result["obstacles"],
+    }
+
+
+def route_errors(obstacle_error: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # Per route: the error code of its first failing obstacle, EMPTY_ROUTE
+    # when it has none, else 0
+    error = np.where(np.diff(offsets) > 0, 0, EMPTY_ROUTE).astype(np.int8)
+    bad = np.flatnonzero(obstacle_error != 0)
+    first_bad = np.append(bad, len(obstacle_error))[np.searchsorted(bad, offsets[:-1])]
+    has_bad = (error == 0) & (first_bad < offsets[1:])
+    error[has_bad] = obstacle_error[first_bad[has_bad]]
+    return error
+
+
+def check_offsets(offsets, n_obstacles: int) -> np.ndarray:
+    offsets = np.asarray(offsets)
+    if offsets.ndim != 1 or len(offsets) < 1 or not np.issubdtype(offsets.dtype, np.integer):
+        raise ValueError("offsets must be a 1-D integer array of length n_routes + 1")
+    if offsets[0] != 0 or offsets[-1] != n_obstacles or (np.diff(offsets) < 0).any():
+        raise ValueError(f"offsets must start at 0, end at the obstacle count ({n_obstacles}) and not decrease")
+    return offsets.astype(np.int64)
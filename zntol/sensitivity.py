@@ -0,0 +1,146 @@
+# zntol/sensitivity.py
+# Exact partial derivatives of ZNTOL with respect to ISA deviation and MSA
+#
+# ZNTOL is piecewise smooth: bilinear inside each table cell, with the
+# structural blend and the cold/high pull-down on top, then clipped to the
+# weight limits and capped at the structural MTOW. The derivative is taken
+# branch by branch from the same cell coefficients the engine interpolates
+# with, so it is exact (no finite-difference step). At a kink (a table knot,
+# a rule boundary such as ISA 0/2/5 °C or the 15,000/18,000 ft bands, or a
+# clip/cap becoming active) the two one-sided derivatives differ and both are
+# reported; at a jump they are the slopes of the branch on each side.
+#
+# Most points sit inside one branch and cell, so everything is evaluated once
+# on the branch the engine uses; only rows on a boundary are re-evaluated one
+# side at a time.
+
+import numpy as np
+
+from .limits import check_inputs_batch
+from .tables import HIGH_MSA_PULLDOWN_THRESHOLD, STRUCTURAL_MSA_THRESHOLD, STRUCTURAL_MTOW, ZntolTable, get_table
+
+# Rule boundaries on ISA deviation with the default tuning: pull-down reaches
+# zero, blend starts, early drop ends, blend ends (see isa_breaks())
+ISA_BREAKS = (-10.0, 0.0, 2.0, 5.0)
+MSA_BREAKS = (STRUCTURAL_MSA_THRESHOLD, HIGH_MSA_PULLDOWN_THRESHOLD)  # effective MSA
+
+# A weight this close to a limit counts as on it: interpolating between two
+# corners equal to the limit can land a few ulps past it
+LIMIT_TOLERANCE = 1e-9  # lbs
+
+
+def isa_breaks(table: ZntolTable) -> tuple:
+    # ISA_BREAKS for the table's own tuning
+    return (float(table.constants["PULLDOWN_ISA"]),) + ISA_BREAKS[1:]
+
+
+def calculate_sensitivities(isa_dev, msa, fuel_burn, table: ZntolTable | None = None) -> dict:
+    # Columns like calculate_zntol_batch: zntol and error, plus the one-sided
+    # partials of ZNTOL before rounding, in lbs per °C and lbs per ft of MSA.
+    # kink marks rows where a pair of one-sided values differs. Rows with an
+    # error get zeros. Columns have the input's shape, 0-d for scalars.
+    isa_dev = np.asarray(isa_dev, dtype=float)
+    msa = np.asarray(msa, dtype=float)
+    fuel_burn = np.asarray(fuel_burn, dtype=float)
+    if not isa_dev.shape == msa.shape == fuel_burn.shape:
+        raise ValueError("isa_dev, msa and fuel_burn must have the same shape")
+    if table is None:
+        table = get_table()
+    shape = isa_dev.shape
+    isa_dev, msa, fuel_burn = (a.reshape(-1) for a in (isa_dev, msa, fuel_burn))  # scalars too
+
+    error = check_inputs_batch(isa_dev, msa, fuel_burn)
+    ok = error == 0
+    every = ok.all()
+    x, m, f = (isa_dev, msa, fuel_burn) if every else (isa_dev[ok], msa[ok], fuel_burn[ok])
+    y = np.where(m > 6000, m - 1000, m)  # d(effective MSA)/d(MSA) = 1 here
+
+    # On the engine's own branch; exact for rows away from every boundary
+    w, zntol, d_isa, d_msa = _one_sided(table, x, y, f, 0, 0)
+    edge = (
+        np.isin(x, table.isa_grid) | np.isin(x, isa_breaks(table))
+        | np.isin(y, table.msa_grid) | np.isin(y, MSA_BREAKS)
+        | _on(w, 4600) | _on(w, STRUCTURAL_MTOW) | _on(np.maximum(w, 4600) + f, STRUCTURAL_MTOW)
+    )
+    partials = {}
+    for name, side_isa, side_msa in (("d_isa_minus", -1, 0), ("d_isa_plus", 1, 0),
+                                      ("d_msa_minus", 0, -1), ("d_msa_plus", 0, 1)):
+        d = (d_isa if side_isa else d_msa).copy()
+        _, _, e_isa, e_msa = _one_sided(table, x[edge], y[edge], f[edge], side_isa, side_msa)
+        d[edge] = e_isa if side_isa else e_msa
+        partials[name] = d
+
+    out = {"zntol": np.rint(zntol).astype(np.int64), **partials}
+    if not every:
+        for name, column in out.items():
+            out[name] = np.zeros(isa_dev.shape, dtype=column.dtype)
+            out[name][ok] = column
+    out["kink"] = (out["d_isa_minus"] != out["d_isa_plus"]) | (out["d_msa_minus"] != out["d_msa_plus"])
+    out["error"] = error
+    return {name: column.reshape(shape) for name, column in out.items()}
+
+
+def _one_sided(table: ZntolTable, x, y, fuel_burn, side_isa: int, side_msa: int) -> tuple:
+    # (weight before clipping, ZNTOL before rounding, d/dISA, d/dMSA) on the
+    # branches that hold just above (side +1) or below (-1) the point in one
+    # variable; 0 is the engine's branch. Values match obstacle_weight_batch
+    # and calculate_zntol_batch exactly.
+    def at_most(v, limit, side):
+        # v <= limit, as seen from the given side of v
+        return v < limit if side > 0 else v <= limit
+
+    low = at_most(y, STRUCTURAL_MSA_THRESHOLD, side_msa)
+    high = ~at_most(y, HIGH_MSA_PULLDOWN_THRESHOLD, side_msa)
+    cold = at_most(x, 0, side_isa)
+    structural = low & cold
+    blend = low & ~cold & at_most(x, 5, side_isa)
+    pulled = ~low & cold & high
+
+    interp_value, di_isa, di_msa = table.kernel.gradient(x, y, side_isa, side_msa)
+
+    # Structural blend with the early drop: frac = (x / 5) ** BLEND_EXPONENT below +2 °C
+    c = table.constants
+    exponent = c["BLEND_EXPONENT"]
+    early = blend & at_most(x, 2, side_isa)
+    frac = x / 5.0
+    dfrac = np.full(x.shape, 1 / 5.0)
+    frac[early] = np.power(frac[early], exponent)
+    dfrac[early] = exponent / 5.0 * np.power(x[early] / 5.0, exponent - 1)
+    blended = STRUCTURAL_MTOW * (1 - frac) + interp_value * frac
+
+    # Cold/high pull-down, zero from PULLDOWN_ISA (-10 °C) up
+    weight, zero, span = c["PULLDOWN_WEIGHT"], c["PULLDOWN_ISA"], c["PULLDOWN_SPAN"]
+    pulling = pulled & (x < zero if side_isa > 0 else x <= zero)
+    pull_down = np.where(pulled, np.maximum(0, -weight * (x - zero) / span), 0.0)
+
+    w = np.select([structural, blend], [STRUCTURAL_MTOW, blended], interp_value - pull_down)
+    dw_isa = np.select([structural, blend], [0.0, (interp_value - STRUCTURAL_MTOW) * dfrac + frac * di_isa],
+                       di_isa + np.where(pulling, weight / span, 0.0))
+    dw_msa = np.select([structural, blend], [0.0, frac * di_msa], di_msa)
+
+    # Weight limits, then the structural cap on ZNTOL
+    side = side_isa or side_msa
+    w_clipped = np.minimum(np.maximum(w, 4600), STRUCTURAL_MTOW)
+    dw_isa, dw_msa = (_clipped_slope(w, d, 4600, STRUCTURAL_MTOW, side) for d in (dw_isa, dw_msa))
+    uncapped = w_clipped + fuel_burn
+    zntol = np.minimum(uncapped, STRUCTURAL_MTOW)
+    dz_isa, dz_msa = (_clipped_slope(uncapped, d, -np.inf, STRUCTURAL_MTOW, side) for d in (dw_isa, dw_msa))
+    return w, zntol, dz_isa, dz_msa
+
+
+def _clipped_slope(value, slope, lo, hi, side: int) -> np.ndarray:
+    # Slope of clip(value, lo, hi) on the given side. On a limit it depends on
+    # whether the value moves into the clipped region; with side 0 it is left
+    # as is (such rows are re-evaluated one-sided).
+    if not side:
+        return np.where((value >= lo - LIMIT_TOLERANCE) & (value <= hi + LIMIT_TOLERANCE), slope, 0.0)
+    if side > 0:
+        at_lo, at_hi = np.maximum(slope, 0), np.minimum(slope, 0)
+    else:
+        at_lo, at_hi = np.minimum(slope, 0), np.maximum(slope, 0)
+    inside = (value > lo) & (value < hi)
+    return np.select([_on(value, lo), _on(value, hi), inside], [at_lo, at_hi, slope], 0.0)
+
+
+def _on(value, limit) -> np.ndarray:
+    return np.abs(value - limit) <= LIMIT_TOLERANCE
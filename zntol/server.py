@@ -0,0 +1,381 @@
+# zntol/server.py
+# HTTP/1.1 JSON service over the engine (stdlib asyncio, no framework)
+#
+#   python -m zntol serve [--host 127.0.0.1] [--port 8120]
+#
+#   POST /zntol         {"isa_dev": 5, "msa": 21000, "fuel_burn": 1800}
+#                       -> the calculate_zntol result (422 with "error" for
+#                          out-of-range inputs)
+#   POST /zntol/batch   {"isa_dev": [...], "msa": [...], "fuel_burn": [...]}
+#                       -> calculate_zntol_batch columns as lists; source and
+#                          error are codes into the "sources"/"errors" lists
+#   GET  /healthz       the process is serving
+#   GET  /readyz        200 with the table version once the table is loaded, else 503
+#
+# Results carry the version of the table that produced them. Without a table
+# passed in, every evaluation takes the current snapshot from get_table(), so
+# after a hot reload (python -m zntol serve --watch FILE, see reload.py)
+# batches already running finish on the old table and later ones use the new.
+#
+# Single requests are micro-batched: the first one waits up to window seconds
+# for others, then the lot is evaluated with one calculate_zntol_batch call.
+# Results are exactly those of calculate_zntol. Engine work runs on one worker
+# thread, off the event loop. Pending single requests are bounded by
+# queue_size and batch requests by max_pending_batches; beyond that the
+# server answers 503 with Retry-After instead of queueing without bound.
+# Connections are kept alive (HTTP/1.1 default) until the client closes,
+# asks to, or is idle for idle_timeout seconds.
+
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from .limits import ERRORS, SOURCES, calculate_zntol_batch
+from .tables import ZntolTable, get_table
+
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 8120
+DEFAULT_WINDOW = 0.002  # s
+DEFAULT_MAX_BATCH = 4096  # single requests per evaluation
+DEFAULT_QUEUE_SIZE = 10_000  # pending single requests
+DEFAULT_MAX_PENDING_BATCHES = 16
+MAX_BATCH_ROWS = 1_000_000
+MAX_BODY = 64 * 1024 * 1024  # bytes
+MAX_HEADER = 16 * 1024  # bytes
+IDLE_TIMEOUT = 30.0  # s
+RETRY_AFTER = 1  # s
+
+INPUTS = ("isa_dev", "msa", "fuel_burn")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.close = close
+
+
+class MicroBatcher:
+    # Collects single requests for up to window seconds (or max_batch of
+    # them) and resolves each request's future from one batch evaluation
+    def __init__(self, evaluate, window: float, max_batch: int, queue_size: int):
+        self.evaluate = evaluate  # coroutine: (isa_dev, msa, fuel_burn) arrays -> batch columns
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(queue_size)
+        self.batches = self.requests = 0
+
+    def submit(self, isa_dev: float, msa: float, fuel_burn: float) -> asyncio.Future:
+        # Raises asyncio.QueueFull when queue_size requests are already waiting
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((isa_dev, msa, fuel_burn, future))
+        return future
+
+    async def run(self) -> None:
+        while True:
+            items = [await self.queue.get()]
+            if self.window > 0 and self.queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.window)
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            items = [item for item in items if not item[3].cancelled()]  # client went away
+            if not items:
+                continue
+
+            columns = np.array([item[:3] for item in items], dtype=float).T
+            try:
+                result = await self.evaluate(*columns)
+            except Exception as exc:
+                for item in items:
+                    if not item[3].done():
+                        item[3].set_exception(exc)
+                continue
+            self.batches += 1
+            self.requests += len(items)
+            for k, item in enumerate(items):
+                if not item[3].done():
+                    item[3].set_result(_row(result, k))
+
+
+def _row(result: dict, k: int) -> dict:
+    # Row k of calculate_zntol_batch as calculate_zntol would return it
+    error = int(result["error"][k])
+    if error:
+        return {"error": ERRORS[error]}
+    return {
+        "w_obstacle_max": int(result["w_obstacle_max"][k]),
+        "zntol": int(result["zntol"][k]),
+        "capped": bool(result["capped"][k]),
+        "source": SOURCES[result["source"][k]],
+        "effective_msa": int(result["effective_msa"][k]),
+        "error": None,
+        "table_version": result["table_version"],
+    }
+
+
+class ZntolServer:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, window: float = DEFAULT_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES, idle_timeout: float = IDLE_TIMEOUT,
+                 table: ZntolTable | None = None):
+        if max_batch < 1 or queue_size < 1 or max_pending_batches < 1:
+            raise ValueError("max_batch, queue_size and max_pending_batches must be positive")
+        self.host, self.port = host, port
+        self.window, self.max_batch, self.queue_size = window, max_batch, queue_size
+        self.max_pending_batches = max_pending_batches
+        self.idle_timeout = idle_timeout
+        self.table = table  # None: the current table, see get_table()
+        self.ready = None  # asyncio.Event, set once the table is loaded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zntol-engine")
+        self._server = None
+        self._tasks = []
+        self._pending_batches = 0
+
+    async def start(self) -> None:
+        # Listens at once; /readyz reports 503 until the table has loaded.
+        # With port 0 the chosen port is in self.port afterwards.
+        self.ready = asyncio.Event()
+        self.batcher = MicroBatcher(self._evaluate, self.window, self.max_batch, self.queue_size)
+        self._server = await asyncio.start_server(self._connection, self.host, self.port, limit=MAX_HEADER)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks = [asyncio.create_task(self.batcher.run()), asyncio.create_task(self._load())]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _load(self) -> None:
+        if self.table is None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, get_table)
+        self.ready.set()
+
+    def _table(self) -> ZntolTable:
+        return self.table if self.table is not None else get_table()
+
+    async def _evaluate(self, isa_dev, msa, fuel_burn) -> dict:
+        await self.ready.wait()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, lambda: calculate_zntol_batch(isa_dev, msa, fuel_burn, table=self._table()))
+
+    # ────────────────────────────────────────────────
+    # HTTP
+    # ────────────────────────────────────────────────
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        {"error": "request header too large"}, keep_alive=False)
+                    return
+
+                keep_alive = False
+                try:
+                    method, path, version, headers = _parse_head(head)
+                    keep_alive = _keep_alive(version, headers)
+                    body = await self._body(reader, headers)
+                    status, payload = await self._dispatch(method, path, body)
+                except HTTPError as exc:
+                    keep_alive = keep_alive and not exc.close
+                    status, payload = exc.status, {"error": str(exc)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except Exception:
+                    # A bug, not the client's fault: answer rather than drop the connection
+                    keep_alive = False
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _body(self, reader: asyncio.StreamReader, headers: dict) -> bytes:
+        if "transfer-encoding" in headers:
+            raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "chunked request bodies are not supported", close=True)
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "bad Content-Length", close=True) from None
+        if length < 0 or length > MAX_BODY:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body larger than {MAX_BODY} bytes", close=True)
+        return await reader.readexactly(length) if length else b""
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict | bytes,
+                       keep_alive: bool) -> None:
+        # payload: a dict to encode, or JSON bytes encoded by the handler
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, separators=(",", ":")).encode()
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append(f"Retry-After: {RETRY_AFTER}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        routes = {
+            ("GET", "/healthz"): self._health,
+            ("GET", "/readyz"): self._readiness,
+            ("POST", "/zntol"): self._single,
+            ("POST", "/zntol/batch"): self._batch,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            if any(p == path for _, p in routes):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no route for {path}")
+        return await handler(body)
+
+    # ────────────────────────────────────────────────
+    # Endpoints: each returns (status, payload)
+    # ────────────────────────────────────────────────
+    async def _health(self, body: bytes) -> tuple:
+        return HTTPStatus.OK, {"status": "ok"}
+
+    async def _readiness(self, body: bytes) -> tuple:
+        if not self.ready.is_set():
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "loading"}
+        return HTTPStatus.OK, {
+            "status": "ready",
+            "table_version": self._table().version,
+            "queued": self.batcher.queue.qsize(),
+            "batches": self.batcher.batches,
+            "requests": self.batcher.requests,
+        }
+
+    async def _single(self, body: bytes) -> tuple:
+        request = _json(body)
+        values = [_number(request, name) for name in INPUTS]
+        try:
+            future = self.batcher.submit(*values)
+        except asyncio.QueueFull:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later") from None
+        result = await future
+        return (HTTPStatus.UNPROCESSABLE_ENTITY if result["error"] else HTTPStatus.OK), result
+
+    async def _batch(self, body: bytes) -> tuple:
+        if self._pending_batches >= self.max_pending_batches:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later")
+        self._pending_batches += 1
+        try:
+            # Decoding and encoding large bodies happen on the default
+            # executor so they do not stall other connections
+            loop = asyncio.get_running_loop()
+            columns = await loop.run_in_executor(None, _batch_columns, body)
+            result = await self._evaluate(*columns)
+            return HTTPStatus.OK, await loop.run_in_executor(None, _batch_payload, result)
+        finally:
+            self._pending_batches -= 1
+
+
+def _batch_columns(body: bytes) -> list:
+    request = _json(body)
+    columns = []
+    for name in INPUTS:
+        values = request.get(name)
+        if not isinstance(values, list) or not all(map(_is_number, values)):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a list of finite numbers")
+        columns.append(np.array(values, dtype=float))
+    if not len(columns[0]) == len(columns[1]) == len(columns[2]):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "isa_dev, msa and fuel_burn must have the same length")
+    if len(columns[0]) > MAX_BATCH_ROWS:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"more than {MAX_BATCH_ROWS} rows")
+    return columns
+
+
+def _batch_payload(result: dict) -> bytes:
+    payload = {name: column.tolist() if isinstance(column, np.ndarray) else column for name, column in result.items()}
+    payload["sources"], payload["errors"] = list(SOURCES), list(ERRORS)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _parse_head(head: bytes) -> tuple:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line", close=True) from None
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise HTTPError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"unsupported version {version}", close=True)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed header", close=True)
+            headers[name.strip().lower()] = value.strip()
+    return method, target.split("?", 1)[0], version, headers
+
+
+def _keep_alive(version: str, headers: dict) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        return connection != "close"
+    return connection == "keep-alive"
+
+
+def _json(body: bytes) -> dict:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "body is not valid JSON") from None
+    if not isinstance(request, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+    return request
+
+
+def _is_number(value) -> bool:
+    # A finite JSON number; integers too large for a float are not
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def _number(request: dict, name: str) -> float:
+    value = request.get(name)
+    if not _is_number(value):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a finite number")
+    return float(value)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options) -> None:
+    # Runs until interrupted; options as for ZntolServer
+    async def main() -> None:
+        server = ZntolServer(host, port, **options)
+        await server.start()
+        print(f"serving on http://{host}:{server.port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,185 @@
+# zntol/shm.py
+# Host-wide copy of the compiled table in POSIX shared memory
+#
+#   ZNTOL_SHARED_TABLE=1 streamlit run emb120_zntol_streamlit.py   # every worker
+#   python -m zntol shm publish|status|unlink
+#
+# With ZNTOL_SHARED_TABLE set, get_table() attaches to a shared block holding
+# the artifact bytes (axes, grid, cell coefficients, constants, version) and
+# wraps it zero-copy, so N worker processes on a host map one copy of the
+# table. The first process to find no block publishes it, copying the
+# compiled artifact's bytes when get_table() would load one (so it holds no
+# private table of its own) and building the table otherwise; the others
+# attach. The block is named after the AFM source hash (shared_name()), so
+# processes built from different AFM data or tuning never share a table, and
+# every attach checks the artifact checksum, the source hash and the
+# constants (ArtifactError on mismatch). ZNTOL_SHARED_TABLE may also name the
+# block explicitly. On a hot reload (reload.py) each new data version gets its
+# own block, published by whichever process gets there first; blocks of old
+# versions stay until unlinked.
+#
+# The block belongs to the host, not to a process: it is not registered with
+# multiprocessing's resource tracker (which would unlink it when the first
+# attached process exits), so it stays until `python -m zntol shm unlink` or
+# a reboot. Python 3.13+ does this with track=False; older versions
+# unregister after opening.
+#
+# A publisher writes the magic bytes last; an attacher that finds them
+# missing waits up to ATTACH_TIMEOUT for the publisher to finish.
+#
+# Process pools that need one run's table (evaluate_bulk, simulate)
+# publish it under a private_name() block and unlink it when the run ends.
+
+import os
+import secrets
+import sys
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+from .artifact import MAGIC, ArtifactError, from_buffer, read_artifact, to_bytes
+from .tables import DEFAULT_ARTIFACT, ZntolTable, afm_source_hash
+
+ATTACH_TIMEOUT = 5.0  # s
+NAME_PREFIX = "zntol_"
+
+
+class _Block(SharedMemory):
+    # The table's arrays are views into the mapping, so it cannot be closed
+    # while they live; at interpreter exit the OS unmaps it instead
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+class SharedTable:
+    # A table whose arrays are views into a shared block. The block stays
+    # mapped for as long as this object (or the table) is alive.
+    def __init__(self, shm: SharedMemory, table: ZntolTable, created: bool):
+        self.shm = shm
+        self.table = table
+        self.created = created  # this process published the block
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+    def close(self) -> None:
+        # Unmaps the block; the table must not be used afterwards
+        self.table = None
+        self.shm.close()
+
+
+def shared_name(source_hash: str | None = None) -> str:
+    # Well-known block name for the current AFM data (short enough for macOS)
+    return NAME_PREFIX + (source_hash or afm_source_hash())[:16]
+
+
+def private_name() -> str:
+    # A fresh block name for one run's table; the caller unlinks the block
+    return f"{NAME_PREFIX}{os.getpid()}_{secrets.token_hex(4)}"
+
+
+def publish_shared(table: ZntolTable, name: str | None = None) -> SharedTable:
+    # Publishes table under name, or attaches when a block of that name
+    # already exists (another process won the race)
+    return _publish(to_bytes(table), name or shared_name(table.source_hash), table.version, table.source_hash)
+
+
+def _publish(blob: bytes, name: str, version: str, source_hash: str) -> SharedTable:
+    # blob: checked artifact bytes of the table with that version and source hash
+    try:
+        shm = _open(name, create=True, size=len(blob))
+    except FileExistsError:
+        return attach_shared(name, version=version, source_hash=source_hash)
+    shm.buf[len(MAGIC):len(blob)] = blob[len(MAGIC):]
+    shm.buf[:len(MAGIC)] = MAGIC  # readers wait for this
+    return SharedTable(shm, from_buffer(shm.buf, verify=False), created=True)
+
+
+def attach_shared(name: str | None = None, version: str | None = None, verify: bool = True,
+                  timeout: float = ATTACH_TIMEOUT, source_hash: str | None = None) -> SharedTable:
+    # Raises FileNotFoundError when no block of that name exists, and
+    # ArtifactError when it holds a different table than expected (source_hash
+    # defaults to that of the current AFM data, see afm_source_hash())
+    source_hash = source_hash or afm_source_hash()
+    name = name or shared_name(source_hash)
+    shm = _open(name)
+    deadline = time.monotonic() + timeout
+    while bytes(shm.buf[:len(MAGIC)]) != MAGIC:
+        if time.monotonic() > deadline:
+            shm.close()
+            raise ArtifactError(f"shared table {name!r} was never completed")
+        time.sleep(0.001)
+
+    table = from_buffer(shm.buf, verify=verify)
+    if version is not None and table.version != version:
+        raise ArtifactError(f"shared table {name!r} has version {table.version}, expected {version}")
+    if table.source_hash != source_hash:
+        raise ArtifactError(f"shared table {name!r} was built from different AFM data")
+    return SharedTable(shm, table, created=False)
+
+
+def shared_table(name: str | None = None, data: dict | None = None) -> SharedTable:
+    # Attach, or load/build and publish when there is nothing to attach to;
+    # data as load_data() returns it (default: the configured AFM data)
+    from .tables import build_table, load_table
+
+    try:
+        return attach_shared(name, source_hash=afm_source_hash(data))
+    except FileNotFoundError:
+        pass
+    # The artifact file load_table() would map is published as it is: a
+    # publisher that builds a table first holds a private copy of it next to
+    # the shared one, and a process that loses the race to create the block
+    # has built it for nothing
+    blob = _artifact_bytes() if data is None else None
+    if blob is not None:
+        header, _ = read_artifact(blob, verify=False)
+        return _publish(blob, name or shared_name(header["source_hash"]), header["version"], header["source_hash"])
+    return publish_shared(load_table() if data is None else build_table(data), name)
+
+
+def _artifact_bytes() -> bytes | None:
+    # Checked bytes of the artifact load_table() would load, None when it
+    # would build the table instead
+    path = os.environ.get("ZNTOL_TABLE")
+    if not path and (os.environ.get("ZNTOL_DATA") or not DEFAULT_ARTIFACT.exists()):
+        return None
+    try:
+        blob = Path(path or DEFAULT_ARTIFACT).read_bytes()
+        header, _ = read_artifact(blob)
+    except (ArtifactError, OSError):
+        return None  # load_table() raises for ZNTOL_TABLE, and rebuilds otherwise
+    if not path and header["source_hash"] != afm_source_hash():
+        return None
+    return blob
+
+
+def unlink_shared(name: str | None = None) -> bool:
+    # Removes the block; processes that have it mapped keep their mapping
+    try:
+        shm = _open(name or shared_name())
+    except FileNotFoundError:
+        return False
+    shm.close()
+    if sys.version_info < (3, 13) and os.name == "posix":
+        resource_tracker.register(shm._name, "shared_memory")  # unlink() unregisters it again
+    shm.unlink()
+    return True
+
+
+def _open(name: str, create: bool = False, size: int = 0) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return _Block(name, create=create, size=size, track=False)
+    shm = _Block(name, create=create, size=size)
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
@@ -0,0 +1,223 @@
+# zntol/stream.py
+# Streaming scenario files through the engine with bounded memory
+#
+#   python -m zntol calc scenarios.csv -o results.parquet
+#   cat scenarios.csv | python -m zntol calc - > results.csv
+#
+# Input rows are read in fixed-size chunks, evaluated with
+# calculate_zntol_batch and written out before the next chunk is read, so a
+# multi-GB file never has to fit in memory. Invalid rows get the same error
+# text calculate_zntol returns and do not stop the stream; a CSV row that does
+# not parse is echoed with its fields as written.
+#
+# CSV needs only the standard library and NumPy; Parquet input and output need
+# pyarrow, which is imported only when a Parquet file is used.
+
+import csv
+import io
+import sys
+from itertools import islice
+from typing import Iterator
+
+import numpy as np
+
+from .limits import ERRORS, SOURCES, calculate_zntol_batch
+from .tables import ZntolTable, get_table
+
+DEFAULT_CHUNK_SIZE = 65536
+
+INPUT_COLUMNS = ("isa_dev", "msa", "fuel_burn")
+OUTPUT_COLUMNS = INPUT_COLUMNS + ("w_obstacle_max", "zntol", "capped", "source", "effective_msa", "error")
+
+# Error text for rows whose fields are missing or not finite numbers
+PARSE_ERROR = "Invalid row: isa_dev, msa and fuel_burn must be numbers"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet files need pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _is_float(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "parquet" if str(path).endswith((".parquet", ".pq")) else "csv"
+
+
+# ────────────────────────────────────────────────
+# Readers: yield (isa_dev, msa, fuel_burn, invalid, raw) per chunk, where raw
+# maps the index of each row that did not parse to its input fields as text
+# ────────────────────────────────────────────────
+def read_csv(fh, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    # The header is checked here, before the first chunk is requested
+    header = next(csv.reader([fh.readline()]), [])
+    header = [name.strip() for name in header]
+    missing = [name for name in INPUT_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    return _csv_chunks(fh, [header.index(name) for name in INPUT_COLUMNS], chunk_size)
+
+
+def _csv_chunks(fh, usecols: list, chunk_size: int) -> Iterator[tuple]:
+    while True:
+        raw = list(islice(fh, chunk_size))
+        if not raw:
+            return
+        lines = [line for line in raw if line.strip()]
+        if not lines:
+            continue
+        try:
+            values = np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2, dtype=float)
+            raw = {}
+        except ValueError:
+            values, raw = _parse_lines(lines, usecols)
+        invalid = ~np.isfinite(values).all(axis=1)
+        yield values[:, 0], values[:, 1], values[:, 2], invalid, raw
+
+
+def _parse_lines(lines: list, usecols: list) -> tuple:
+    # Slow path for a chunk with a bad row: parse line by line. Fields that
+    # fail are NaN in values, and their rows keep every field (empty if
+    # missing) in raw.
+    values = np.full((len(lines), len(usecols)), np.nan)
+    raw = {}
+    for k, row in enumerate(csv.reader(lines)):
+        fields = tuple(row[c].strip() if c < len(row) else "" for c in usecols)
+        for i, field in enumerate(fields):
+            if _is_float(field):
+                values[k, i] = float(field)
+            else:
+                raw[k] = fields
+    return values, raw
+
+
+def read_parquet(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    pa = _pyarrow()
+    for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(INPUT_COLUMNS)):
+        columns = [
+            batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False) for name in INPUT_COLUMNS
+        ]
+        values = np.column_stack(columns) if len(batch) else np.empty((0, 3))
+        invalid = ~np.isfinite(values).all(axis=1)
+        yield values[:, 0], values[:, 1], values[:, 2], invalid, {}
+
+
+# ────────────────────────────────────────────────
+# Writers
+# ────────────────────────────────────────────────
+class CsvWriter:
+    def __init__(self, fh):
+        self.writer = csv.writer(fh, lineterminator="\n")
+        self.writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, inputs: tuple, result: dict, errors: list, raw: dict) -> None:
+        isa_dev, msa, fuel_burn = (a.tolist() for a in inputs)
+        w, zntol, capped, source, effective_msa = (
+            result[name].tolist() for name in ("w_obstacle_max", "zntol", "capped", "source", "effective_msa")
+        )
+        rows = []
+        for k, error in enumerate(errors):
+            if k in raw:
+                rows.append(raw[k] + ("", "", "", "", "", error))
+            elif error:
+                rows.append((isa_dev[k], msa[k], fuel_burn[k], "", "", "", "", "", error))
+            else:
+                rows.append((isa_dev[k], msa[k], fuel_burn[k], w[k], zntol[k], capped[k],
+                             SOURCES[source[k]], effective_msa[k], ""))
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetWriter:
+    def __init__(self, path: str):
+        pa = self.pa = _pyarrow()
+        self.schema = pa.schema([
+            ("isa_dev", pa.float64()),
+            ("msa", pa.float64()),
+            ("fuel_burn", pa.float64()),
+            ("w_obstacle_max", pa.int64()),
+            ("zntol", pa.int64()),
+            ("capped", pa.bool_()),
+            ("source", pa.string()),
+            ("effective_msa", pa.int64()),
+            ("error", pa.string()),
+        ])
+        self.writer = pa.parquet.ParquetWriter(path, self.schema)
+        self.sources = np.array(SOURCES + (None,), dtype=object)  # code -1 -> null
+
+    def write(self, inputs: tuple, result: dict, errors: list, raw: dict) -> None:
+        # Input fields that did not parse as numbers are written as nulls
+        pa = self.pa
+        bad = np.array([bool(e) for e in errors], dtype=bool)
+        unparsed = np.zeros((len(inputs), len(errors)), dtype=bool)
+        for k, fields in raw.items():
+            unparsed[:, k] = [not _is_float(f) for f in fields]
+        columns = [pa.array(a, mask=m) for a, m in zip(inputs, unparsed)] + [
+            pa.array(result["w_obstacle_max"], mask=bad),
+            pa.array(result["zntol"], mask=bad),
+            pa.array(result["capped"], mask=bad),
+            pa.array(self.sources[np.where(bad, -1, result["source"])], type=pa.string()),
+            pa.array(result["effective_msa"], mask=bad),
+            pa.array([e or None for e in errors], type=pa.string()),
+        ]
+        self.writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+# ────────────────────────────────────────────────
+# Pipeline
+# ────────────────────────────────────────────────
+def evaluate_stream(chunks, writer, table: ZntolTable | None = None) -> tuple:
+    # Returns (rows, invalid rows)
+    if table is None:
+        table = get_table()
+    rows = invalid_rows = 0
+    for isa_dev, msa, fuel_burn, invalid, raw in chunks:
+        # Unparseable rows are evaluated as zeros and reported with PARSE_ERROR
+        safe = [np.where(invalid, 0.0, a) for a in (isa_dev, msa, fuel_burn)]
+        result = calculate_zntol_batch(*safe, table=table)
+        errors = [PARSE_ERROR if bad else ERRORS[code] for bad, code in zip(invalid.tolist(), result["error"].tolist())]
+        writer.write((isa_dev, msa, fuel_burn), result, errors, raw)
+        rows += len(errors)
+        invalid_rows += sum(1 for e in errors if e)
+    return rows, invalid_rows
+
+
+def open_reader(path: str, fmt: str | None, chunk_size: int):
+    fmt = _format(path, fmt)
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet input must be a file, not stdin")
+        return read_parquet(path, chunk_size), None
+    if path == "-":
+        return read_csv(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline=""), chunk_size), None
+    fh = open(path, newline="", encoding="utf-8")
+    return read_csv(fh, chunk_size), fh
+
+
+def open_writer(path: str, fmt: str | None):
+    fmt = _format(path, fmt)
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet output must be a file, not stdout")
+        return ParquetWriter(path), None
+    if path == "-":
+        return CsvWriter(sys.stdout), None
+    fh = open(path, "w", newline="", encoding="utf-8")
+    return CsvWriter(fh), fh
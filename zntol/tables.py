@@ -0,0 +1,344 @@
+# zntol/tables.py
+# Performance tables: ISA/MSA axes, AFM data and the filled weight grid
+
+# SciPy is only needed for the reference spline, so it is imported inside that
+# path; the grid is assembled with NumPy alone.
+#
+# The AFM data and the tuned rule parameters (TUNING) below are the built-in
+# defaults. ZNTOL_DATA names a JSON data file that replaces them (written by
+# `python -m zntol data`, see load_data()). The parameters travel with the
+# table they were built with, in table.constants, so one table is always
+# evaluated with its own data and tuning.
+
+import hashlib
+import json
+import os
+import threading
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+from .interpolation import BilinearKernel
+
+# Constants
+STRUCTURAL_MTOW = 26433
+MIN_MSA = 8000
+
+# Valid input range (the AFM data's): ISA deviation in °C, MSA in ft
+MIN_ISA, MAX_ISA = -20, 30
+MAX_MSA = 26000
+STRUCTURAL_MSA_THRESHOLD = 15000
+HIGH_MSA_PULLDOWN_THRESHOLD = 18000
+
+CONSTANTS = {
+    "STRUCTURAL_MTOW": STRUCTURAL_MTOW,
+    "MIN_MSA": MIN_MSA,
+    "STRUCTURAL_MSA_THRESHOLD": STRUCTURAL_MSA_THRESHOLD,
+    "HIGH_MSA_PULLDOWN_THRESHOLD": HIGH_MSA_PULLDOWN_THRESHOLD,
+}
+
+# Tuned rule parameters (defaults; a data file may override them):
+#   BLEND_EXPONENT   frac ** BLEND_EXPONENT in the structural blend below ISA +2 °C
+#   PULLDOWN_*       cold/high pull-down of
+#                    max(0, -PULLDOWN_WEIGHT * (isa_dev - PULLDOWN_ISA) / PULLDOWN_SPAN)
+TUNING = {
+    "BLEND_EXPONENT": 1.8,
+    "PULLDOWN_WEIGHT": 1500,
+    "PULLDOWN_ISA": -10,
+    "PULLDOWN_SPAN": 10,
+}
+
+# ISA and MSA grids
+isa_grid = np.array([-20, -15, -10, -5, 0, 5, 10, 15, 20, 25, 30])
+msa_grid = np.array([
+    8000, 10000, 12000, 14000, 16000, 18000, 19000, 20000, 21000, 22000, 23000, 24000, 25000, 26000
+])
+
+# High-alt data (19,000 to 26,000 ft)
+high_data = {
+    -20: [25000, 25000, 24400, 23200, 21900, 20600, 19400, 18000],
+    -15: [25000, 25000, 23600, 22200, 20900, 19600, 18400, 17100],
+    -10: [25000, 24100, 22600, 21300, 19900, 18600, 17400, 16100],
+    -5: [24600, 23100, 21700, 20300, 19000, 17700, 16400, 15100],
+    0: [23600, 22200, 20800, 19400, 18000, 16700, 15400, 14100],
+    5: [22600, 21100, 19700, 18300, 17000, 15700, 14300, 13000],
+    10: [21600, 20000, 18600, 17200, 15900, 14500, 13100, 11700],
+    15: [20600, 19000, 17500, 16000, 14700, 13300, 11900, 10400],
+    20: [19400, 17900, 16300, 14900, 13200, 11800, 10400, 8800],
+    25: [18200, 16600, 15000, 13500, 12000, 10400, 8700, 6900],
+    30: [16400, 14800, 13200, 11600, 9900, 8100, 6400, 4600]
+}
+
+# Low-alt data (overrides)
+low_data = {
+    0: {23000:19350, 22000:20100, 20000:21550, 18000:23000, 16000:24550},
+    5: {22000:19350, 20000:20750, 18000:22200, 16000:23700, 14000:25200, 12000:26433},
+    10: {20000:20000, 18000:21450, 16000:22950, 14000:24400, 12000:25750, 10000:26433},
+    15: {20000:19300, 18000:20650, 16000:22000, 14000:23450, 12000:24850, 10000:26433},
+    20: {18000:19900, 16000:21200, 14000:22500, 12000:23950, 10000:25300, 8000:26433}
+}
+
+# High-alt rows start at this MSA (ft)
+HIGH_DATA_MSA = 19000
+
+
+def default_data() -> dict:
+    # The built-in AFM data and tuning, in the form load_data() returns
+    return {
+        "isa_grid": isa_grid.tolist(),
+        "msa_grid": msa_grid.tolist(),
+        "high_msa": HIGH_DATA_MSA,
+        "high_data": {isa: list(row) for isa, row in high_data.items()},
+        "low_data": {isa: dict(points) for isa, points in low_data.items()},
+        "tuning": dict(TUNING),
+    }
+
+
+def load_data(path=None) -> dict:
+    # AFM data and tuning from a JSON file: path, else ZNTOL_DATA, else the
+    # built-in data. Keys as in default_data(); JSON object keys (ISA, MSA)
+    # are numbers written as strings, and missing tuning entries take their
+    # default. Raises ValueError on malformed data.
+    path = path or os.environ.get("ZNTOL_DATA")
+    if not path:
+        return default_data()
+    with open(path, encoding="utf-8") as fh:
+        try:
+            raw = json.load(fh)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}: not valid JSON ({exc})") from None
+    try:
+        tuning = dict(TUNING, **raw.get("tuning", {}))
+        data = {
+            "isa_grid": [_number(v) for v in raw["isa_grid"]],
+            "msa_grid": [_number(v) for v in raw["msa_grid"]],
+            "high_msa": _number(raw.get("high_msa", HIGH_DATA_MSA)),
+            "high_data": {_number(isa): [_number(w) for w in row] for isa, row in raw["high_data"].items()},
+            "low_data": {_number(isa): {_number(msa): _number(w) for msa, w in points.items()}
+                         for isa, points in raw["low_data"].items()},
+            "tuning": {name: _number(value) for name, value in tuning.items()},
+        }
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"{path}: malformed AFM data ({exc!r})") from None
+    unknown = set(data["tuning"]) - set(TUNING)
+    if unknown:
+        raise ValueError(f"{path}: unknown tuning parameter(s): {', '.join(sorted(unknown))}")
+    if data["tuning"]["PULLDOWN_SPAN"] == 0:
+        raise ValueError(f"{path}: PULLDOWN_SPAN must not be zero")
+    for name in ("isa_grid", "msa_grid"):
+        axis = data[name]
+        if len(axis) < 2 or any(b <= a for a, b in zip(axis, axis[1:])):
+            raise ValueError(f"{path}: {name} must be strictly increasing with at least two points")
+    return data
+
+
+def _number(value) -> int | float:
+    # JSON numbers as they are; object keys arrive as strings
+    if isinstance(value, str):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"expected a number, got {value!r}")
+    return value
+
+
+class ZntolTable:
+    def __init__(self, isa_grid: np.ndarray, msa_grid: np.ndarray, weight_grid: np.ndarray,
+                 kernel: BilinearKernel | None = None, constants: dict | None = None,
+                 source_hash: str | None = None, version: str | None = None):
+        self.isa_grid = isa_grid
+        self.msa_grid = msa_grid
+        self.weight_grid = weight_grid
+        # Native bilinear kernel for the hot path
+        self.kernel = kernel if kernel is not None else BilinearKernel.from_grid(isa_grid, msa_grid, weight_grid)
+        # Engine constants and the tuning the table was built with
+        self.constants = dict(constants if constants is not None else {**CONSTANTS, **TUNING})
+        # Hash of the AFM data the grid was built from (see afm_source_hash())
+        self.source_hash = source_hash if source_hash is not None else afm_source_hash()
+        if version is not None:
+            self.version = version
+
+    @cached_property
+    def version(self) -> str:
+        # Content hash of the compiled table; artifacts carry it in their header
+        from .artifact import content_hash
+
+        return content_hash(self)
+
+    # Tables compare and hash by version, so caches keyed by a table (e.g.
+    # the obstacle weight cache) are keyed by its version
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ZntolTable) and self.version == other.version
+
+    def __hash__(self) -> int:
+        return hash(self.version)
+
+    @cached_property
+    def spline(self):
+        # 2D spline (linear kx=1, ky=1) the kernel is checked against
+        from scipy.interpolate import RectBivariateSpline
+
+        return RectBivariateSpline(self.isa_grid, self.msa_grid, self.weight_grid, kx=1, ky=1)
+
+
+def afm_source_hash(data: dict | None = None) -> str:
+    # Identifies the inputs to build_table(data) (default: load_data()), so a
+    # compiled artifact can be recognised as stale when the AFM data, tuning
+    # or constants change
+    if data is None:
+        data = load_data()
+    source = {
+        "isa_grid": data["isa_grid"],
+        "msa_grid": data["msa_grid"],
+        "high_msa": data["high_msa"],
+        "high_data": {str(k): v for k, v in data["high_data"].items()},
+        "low_data": {str(k): {str(m): w for m, w in v.items()} for k, v in data["low_data"].items()},
+        "constants": CONSTANTS,
+        "tuning": data["tuning"],
+    }
+    return hashlib.sha256(json.dumps(source, sort_keys=True).encode()).hexdigest()
+
+
+def assemble_grid(isa_axis: np.ndarray, msa_axis: np.ndarray, high: dict, low: dict,
+                  high_msa: float = HIGH_DATA_MSA) -> np.ndarray:
+    # Weight grid (rows: ISA, columns: MSA): high-alt rows on every MSA from
+    # high_msa up, low-alt points on top, then each row filled linearly
+    weight_grid = np.full((len(isa_axis), len(msa_axis)), np.nan)
+
+    # Fill from high-alt data
+    rows = _axis_index(isa_axis, list(high), "ISA")
+    high_cols = np.flatnonzero(msa_axis >= high_msa)
+    weight_grid[rows[:, None], high_cols] = np.array(list(high.values()), dtype=float).reshape(len(rows), -1)
+
+    # Fill from low-alt data (overrides)
+    points = [(isa, msa, val) for isa, data in low.items() for msa, val in data.items()]
+    if points:
+        isa, msa, val = (np.array(c, dtype=float) for c in zip(*points))
+        weight_grid[_axis_index(isa_axis, isa, "ISA"), _axis_index(msa_axis, msa, "MSA")] = val
+
+    return fill_rows_linear(weight_grid, msa_axis)
+
+
+def _axis_index(axis: np.ndarray, values, name: str) -> np.ndarray:
+    # Position of each value on a sorted axis; every value must be a grid point
+    values = np.asarray(values, dtype=float)
+    index = np.searchsorted(axis, values).clip(0, len(axis) - 1)
+    missing = axis[index] != values
+    if missing.any():
+        raise ValueError(f"{name} value(s) not on the grid: {values[missing].tolist()}")
+    return index
+
+
+def fill_rows_linear(grid: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # Replaces every row by the linear interpolant through its finite entries,
+    # extrapolated past both ends; all-NaN rows are left as they are. One pass
+    # over the whole array, rounding exactly like interp1d(kind="linear",
+    # fill_value="extrapolate") row by row, known points included.
+    grid = np.array(grid, dtype=float)
+    x = np.asarray(x, dtype=float)
+    known = np.isfinite(grid)
+    counts = known.sum(axis=1)
+    if (counts == 1).any():
+        raise ValueError("a row with a single finite value cannot be interpolated")
+    rows = np.flatnonzero(counts >= 2)
+    if not len(rows):
+        return grid
+    known, counts = known[rows], counts[rows]
+
+    # Known points packed row by row: column of the k-th known point of row r
+    # is known_cols[starts[r] + k]
+    _, known_cols = np.nonzero(known)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # interp1d's interval: searchsorted(x_known, x, "left") clipped to [1, n-1]
+    left = np.cumsum(known, axis=1) - known
+    hi = starts[:, None] + left.clip(1, (counts - 1)[:, None])
+    lo_col, hi_col = known_cols[hi - 1], known_cols[hi]
+
+    y = grid[rows]
+    y_lo = np.take_along_axis(y, lo_col, axis=1)
+    y_hi = np.take_along_axis(y, hi_col, axis=1)
+    slope = (y_hi - y_lo) / (x[hi_col] - x[lo_col])
+    grid[rows] = slope * (x - x[lo_col]) + y_lo
+    return grid
+
+
+def build_table(data: dict | None = None) -> ZntolTable:
+    # From the built-in data, or from data as load_data() returns it
+    if data is None:
+        weight_grid = assemble_grid(isa_grid, msa_grid, high_data, low_data)
+        return ZntolTable(isa_grid, msa_grid, weight_grid, source_hash=afm_source_hash(default_data()))
+
+    isa_axis, msa_axis = np.array(data["isa_grid"]), np.array(data["msa_grid"])
+    weight_grid = assemble_grid(isa_axis, msa_axis, data["high_data"], data["low_data"], data["high_msa"])
+    if not np.isfinite(weight_grid).all():
+        raise ValueError("AFM data leaves ISA rows of the weight grid without values")
+    return ZntolTable(isa_axis, msa_axis, weight_grid, constants={**CONSTANTS, **data["tuning"]},
+                      source_hash=afm_source_hash(data))
+
+
+# Compiled artifact picked up by get_table() when ZNTOL_TABLE is not set;
+# written by `python -m zntol compile`
+DEFAULT_ARTIFACT = Path(__file__).with_name("zntol_table.bin")
+
+
+# The current table: loaded on first use and shared by every caller in the
+# process. With ZNTOL_SHARED_TABLE set, it is attached from (or published to)
+# a host-wide shared-memory block so worker processes map one copy; see
+# shm.py. set_table() replaces it (hot reload, see reload.py) by swapping one
+# reference, so get_table() takes no lock: a caller keeps the snapshot it got
+# until it is done, and the next call sees the new table.
+_current = None
+_lock = threading.Lock()  # writers only: first load and set_table()
+
+
+def get_table() -> ZntolTable:
+    table = _current
+    if table is None:
+        table = _load_current()
+    return table
+
+
+def set_table(table: ZntolTable | None) -> ZntolTable | None:
+    # Publishes table as the current snapshot and returns the previous one;
+    # None makes the next get_table() load the table again
+    global _current
+    with _lock:
+        previous, _current = _current, table
+    return previous
+
+
+def _load_current() -> ZntolTable:
+    global _current
+    with _lock:
+        if _current is None:
+            shared = os.environ.get("ZNTOL_SHARED_TABLE")
+            if shared:
+                from .shm import shared_table
+
+                _current = shared_table(None if shared == "1" else shared).table
+            else:
+                _current = load_table()
+        return _current
+
+
+# The artifact named by ZNTOL_TABLE, the table built from the data file named
+# by ZNTOL_DATA, or the default artifact when it matches the built-in data
+# (memory-mapped instead of rebuilding, no SciPy import)
+def load_table() -> ZntolTable:
+    from .artifact import ArtifactError, load_artifact
+
+    path = os.environ.get("ZNTOL_TABLE")
+    if path:
+        return load_artifact(path)
+    if os.environ.get("ZNTOL_DATA"):
+        return build_table(load_data())
+    if DEFAULT_ARTIFACT.exists():
+        try:
+            table = load_artifact(DEFAULT_ARTIFACT)
+        except (ArtifactError, OSError):  # corrupt, truncated or unreadable: rebuild
+            table = None
+        if table is not None and table.source_hash == afm_source_hash():
+            return table
+    return build_table()